@@ -2,20 +2,62 @@
 # -*- coding: utf-8 -*-
 """
 سكريبت موحد لبناء المشروع بالكامل
+
+    python build.py                                   # بناء + تقرير الأداء في reports/build-profile.json
+    python build.py --cprofile generate_all_pages     # + cProfile للمرحلة (أو all لكل المراحل)
+    python build.py --watch                           # خادم تطوير محلي مع إعادة بناء تزايدية
 """
 import sys
-import subprocess
+import time
+import argparse
+
+from build_profile import run_stage, reset_profile_dir, write_report
 
 if sys.stdout.encoding.lower() != 'utf-8':
     sys.stdout.reconfigure(encoding='utf-8')
 
-def run(script):
+STAGES = [
+    "validate_catalog.py",
+    "detect_duplicates.py",
+    "build_related_index.py",
+    "pricing.py",
+    "facets.py",
+    "optimize_assets.py",
+    "image_dimensions.py",
+    "generate_all_pages.py",
+    "seo_optimizer.py",
+    "third_party.py",
+    "speculation.py",
+    "optimize_fonts.py",
+    "critical_css.py",
+    "fingerprint_assets.py",
+    "service_worker.py",
+    "validate_pages.py",
+    "fix_feed_gmc.py",
+    "generate_sitemap.py",
+]
+
+
+def run(script, cprofile_stages=()):
     print(f"\n▶ {script}")
-    subprocess.run([sys.executable, script], check=True)
+    return run_stage(script, cprofile_stages)
+
 
 if __name__ == "__main__":
-    run("generate_all_pages.py")
-    run("seo_optimizer.py")
-    run("fix_feed_gmc.py")
-    run("generate_sitemap.py")
+    parser = argparse.ArgumentParser(description='بناء المشروع')
+    parser.add_argument('--cprofile', default='', help='مراحل تُشغل مع cProfile (مفصولة بفواصل، أو all)')
+    parser.add_argument('--watch', action='store_true', help='مراقبة التعديلات وتشغيل خادم محلي مع إعادة تحميل تلقائية')
+    parser.add_argument('--port', type=int, default=8000, help='منفذ الخادم المحلي في وضع المراقبة')
+    args = parser.parse_args()
+
+    if args.watch:
+        import dev_server
+        dev_server.main(args.port)
+        sys.exit(0)
+    cprofile_stages = tuple(s.strip().removesuffix('.py') for s in args.cprofile.split(',') if s.strip())
+
+    reset_profile_dir()
+    start_time = time.perf_counter()
+    stages = [run(script, cprofile_stages) for script in STAGES]
+    write_report(stages, time.perf_counter() - start_time)
     print("\n✅ تم بناء المشروع بنجاح")
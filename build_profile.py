@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+قياس أداء مراحل البناء (build.py)
+
+- لكل مرحلة: الوقت الفعلي، وقت المعالج (مع العمليات الفرعية)، أقصى ذاكرة، البايتات المقروءة والمكتوبة
+- الدوال المعلّمة بـ @profiled (مثل process_single_product) تُسجل عدد الاستدعاءات ووقتها داخل كل عملية
+- وضع cProfile اختياري لكل مرحلة: build.py --cprofile generate_all_pages
+
+بدون build.py (متغير BUILD_PROFILE_DIR غير موجود) تعود الدوال كما هي بدون أي تكلفة.
+الناتج: reports/build-profile.json و reports/profiles/<stage>.prof
+"""
+
+import os
+import sys
+import json
+import time
+import atexit
+import pstats
+import cProfile
+import functools
+import subprocess
+import multiprocessing
+import multiprocessing.util
+from pathlib import Path
+from datetime import datetime
+
+PROFILE_DIR_ENV = 'BUILD_PROFILE_DIR'
+STAGE_ENV = 'BUILD_STAGE'
+CPROFILE_ENV = 'BUILD_CPROFILE'
+
+PROFILE_DIR = Path('.cache/profile')
+REPORT_FILE = Path('reports/build-profile.json')
+PROFILES_DIR = Path('reports/profiles')
+
+_profile_dir = os.environ.get(PROFILE_DIR_ENV)
+_stage = os.environ.get(STAGE_ENV, 'stage')
+_cprofile = _stage in os.environ.get(CPROFILE_ENV, '').split(',') or os.environ.get(CPROFILE_ENV) == 'all'
+
+_functions = {}
+_profiler = None
+_registered_pid = None
+
+
+def io_counters():
+    """البايتات المقروءة والمكتوبة للعملية الحالية (Linux فقط، وإلا أصفار)"""
+    try:
+        with open('/proc/self/io', 'r') as f:
+            values = dict(line.split(': ') for line in f.read().splitlines())
+        return int(values['rchar']), int(values['wchar'])
+    except (OSError, KeyError, ValueError):
+        return 0, 0
+
+
+def _is_worker():
+    return multiprocessing.parent_process() is not None
+
+
+def _dump():
+    """حفظ إحصائيات العملية الحالية في مجلد القياس (تُجمع لاحقاً في build.py)"""
+    pid = os.getpid()
+    read_bytes, written_bytes = io_counters()
+    data = {
+        'pid': pid,
+        'worker': _is_worker(),
+        'read_bytes': read_bytes,
+        'written_bytes': written_bytes,
+        'functions': _functions,
+    }
+    with open(os.path.join(_profile_dir, f"{_stage}.{pid}.json"), 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    if _profiler is not None:
+        _profiler.disable()
+        _profiler.dump_stats(os.path.join(_profile_dir, f"{_stage}.{pid}.prof"))
+
+
+def _register():
+    """تسجيل الحفظ عند نهاية العملية (atexit للرئيسية، Finalize لعمال ProcessPoolExecutor)"""
+    global _registered_pid, _profiler
+    if _registered_pid == os.getpid():
+        return
+    _registered_pid = os.getpid()
+    if _is_worker():
+        # العامل (fork) يرث إحصائيات ومُحلّل العملية الرئيسية، فنبدأ من الصفر
+        _functions.clear()
+        if _profiler is not None:
+            _profiler.disable()
+            _profiler = None
+        # العمال تنتهي بـ os._exit فلا يعمل atexit، لكن multiprocessing يشغل Finalize قبل الخروج
+        multiprocessing.util.Finalize(None, _dump, exitpriority=10)
+        if _cprofile:
+            _profiler = cProfile.Profile()
+    else:
+        atexit.register(_dump)
+        if _cprofile:
+            _profiler = cProfile.Profile()
+            _profiler.enable()
+
+
+def _function_stats(name):
+    return _functions.setdefault(name, {'calls': 0, 'wall': 0.0, 'cpu': 0.0, 'read_bytes': 0, 'written_bytes': 0})
+
+
+def _start():
+    return time.perf_counter(), time.process_time(), *io_counters()
+
+
+def _stop(stats, start):
+    wall_start, cpu_start, read_start, written_start = start
+    read_end, written_end = io_counters()
+    stats['calls'] += 1
+    stats['wall'] += time.perf_counter() - wall_start
+    stats['cpu'] += time.process_time() - cpu_start
+    stats['read_bytes'] += read_end - read_start
+    stats['written_bytes'] += written_end - written_start
+
+
+def profiled(func):
+    """تسجيل عدد الاستدعاءات والوقت والبايتات لدالة (تُستخدم للدوال التي تعمل لكل منتج)"""
+    if not _profile_dir:
+        return func
+
+    name = f"{func.__module__}.{func.__name__}" if func.__module__ != '__main__' else f"{_stage}.{func.__name__}"
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        _register()
+        # في العمال يعمل cProfile أثناء الاستدعاء فقط (في العملية الرئيسية يعمل طوال المرحلة)
+        worker_profiler = _profiler if _profiler is not None and _is_worker() else None
+        start = _start()
+        if worker_profiler:
+            worker_profiler.enable()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            if worker_profiler:
+                worker_profiler.disable()
+            _stop(_function_stats(name), start)
+
+    return wrapper
+
+
+def profiled_items(name, iterable):
+    """قياس جسم حلقة لكل عنصر (مثل حلقة المنتجات في fix_feed_gmc) كأنه دالة معلّمة"""
+    if not _profile_dir:
+        return iterable
+
+    def generator():
+        _register()
+        stats = _function_stats(f"{_stage}.{name}")
+        for item in iterable:
+            start = _start()
+            yield item
+            _stop(stats, start)
+
+    return generator()
+
+
+# ----------------------------------------------------------------------
+# جانب build.py
+# ----------------------------------------------------------------------
+
+def run_stage(script, cprofile_stages=()):
+    """تشغيل مرحلة كعملية مستقلة وإرجاع قياساتها"""
+    stage = Path(script).stem
+    env = dict(os.environ)
+    env[PROFILE_DIR_ENV] = str(PROFILE_DIR.resolve())
+    env[STAGE_ENV] = stage
+    env[CPROFILE_ENV] = ','.join(cprofile_stages)
+
+    wall_start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, script], env=env)
+    usage = None
+    if hasattr(os, 'wait4'):
+        _, status, usage = os.wait4(process.pid, 0)
+        process.returncode = os.waitstatus_to_exitcode(status)
+    else:
+        process.wait()
+    wall = time.perf_counter() - wall_start
+    if process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, [sys.executable, script])
+
+    result = {'stage': stage, 'wall': round(wall, 3)}
+    if usage is not None:
+        result['cpu_user'] = round(usage.ru_utime, 3)
+        result['cpu_system'] = round(usage.ru_stime, 3)
+        # ru_maxrss بالكيلوبايت على Linux
+        result['max_rss_mb'] = round(usage.ru_maxrss / 1024, 1)
+    result.update(collect_stage(stage, stage in cprofile_stages or 'all' in cprofile_stages))
+    return result
+
+
+def collect_stage(stage, with_cprofile=False):
+    """تجميع ملفات القياس التي كتبتها عمليات المرحلة (الرئيسية + العمال)"""
+    totals = {'processes': 0, 'read_bytes': 0, 'written_bytes': 0, 'functions': {}}
+    for path in sorted(PROFILE_DIR.glob(f"{stage}.*.json")):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        totals['processes'] += 1
+        totals['read_bytes'] += data['read_bytes']
+        totals['written_bytes'] += data['written_bytes']
+        for name, stats in data['functions'].items():
+            merged = totals['functions'].setdefault(name, {key: 0 for key in stats})
+            for key, value in stats.items():
+                merged[key] += value
+
+    for stats in totals['functions'].values():
+        stats['wall'] = round(stats['wall'], 3)
+        stats['cpu'] = round(stats['cpu'], 3)
+        stats['avg_ms'] = round(stats['wall'] / stats['calls'] * 1000, 3) if stats['calls'] else 0
+
+    prof_files = [str(p) for p in PROFILE_DIR.glob(f"{stage}.*.prof")]
+    if with_cprofile and prof_files:
+        PROFILES_DIR.mkdir(parents=True, exist_ok=True)
+        merged = pstats.Stats(*prof_files)
+        output = PROFILES_DIR / f"{stage}.prof"
+        merged.dump_stats(str(output))
+        totals['cprofile'] = str(output)
+        print(f"\n📈 أعلى الدوال استهلاكاً في {stage} ({len(prof_files)} عملية):")
+        merged.sort_stats('cumulative').print_stats(15)
+    return totals
+
+
+def reset_profile_dir():
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    for path in PROFILE_DIR.iterdir():
+        path.unlink()
+
+
+def write_report(stages, total_wall):
+    """كتابة التقرير النهائي وطباعة ملخص لكل مرحلة"""
+    report = {
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'total_wall': round(total_wall, 3),
+        'stages': stages,
+    }
+    REPORT_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with open(REPORT_FILE, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    print(f"\n⏱️ زمن البناء: {total_wall:.2f} ثانية")
+    print(f"{'المرحلة':<24}{'wall':>9}{'cpu':>9}{'read MB':>10}{'write MB':>10}")
+    for stage in stages:
+        cpu = stage.get('cpu_user', 0) + stage.get('cpu_system', 0)
+        print(f"{stage['stage']:<24}{stage['wall']:>9.2f}{cpu:>9.2f}"
+              f"{stage['read_bytes'] / 1e6:>10.1f}{stage['written_bytes'] / 1e6:>10.1f}")
+        for name, stats in stage['functions'].items():
+            print(f"   └ {name}: {stats['calls']} × {stats['avg_ms']:.2f} ms")
+    print(f"📄 التقرير: {REPORT_FILE}")
+
+
+# العملية الرئيسية للمرحلة تُسجل من البداية حتى تُقاس بالكامل (و cProfile يغطي المرحلة كلها)
+if _profile_dir and not _is_worker():
+    _register()
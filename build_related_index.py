@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+بناء فهرس "منتجات مشابهة" مسبقاً لعرضه في صفحات المنتجات
+
+- متجهات TF-IDF (hashing) من character 3-grams للعنوان وكلمات الوصف
+- التقسيم حسب الفئة، والفئات الكبيرة تُقسم بـ random hyperplanes إلى blocks محدودة الحجم
+- التشابه يُحسب بضرب مصفوفات لكل block على دفعات => زمن شبه خطي مع حجم الكتالوج
+
+الناتج: .cache/related-products.json (ID -> قائمة IDs) يقرأه generate_all_pages.py
+"""
+
+import json
+import sys
+import time
+import zlib
+from pathlib import Path
+from collections import defaultdict
+
+import numpy as np
+
+from build_profile import profiled
+from catalog_store import open_catalog, get_product_category
+from output_writer import write_output
+from detect_duplicates import normalize_arabic
+from generate_all_pages import load_excluded_duplicates
+
+# Force UTF-8 for output to avoid encoding errors on Windows
+if sys.stdout.encoding and sys.stdout.encoding.lower() != 'utf-8':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+RELATED_INDEX_FILE = Path('.cache/related-products.json')
+
+TOP_K = 8
+HASH_DIM = 2 ** 13
+TITLE_WEIGHT = 2.0
+MAX_BLOCK_SIZE = 2000
+CHUNK_ROWS = 512
+
+
+def product_features(title, description):
+    """الخصائص النصية للمنتج: 3-grams حرفية للعنوان + كلمات الوصف"""
+    title = normalize_arabic(title).replace(' ', '_')
+    padded = f"_{title}_"
+    features = defaultdict(float)
+    for i in range(len(padded) - 2):
+        features[f"t:{padded[i:i + 3]}"] += TITLE_WEIGHT
+    for word in normalize_arabic(description).split():
+        if len(word) > 2:
+            features[f"d:{word}"] += 1.0
+    return features
+
+
+def build_tfidf_rows(products, descriptions):
+    """متجهات TF-IDF مُطبّعة بصيغة متفرقة (indices, weights) لكل منتج باستخدام hashing trick"""
+    rows = []
+    doc_freq = np.zeros(HASH_DIM, dtype=np.float32)
+    for product in products:
+        features = product_features(product.get('title', ''), descriptions.get(str(product.get('id')), ''))
+        indices = defaultdict(float)
+        for name, count in features.items():
+            indices[zlib.crc32(name.encode('utf-8')) % HASH_DIM] += count
+        idx = np.fromiter(indices.keys(), dtype=np.int64, count=len(indices))
+        val = np.fromiter(indices.values(), dtype=np.float32, count=len(indices))
+        doc_freq[idx] += 1
+        rows.append((idx, val))
+
+    idf = np.log((1 + len(products)) / (1 + doc_freq)) + 1
+    weighted = []
+    for idx, val in rows:
+        weights = (1 + np.log(val)) * idf[idx]
+        norm = np.linalg.norm(weights)
+        weighted.append((idx, weights / norm if norm else weights))
+    return weighted
+
+
+def densify(block, rows):
+    """تحويل متجهات block واحد فقط إلى مصفوفة كثيفة (الذاكرة محدودة بحجم الـ block)"""
+    matrix = np.zeros((len(block), HASH_DIM), dtype=np.float32)
+    for i, member in enumerate(block):
+        idx, weights = rows[member]
+        matrix[i, idx] = weights
+    return matrix
+
+
+def split_block(members, rows, rng):
+    """تقسيم block كبير بـ random hyperplanes حتى لا يتجاوز MAX_BLOCK_SIZE"""
+    if len(members) <= MAX_BLOCK_SIZE:
+        return [members]
+    bits = int(np.ceil(np.log2(len(members) / MAX_BLOCK_SIZE)))
+    planes = rng.standard_normal((HASH_DIM, bits)).astype(np.float32)
+    groups = defaultdict(list)
+    for member in members:
+        idx, weights = rows[member]
+        code = int(((weights @ planes[idx]) > 0) @ (1 << np.arange(bits)))
+        groups[code].append(member)
+    if len(groups) == 1:
+        # كل المنتجات في نفس الجهة (متجهات متطابقة أو فارغة): تقسيم بالترتيب
+        return [members[i:i + MAX_BLOCK_SIZE] for i in range(0, len(members), MAX_BLOCK_SIZE)]
+    # نصف قد يبقى أكبر من الحد => تقسيم متكرر حتى يصبح كل block <= MAX_BLOCK_SIZE
+    return [block for group in groups.values() for block in split_block(group, rows, rng)]
+
+
+def top_k_similar(block, rows, k=TOP_K):
+    """أعلى k منتجات مشابهة لكل منتج داخل block (ضرب مصفوفات على دفعات)"""
+    k = min(k, len(block) - 1)
+    result = {}
+    if k <= 0:
+        return result
+
+    vectors = densify(block, rows)
+    for start in range(0, len(block), CHUNK_ROWS):
+        sims = vectors[start:start + CHUNK_ROWS] @ vectors.T
+        chunk_rows = np.arange(sims.shape[0])
+        sims[chunk_rows, chunk_rows + start] = -1
+        top = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+        order = np.argsort(-sims[chunk_rows[:, None], top], axis=1)
+        for row in chunk_rows:
+            result[block[start + row]] = [block[j] for j in top[row, order[row]]]
+    return result
+
+
+@profiled
+def build_related_index(products, descriptions):
+    """فهرس المنتجات المشابهة: ID -> [IDs] مرتبة من الأكثر تشابهاً"""
+    rows = build_tfidf_rows(products, descriptions)
+    rng = np.random.default_rng(7)
+
+    categories = defaultdict(list)
+    for i, product in enumerate(products):
+        categories[get_product_category(product.get('title', ''))[0]].append(i)
+
+    index = {}
+    for members in categories.values():
+        for block in split_block(members, rows, rng):
+            for i, neighbors in top_k_similar(block, rows).items():
+                index[str(products[i]['id'])] = [products[j]['id'] for j in neighbors]
+    return index
+
+
+def main():
+    try:
+        with open_catalog() as store:
+            products = list(store.iter_products())
+            descriptions = store.descriptions()
+    except Exception as e:
+        print(f"❌ خطأ في قراءة ملفات الكتالوج: {e}")
+        sys.exit(1)
+
+    excluded_ids = load_excluded_duplicates()
+    products = [p for p in products if p.get('id') not in excluded_ids]
+
+    start_time = time.time()
+    index = build_related_index(products, descriptions)
+
+    write_output(RELATED_INDEX_FILE, json.dumps(index, separators=(',', ':')))
+
+    print(f"🔗 تم بناء فهرس المنتجات المشابهة لـ {len(index)} منتج")
+    print(f"الوقت المستغرق: {time.time() - start_time:.2f} ثانية")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+مخزن الكتالوج المحلي (SQLite) بدلاً من قراءة products.json و descriptions.json بالكامل في كل سكريبت
+
+- products.json و descriptions.json يبقيان مصدر البيانات الذي يُعدَّل يدوياً
+- open_catalog() يستورد الملفات تلقائياً إلى .cache/catalog.db عند تغيرها فقط
+- كل منتج يُحفظ موحداً (data) وكما هو في الملف (raw) => التصدير يعيد products.json كما كان
+- الاستعلام: بالـ ID، بالفئة، بالترتيب، المتغير منذ وقت معين، والتكرار على دفعات
+
+الاستخدام:
+    python catalog_store.py import   # استيراد products.json و descriptions.json
+    python catalog_store.py export   # تصدير قاعدة البيانات إلى ملفات JSON بنفس التنسيق
+"""
+
+import json
+import sys
+import time
+import sqlite3
+import hashlib
+from pathlib import Path
+
+from output_writer import write_output
+
+# Force UTF-8 for output to avoid encoding errors on Windows
+if sys.stdout.encoding and sys.stdout.encoding.lower() != 'utf-8':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+PRODUCTS_FILE = Path('products.json')
+DESCRIPTIONS_FILE = Path('descriptions.json')
+DB_PATH = Path('.cache/catalog.db')
+# يُرفع عند تغيير قواعد التوحيد (validate_catalog.normalize_products) أو الجداول لإعادة الاستيراد
+CATALOG_VERSION = '2'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    id INTEGER PRIMARY KEY,
+    position INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    image_link TEXT,
+    price NUMERIC,
+    sale_price NUMERIC,
+    category TEXT,
+    data TEXT NOT NULL,
+    raw TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_products_position ON products(position);
+CREATE INDEX IF NOT EXISTS idx_products_category ON products(category);
+CREATE INDEX IF NOT EXISTS idx_products_updated ON products(updated_at);
+
+CREATE TABLE IF NOT EXISTS descriptions (
+    id TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_descriptions_updated ON descriptions(updated_at);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def _content_hash(value):
+    return hashlib.sha1(value.encode('utf-8')).hexdigest()
+
+
+def get_product_category(title):
+    """تحديد فئة المنتج بناءً على العنوان"""
+    title_lower = title.lower()
+    
+    if any(word in title_lower for word in ['شعر', 'شامبو', 'بلسم', 'زيت', 'ماسك', 'صبغة', 'حلاقة']):
+        return 'Health & Beauty > Personal Care > Hair Care', 'العناية بالشعر'
+    elif any(word in title_lower for word in ['بشرة', 'كريم', 'سيروم', 'واقي', 'مرطب', 'تفتيح', 'صابون', 'غسول', 'مكياج', 'روج', 'شفاه']):
+        return 'Health & Beauty > Personal Care > Cosmetics', 'العناية بالجمال'
+    elif any(word in title_lower for word in ['جهاز', 'ماكينة', 'آلة', 'كهربائي', 'قابل للشحن', 'شاحن', 'سماعة', 'كاميرا', 'جوال', 'تابلت', 'ساعة']):
+        return 'Electronics', 'الإلكترونيات'
+    elif any(word in title_lower for word in ['فيتامين', 'مكمل', 'كبسولات', 'حبوب', 'علاج', 'مشد', 'مصحح', 'ركبة', 'ظهر']):
+        return 'Health & Beauty > Health Care', 'الصحة والعافية'
+    elif any(word in title_lower for word in ['ملابس', 'شورت', 'قميص', 'حقيبة', 'نظارة', 'حذاء', 'جورب']):
+        return 'Apparel & Accessories', 'الأزياء والموضة'
+    else:
+        return 'Home & Garden', 'المنزل والأدوات'
+
+
+def _file_signature(path):
+    """بصمة سريعة للملف (الحجم + وقت التعديل) لمعرفة الحاجة لإعادة الاستيراد"""
+    if not path.exists():
+        return ''
+    stat = path.stat()
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+class CatalogStore:
+    """واجهة استعلام الكتالوج فوق SQLite"""
+
+    def __init__(self, db_path=DB_PATH):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.db_path))
+        self.conn.executescript(SCHEMA)
+        if self._get_meta('catalog_version') not in (None, CATALOG_VERSION):
+            # قاعدة من إصدار أقدم: إعادة إنشاء الجداول (تُملأ من ملفات JSON عند الاستيراد)
+            self.conn.executescript("DROP TABLE products; DROP TABLE descriptions; DELETE FROM meta;" + SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ------------------------------------------------------------------
+    # الاستيراد والتصدير
+    # ------------------------------------------------------------------
+
+    def _get_meta(self, key):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key, value):
+        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def is_stale(self, products_file=PRODUCTS_FILE, descriptions_file=DESCRIPTIONS_FILE):
+        """هل تغيرت ملفات JSON منذ آخر استيراد؟"""
+        return (self._get_meta('catalog_version') != CATALOG_VERSION
+                or self._get_meta('products_signature') != _file_signature(Path(products_file))
+                or self._get_meta('descriptions_signature') != _file_signature(Path(descriptions_file)))
+
+    def import_json(self, products_file=PRODUCTS_FILE, descriptions_file=DESCRIPTIONS_FILE):
+        """استيراد ملفات JSON: تحديث الصفوف المتغيرة فقط (updated_at يتغير للصفوف المعدلة فعلاً)
+
+        المنتجات تُفحص وتُوحد أولاً (validate_catalog) - CatalogValidationError إذا كانت غير صالحة.
+        """
+        from validate_catalog import normalize_products
+
+        now = time.time()
+        stats = {'products_changed': 0, 'products_deleted': 0, 'descriptions_changed': 0, 'descriptions_deleted': 0}
+        products_file, descriptions_file = Path(products_file), Path(descriptions_file)
+
+        with self.conn:
+            if products_file.exists():
+                with open(products_file, 'r', encoding='utf-8') as f:
+                    records = json.load(f)
+                products = normalize_products(records)
+                existing = dict(self.conn.execute("SELECT id, content_hash FROM products"))
+                seen = set()
+                for position, (record, product) in enumerate(zip(records, products)):
+                    raw = json.dumps(record, ensure_ascii=False)
+                    digest = _content_hash(raw)
+                    pid = product['id']
+                    seen.add(pid)
+                    if existing.get(pid) == digest:
+                        self.conn.execute("UPDATE products SET position = ? WHERE id = ?", (position, pid))
+                        continue
+                    title = product.get('title', '')
+                    self.conn.execute(
+                        "INSERT OR REPLACE INTO products "
+                        "(id, position, title, image_link, price, sale_price, category, data, raw, content_hash, updated_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (pid, position, title, product.get('image_link', ''), product.get('price'),
+                         product.get('sale_price'), get_product_category(title)[1],
+                         json.dumps(product, ensure_ascii=False), raw, digest, now)
+                    )
+                    stats['products_changed'] += 1
+                removed = [(pid,) for pid in existing if pid not in seen]
+                self.conn.executemany("DELETE FROM products WHERE id = ?", removed)
+                stats['products_deleted'] = len(removed)
+
+            if descriptions_file.exists():
+                with open(descriptions_file, 'r', encoding='utf-8') as f:
+                    descriptions = json.load(f)
+                existing = dict(self.conn.execute("SELECT id, content_hash FROM descriptions"))
+                for position, (key, text) in enumerate(descriptions.items()):
+                    key, text = str(key), str(text)
+                    digest = _content_hash(text)
+                    if existing.pop(key, None) == digest:
+                        self.conn.execute("UPDATE descriptions SET position = ? WHERE id = ?", (position, key))
+                        continue
+                    self.conn.execute(
+                        "INSERT OR REPLACE INTO descriptions (id, position, text, content_hash, updated_at) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (key, position, text, digest, now)
+                    )
+                    stats['descriptions_changed'] += 1
+                self.conn.executemany("DELETE FROM descriptions WHERE id = ?", [(key,) for key in existing])
+                stats['descriptions_deleted'] = len(existing)
+
+            self._set_meta('products_signature', _file_signature(products_file))
+            self._set_meta('descriptions_signature', _file_signature(descriptions_file))
+            self._set_meta('imported_at', str(now))
+            self._set_meta('catalog_version', CATALOG_VERSION)
+        return stats
+
+    def export_json(self, products_file=PRODUCTS_FILE, descriptions_file=DESCRIPTIONS_FILE):
+        """تصدير قاعدة البيانات إلى ملفات JSON بنفس ترتيب وتنسيق الملفات الأصلية (المنتجات كما استُوردت، بدون توحيد)"""
+        products = [json.loads(row[0]) for row in self.conn.execute("SELECT raw FROM products ORDER BY position")]
+        write_output(products_file, json.dumps(products, ensure_ascii=False, indent=2), durable=True)
+
+        descriptions = dict(self.conn.execute("SELECT id, text FROM descriptions ORDER BY position"))
+        write_output(descriptions_file, json.dumps(descriptions, ensure_ascii=False, indent=2), durable=True)
+
+        # الملفات المصدرة مطابقة لقاعدة البيانات، فلا داعي لإعادة استيرادها
+        with self.conn:
+            self._set_meta('products_signature', _file_signature(Path(products_file)))
+            self._set_meta('descriptions_signature', _file_signature(Path(descriptions_file)))
+        return len(products), len(descriptions)
+
+    # ------------------------------------------------------------------
+    # الاستعلام
+    # ------------------------------------------------------------------
+
+    def count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM products").fetchone()[0]
+
+    def ids(self):
+        """كل IDs المنتجات بترتيب الكتالوج"""
+        return [row[0] for row in self.conn.execute("SELECT id FROM products ORDER BY position")]
+
+    def price_columns(self):
+        """أعمدة الأسعار بترتيب الكتالوج: (ids, price, sale_price, category) لحسابات pricing.py المجمعة"""
+        rows = self.conn.execute("SELECT id, price, sale_price, category FROM products ORDER BY position").fetchall()
+        if not rows:
+            return [], [], [], []
+        return tuple(list(column) for column in zip(*rows))
+
+    def get(self, product_id):
+        """منتج واحد بالـ ID (أو None)"""
+        row = self.conn.execute("SELECT data FROM products WHERE id = ?", (int(product_id),)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def at_position(self, position):
+        """المنتج رقم position بترتيب products.json"""
+        row = self.conn.execute(
+            "SELECT data FROM products ORDER BY position LIMIT 1 OFFSET ?", (int(position),)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get_description(self, product_id):
+        """الوصف الخام لمنتج (نص فارغ إن لم يوجد)"""
+        row = self.conn.execute("SELECT text FROM descriptions WHERE id = ?", (str(product_id),)).fetchone()
+        return row[0] if row else ""
+
+    def descriptions(self):
+        """كل الأوصاف كقاموس (ID -> text) للمراحل التي تحتاجها كاملة"""
+        return dict(self.conn.execute("SELECT id, text FROM descriptions"))
+
+    def by_category(self, category):
+        """منتجات فئة معينة (اسم الفئة العربي كما في get_product_category)"""
+        rows = self.conn.execute("SELECT data FROM products WHERE category = ? ORDER BY position", (category,))
+        return [json.loads(row[0]) for row in rows]
+
+    def changed_since(self, timestamp):
+        """IDs المنتجات التي تغير بيانها أو وصفها بعد timestamp"""
+        rows = self.conn.execute(
+            "SELECT id FROM products WHERE updated_at > ? "
+            "UNION SELECT CAST(id AS INTEGER) FROM descriptions WHERE updated_at > ?",
+            (timestamp, timestamp)
+        )
+        return sorted(row[0] for row in rows)
+
+    def iter_products(self, page_size=500, with_descriptions=False):
+        """التكرار على المنتجات على دفعات (keyset pagination) بدون تحميل الكتالوج كاملاً
+
+        مع with_descriptions=True تُرجع (product, description) بدلاً من product.
+        """
+        last_position = -1
+        while True:
+            if with_descriptions:
+                rows = self.conn.execute(
+                    "SELECT p.position, p.data, COALESCE(d.text, '') FROM products p "
+                    "LEFT JOIN descriptions d ON d.id = CAST(p.id AS TEXT) "
+                    "WHERE p.position > ? ORDER BY p.position LIMIT ?",
+                    (last_position, page_size)
+                ).fetchall()
+            else:
+                rows = self.conn.execute(
+                    "SELECT position, data FROM products WHERE position > ? ORDER BY position LIMIT ?",
+                    (last_position, page_size)
+                ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                product = json.loads(row[1])
+                yield (product, row[2]) if with_descriptions else product
+            last_position = rows[-1][0]
+
+
+def open_catalog(db_path=DB_PATH, refresh=True):
+    """فتح مخزن الكتالوج مع استيراد تلقائي إذا تغيرت ملفات JSON"""
+    store = CatalogStore(db_path)
+    if refresh and store.is_stale():
+        stats = store.import_json()
+        if stats['products_changed'] or stats['descriptions_changed']:
+            print(f"🗄️ تحديث مخزن الكتالوج: {stats['products_changed']} منتج و {stats['descriptions_changed']} وصف")
+    return store
+
+
+def main():
+    command = sys.argv[1] if len(sys.argv) > 1 else 'import'
+    with CatalogStore() as store:
+        if command == 'import':
+            stats = store.import_json()
+            print(f"✅ تم الاستيراد: {store.count()} منتج")
+            print(f"   - منتجات متغيرة: {stats['products_changed']} | محذوفة: {stats['products_deleted']}")
+            print(f"   - أوصاف متغيرة: {stats['descriptions_changed']} | محذوفة: {stats['descriptions_deleted']}")
+        elif command == 'export':
+            products_count, descriptions_count = store.export_json()
+            print(f"✅ تم التصدير: {products_count} منتج و {descriptions_count} وصف")
+        else:
+            print("الاستخدام: python catalog_store.py [import|export]")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,8 @@ import re
 import sys
 from pathlib import Path
 
+from catalog_store import open_catalog
+
 # Fix encoding for Windows console
 if sys.platform == 'win32':
     sys.stdout.reconfigure(encoding='utf-8')
@@ -23,8 +25,8 @@ def check_404_issues():
     # 1. Check products.json
     print("\n[1] Checking products.json...")
     try:
-        with open('products.json', 'r', encoding='utf-8') as f:
-            products = json.load(f)
+        with open_catalog() as store:
+            products = list(store.iter_products())
         print(f"Found {len(products)} products in products.json")
     except Exception as e:
         print(f"Error reading products.json: {e}")
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+CSS الحرج (above the fold) مضمّن في الصفحة، وباقي الأنماط تُحمّل بدون حجب العرض
+
+- css/main.css هو المصدر؛ الناتج css/site.css بدون القواعد غير المستخدمة في أي صفحة مولدة
+  (تُعتبر القاعدة مستخدمة إذا ظهرت كل أسماء الـ class و id في محددها في HTML أو في نصوص السكربتات)
+- لكل نوع صفحة (منتج، المتجر، الصفحات الثابتة) تُستخرج القواعد المستخدمة قبل FOLD_MARKERS وتُضمّن في <style>
+- css/site.css وخط Tajawal (كان @import يحجب العرض) يُحمّلان بـ rel=preload ثم stylesheet
+  (أو @font-face مضمّن للخط المحلي من optimize_fonts.py إذا كان مبنياً)
+- الصفحات الثابتة وصفحات المنتجات تُحدّث بين <!-- critical-css --> و <!-- /critical-css -->؛
+  قالب صفحات المنتجات يستخدم stylesheet_tags() مباشرة من .cache/critical-css.json
+
+الاستخدام:
+    python critical_css.py
+"""
+
+import re
+import sys
+import json
+from pathlib import Path
+
+from output_writer import write_output
+from fingerprint_assets import asset_url
+from optimize_fonts import font_face_css, font_preload_tags
+
+# Force UTF-8 for output to avoid encoding errors on Windows
+if sys.stdout.encoding and sys.stdout.encoding.lower() != 'utf-8':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+SOURCE_CSS = Path('css/main.css')
+SITE_CSS = 'css/site.css'
+STATE_FILE = Path('.cache/critical-css.json')
+
+PAGE_TYPES = {
+    'storefront': ['index.html'],
+    'static': ['about.html', 'contact.html', 'privacy.html', 'terms.html', 'shipping.html',
+               'return-policy.html', 'reviews.html', '404.html'],
+}
+# حد "أعلى الصفحة" لكل نوع: كل ما قبل هذا النص في <body>
+FOLD_MARKERS = {
+    'product': 'class="product-faq"',
+    'storefront': 'id="productsGrid"',
+    'static': '<footer',
+}
+# عدد صفحات المنتجات المستخدمة لاستخراج CSS الحرج (كلها من نفس القالب)
+PRODUCT_SAMPLE = 20
+
+BLOCK_START = '<!-- critical-css -->'
+BLOCK_END = '<!-- /critical-css -->'
+STYLESHEET_BLOCK = re.compile(
+    re.escape(BLOCK_START) + r'.*?' + re.escape(BLOCK_END)
+    + r'|<link rel="stylesheet" href="(?:\.\./)?css/main\.css">',
+    re.DOTALL,
+)
+
+COMMENT = re.compile(r'/\*.*?\*/', re.DOTALL)
+CLASS_ATTR = re.compile(r'''\b(?:class|id)\s*=\s*["']([^"']*)["']''')
+SCRIPT = re.compile(r'<script\b[^>]*>(.*?)</script>', re.DOTALL | re.IGNORECASE)
+STRING_LITERAL = re.compile(r'''(["'`])((?:\\.|(?!\1).)*?)\1''', re.DOTALL)
+SELECTOR_NAMES = re.compile(r'[.#]((?:\\.|[\w-])+)')
+
+_state = None
+
+
+def load_state():
+    """ناتج آخر تشغيل (CSS الحرج لكل نوع + روابط الخطوط) أو {} قبل أول بناء"""
+    global _state
+    if _state is None:
+        try:
+            with open(STATE_FILE, 'r', encoding='utf-8') as f:
+                _state = json.load(f)
+        except Exception:
+            _state = {}
+    return _state
+
+
+def stylesheet_tags(prefix='', page_type='product'):
+    """وسوم CSS لرأس الصفحة: CSS حرج مضمّن + تحميل غير حاجب (أو الرابط العادي قبل أول بناء)"""
+    state = load_state()
+    critical = state.get('critical', {}).get(page_type)
+    if critical is None:
+        return f'<link rel="stylesheet" href="{prefix}css/main.css">'
+
+    # خطوط محلية من optimize_fonts.py بدلاً من Google Fonts إذا كانت مبنية
+    font_faces = font_face_css(prefix)
+    fonts = [] if font_faces else state.get('fonts', [])
+    async_sheets = [f'{prefix}{asset_url(SITE_CSS)}'] + fonts
+    lines = [BLOCK_START]
+    if fonts:
+        lines.append('<link rel="preconnect" href="https://fonts.googleapis.com">')
+        lines.append('<link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>')
+    lines.extend(font_preload_tags(prefix))
+    lines.append(f'<style>{font_faces}{critical}</style>')
+    for href in async_sheets:
+        lines.append(f'<link rel="preload" href="{href}" as="style" onload="this.onload=null;this.rel=\'stylesheet\'">')
+    lines.append('<noscript>' + ''.join(f'<link rel="stylesheet" href="{href}">' for href in async_sheets) + '</noscript>')
+    lines.append(BLOCK_END)
+    return '\n    '.join(lines)
+
+
+# ----------------------------------------------------------------------
+# قراءة CSS
+# ----------------------------------------------------------------------
+
+def _scan(text, pos, stops):
+    """أول موضع لأحد الأحرف stops خارج النصوص والأقواس"""
+    quote = None
+    depth = 0
+    while pos < len(text):
+        char = text[pos]
+        if quote:
+            if char == '\\':
+                pos += 1
+            elif char == quote:
+                quote = None
+        elif char in '"\'':
+            quote = char
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif depth == 0 and char in stops:
+            return pos
+        pos += 1
+    return pos
+
+
+def _matching_brace(text, pos):
+    """موضع } المطابق لـ { في pos (لـ @keyframes و @font-face)"""
+    depth = 0
+    while pos < len(text):
+        pos = _scan(text, pos, '{}')
+        if pos >= len(text):
+            break
+        depth += 1 if text[pos] == '{' else -1
+        if depth == 0:
+            return pos
+        pos += 1
+    return len(text)
+
+
+def _minify(declarations):
+    declarations = re.sub(r'\s+', ' ', declarations).strip()
+    declarations = re.sub(r'\s*([;:,{}>])\s*', r'\1', declarations)
+    return declarations.rstrip(';')
+
+
+def parse_css(text, pos=0):
+    """عُقد CSS: ('rule', [selectors], body) | ('block', prelude, [children]) | ('raw', text) | ('import', url)"""
+    nodes = []
+    while pos < len(text):
+        while pos < len(text) and text[pos].isspace():
+            pos += 1
+        if pos >= len(text):
+            break
+        if text[pos] == '}':
+            return nodes, pos + 1
+
+        end = _scan(text, pos, '{;}')
+        prelude = ' '.join(text[pos:end].split())
+        if end >= len(text) or text[end] != '{':
+            if prelude.startswith('@import'):
+                match = re.search(r'''url\(\s*['"]?([^'")]+)['"]?\s*\)|@import\s+['"]([^'"]+)['"]''', prelude)
+                nodes.append(('import', match.group(1) or match.group(2)))
+            elif prelude.startswith('@'):
+                nodes.append(('raw', prelude + ';'))
+            pos = end + 1
+            continue
+
+        if prelude.startswith(('@media', '@supports')):
+            children, pos = parse_css(text, end + 1)
+            nodes.append(('block', prelude, children))
+        elif prelude.startswith('@'):
+            close = _matching_brace(text, end)
+            nodes.append(('raw', prelude + '{' + _minify(text[end + 1:close]) + '}'))
+            pos = close + 1
+        else:
+            close = _scan(text, end + 1, '}')
+            selectors = [s.strip() for s in prelude.split(',') if s.strip()]
+            nodes.append(('rule', selectors, _minify(text[end + 1:close])))
+            pos = close + 1
+    return nodes, pos
+
+
+def load_css(path=SOURCE_CSS):
+    nodes, _ = parse_css(COMMENT.sub('', path.read_text(encoding='utf-8')))
+    return nodes
+
+
+# ----------------------------------------------------------------------
+# الاستخدام
+# ----------------------------------------------------------------------
+
+def html_tokens(content):
+    """أسماء class و id في HTML + كل الكلمات في نصوص السكربتات (أسماء تُضاف بـ JavaScript)"""
+    tokens = set()
+    for value in CLASS_ATTR.findall(content):
+        tokens.update(value.split())
+    for script in SCRIPT.findall(content):
+        for _, literal in STRING_LITERAL.findall(script):
+            tokens.update(re.findall(r'[\w-]+', literal))
+    return tokens
+
+
+def above_fold(content, page_type):
+    """HTML أعلى الصفحة: <head> + بداية <body> حتى علامة النوع"""
+    marker = content.find(FOLD_MARKERS[page_type])
+    return content if marker == -1 else content[:marker]
+
+
+def selector_used(selector, tokens):
+    names = SELECTOR_NAMES.findall(selector)
+    return all(name.replace('\\', '') in tokens for name in names)
+
+
+def filter_nodes(nodes, tokens, critical=False):
+    """CSS الناتج: القواعد التي تطابق tokens فقط (critical=True يستبعد @keyframes وما شابه)"""
+    output = []
+    for node in nodes:
+        if node[0] == 'rule':
+            selectors = [s for s in node[1] if selector_used(s, tokens)]
+            if selectors and node[2]:
+                output.append(','.join(selectors) + '{' + node[2] + '}')
+        elif node[0] == 'block':
+            inner = filter_nodes(node[2], tokens, critical)
+            if inner:
+                output.append(node[1] + '{' + inner + '}')
+        elif node[0] == 'raw' and not critical:
+            output.append(node[1])
+    return ''.join(output)
+
+
+# ----------------------------------------------------------------------
+# البناء
+# ----------------------------------------------------------------------
+
+def page_files():
+    """{نوع الصفحة: [ملفات]} - صفحات المنتجات حسب الكتالوج الحالي"""
+    from validate_pages import catalog_pages
+    files = {page_type: [Path(p) for p in pages if Path(p).exists()] for page_type, pages in PAGE_TYPES.items()}
+    files['product'] = [path for path in catalog_pages() if path.exists()]
+    return files
+
+
+def rewrite_page(path, page_type, prefix):
+    content = path.read_text(encoding='utf-8')
+    tags = stylesheet_tags(prefix, page_type)
+    updated = STYLESHEET_BLOCK.sub(lambda m: tags, content, count=1)
+    return write_output(path, updated)
+
+
+def build():
+    global _state
+    nodes = load_css()
+    fonts = [node[1] for node in nodes if node[0] == 'import']
+    files = page_files()
+
+    used = set()
+    critical_tokens = {}
+    for page_type, paths in files.items():
+        critical_tokens[page_type] = set()
+        for index, path in enumerate(paths):
+            content = path.read_text(encoding='utf-8')
+            used |= html_tokens(content)
+            if page_type != 'product' or index < PRODUCT_SAMPLE:
+                critical_tokens[page_type] |= html_tokens(above_fold(content, page_type))
+
+    site_css = filter_nodes(nodes, used)
+    write_output(SITE_CSS, site_css)
+    _state = {
+        'fonts': fonts,
+        'critical': {page_type: filter_nodes(nodes, tokens, critical=True)
+                     for page_type, tokens in critical_tokens.items()},
+    }
+    write_output(STATE_FILE, json.dumps(_state, ensure_ascii=False, indent=2))
+
+    rewritten = 0
+    for page_type, paths in files.items():
+        prefix = '../' if page_type == 'product' else ''
+        rewritten += sum(1 for path in paths if rewrite_page(path, page_type, prefix))
+    return site_css, rewritten, sum(len(paths) for paths in files.values())
+
+
+def main():
+    import time
+    start_time = time.time()
+    source_size = SOURCE_CSS.stat().st_size
+    site_css, rewritten, pages = build()
+    print(f"🎨 {SOURCE_CSS}: {source_size / 1024:.1f} KB => {SITE_CSS}: {len(site_css.encode('utf-8')) / 1024:.1f} KB")
+    for page_type, critical in load_state()['critical'].items():
+        print(f"   CSS حرج ({page_type}): {len(critical.encode('utf-8')) / 1024:.1f} KB")
+    print(f"✅ {pages} صفحة، {rewritten} منها تحدثت ({time.time() - start_time:.2f} ثانية)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+كاش الأوصاف المنظفة - كل وصف يُنظف مرة واحدة لكل صيغة ويُحفظ بين عمليات البناء
+
+المفتاح: hash (العنوان + الوصف الخام)، والقيمة: الصيغ المطلوبة فقط
+    html : وصف صفحة المنتج (generate_all_pages)
+    meta : أول 160 حرف لوسم description في الصفحة
+    og   : أول 200 حرف لوسم og:description
+    seo  : وصف Product Schema (seo_optimizer)
+    feed : وصف فيد Google والقنوات الأخرى (fix_feed_gmc) - يُستدعى بالعنوان المنظف
+
+المراحل تستدعي prepare() في العملية الرئيسية قبل توزيع العمل على العمال ثم save()،
+فالعمال (fork) يرثون الكاش في الذاكرة ولا يعيدون التنظيف.
+"""
+
+import re
+import html
+import json
+import time
+import hashlib
+from pathlib import Path
+
+from output_writer import write_output
+
+CACHE_FILE = Path('.cache/descriptions-clean.json')
+# يُرفع عند تغيير قواعد التنظيف لإبطال الكاش القديم
+CACHE_VERSION = 1
+# الصيغ التي لم تُستخدم منذ هذه المدة تُحذف عند الحفظ
+MAX_UNUSED_DAYS = 30
+
+_cache = None
+_dirty = False
+
+
+def _base(title, description):
+    """الوصف بعد escape وحذف العنوان المكرر من بدايته، أو None إذا كان قصيراً جداً"""
+    clean_title = html.escape(str(title).strip())
+    description = html.escape(str(description))
+
+    if description.startswith(clean_title):
+        description = description[len(clean_title):].lstrip(' :-,.،')
+
+    if len(description) < 10:
+        return None
+    return description
+
+
+def _short(title):
+    return f"اكتشف {html.escape(str(title))} - منتج عالي الجودة متوفر الآن في السوق السعودي بخصم حصري وتوصيل سريع."
+
+
+def _missing(title):
+    return f"{html.escape(str(title))} - منتج عالي الجودة متوفر الآن في السوق السعودي بتوصيل سريع."
+
+
+def clean_html(title, description):
+    if not description:
+        return ""
+    base = _base(title, description)
+    return _short(title) if base is None else base.strip()
+
+
+def clean_seo(title, description):
+    if not description:
+        return _missing(title)
+    base = _base(title, description)
+    return _short(title) if base is None else base
+
+
+def clean_feed(title, description):
+    if not description:
+        return _missing(title)
+    base = _base(title, description)
+    if base is None:
+        return _short(title)
+    return re.sub(r'[^\w\s\.\,\!\?\% ر.س]', '', base)[:4900]
+
+
+VARIANTS = {
+    'html': clean_html,
+    'meta': lambda title, description: clean_html(title, description)[:160].replace('"', '&quot;'),
+    'og': lambda title, description: clean_html(title, description)[:200].replace('"', '&quot;'),
+    'seo': clean_seo,
+    'feed': clean_feed,
+}
+
+
+def _today():
+    return int(time.time() // 86400)
+
+
+def _key(title, description):
+    return hashlib.sha1(f"{title}\0{description}".encode('utf-8')).hexdigest()
+
+
+def load_cache():
+    """تحميل الكاش من القرص (مرة واحدة لكل عملية)"""
+    global _cache
+    if _cache is None:
+        try:
+            with open(CACHE_FILE, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            _cache = data['entries'] if data.get('version') == CACHE_VERSION else {}
+        except Exception:
+            _cache = {}
+    return _cache
+
+
+def cleaned(title, description, variant):
+    """صيغة الوصف المنظف من الكاش (تُحسب وتُضاف إذا لم تكن موجودة)"""
+    global _dirty
+    entry = load_cache().setdefault(_key(title, description or ''), {})
+    today = _today()
+    if variant not in entry:
+        entry[variant] = VARIANTS[variant](title, description)
+        _dirty = True
+    if entry.get('used') != today:
+        entry['used'] = today
+        _dirty = True
+    return entry[variant]
+
+
+def prepare(pairs, variants):
+    """تجهيز صيغ كل المنتجات قبل المعالجة المتوازية: pairs = [(title, description)]"""
+    cache = load_cache()
+    before = sum(1 for entry in cache.values() for name in variants if name in entry)
+    count = 0
+    for title, description in pairs:
+        for variant in variants:
+            cleaned(title, description, variant)
+            count += 1
+    computed = sum(1 for entry in cache.values() for name in variants if name in entry) - before
+    print(f"🧹 الأوصاف: {count - computed} من الكاش، {computed} تنظيف جديد")
+
+
+def save_cache():
+    """حفظ الكاش إذا تغير، مع حذف الأوصاف غير المستخدمة منذ MAX_UNUSED_DAYS"""
+    global _dirty
+    if _cache is None or not _dirty:
+        return
+    cutoff = _today() - MAX_UNUSED_DAYS
+    entries = {key: entry for key, entry in _cache.items() if entry.get('used', 0) >= cutoff}
+    data = {'version': CACHE_VERSION, 'entries': entries}
+    write_output(CACHE_FILE, json.dumps(data, ensure_ascii=False, separators=(',', ':')))
+    _dirty = False
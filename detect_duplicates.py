@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+كشف المنتجات المكررة والمتشابهة قبل توليد الصفحات والفيد
+
+- توقيعات MinHash + LSH على العنوان والوصف بعد تطبيع النص العربي
+- بصمة dHash للصور المخزنة محلياً في .cache/images مع LSH على أجزاء البصمة
+- لا توجد مقارنة بين كل الأزواج: فقط المرشحون الذين يتشاركون bucket واحد على الأقل
+
+المخرجات:
+- reports/duplicates.json : قائمة آلية يقرأها generate_all_pages.py و fix_feed_gmc.py
+- reports/duplicates.txt  : تقرير مقروء للمراجعة
+
+الاستخدام:
+    python detect_duplicates.py                 # نصوص + الصور المخزنة مسبقاً
+    python detect_duplicates.py --fetch-images  # تحميل الصور الناقصة إلى الكاش أولاً
+"""
+
+import json
+import re
+import sys
+import zlib
+import argparse
+import urllib.request
+from pathlib import Path
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+from build_profile import profiled
+from catalog_store import open_catalog
+from output_writer import write_output
+
+# Force UTF-8 for output to avoid encoding errors on Windows
+if sys.stdout.encoding and sys.stdout.encoding.lower() != 'utf-8':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+CACHE_DIR = Path('.cache')
+IMAGE_CACHE_DIR = CACHE_DIR / 'images'
+IMAGE_HASHES_FILE = CACHE_DIR / 'image-hashes.json'
+REPORTS_DIR = Path('reports')
+DUPLICATES_FILE = REPORTS_DIR / 'duplicates.json'
+REPORT_FILE = REPORTS_DIR / 'duplicates.txt'
+
+# MinHash: 128 دالة مقسمة إلى 16 band × 8 صفوف => عتبة التقاط تقريبية ~0.7
+NUM_PERM = 128
+LSH_BANDS = 16
+TEXT_THRESHOLD = 0.8
+# الأوصاف قالبية جداً في الكتالوج، لذلك يُشترط تطابق العنوان والصورة أيضاً لتفادي دمج منتجات مختلفة:
+# نفس الصورة (نفس الرابط أو dHash قريب) مع عنوان مطابق بعد التطبيع، أو عنوان متشابه (>= TITLE_THRESHOLD) ونفس السعر
+# (نفس العنوان بصور مختلفة = ألوان/مقاسات، والعناوين المتشابهة جداً قد تكون موديلات مختلفة: "15 pro max" و "15 pro")
+TITLE_THRESHOLD = 0.9
+
+# dHash بطول 64 بت مقسمة إلى 5 أجزاء => أي زوج بمسافة <= 4 يتشارك جزءاً واحداً على الأقل
+IMAGE_BANDS = 5
+IMAGE_THRESHOLD = 4
+
+# buckets الضخمة غالباً نصوص قالبية مشتركة وليست تكراراً حقيقياً
+MAX_BUCKET_SIZE = 200
+
+_ARABIC_DIACRITICS = re.compile(r'[\u064B-\u0652\u0670\u0640]')
+_ARABIC_CHARS = str.maketrans({
+    'أ': 'ا', 'إ': 'ا', 'آ': 'ا', 'ٱ': 'ا',
+    'ى': 'ي', 'ئ': 'ي', 'ؤ': 'و', 'ة': 'ه',
+    '٠': '0', '١': '1', '٢': '2', '٣': '3', '٤': '4',
+    '٥': '5', '٦': '6', '٧': '7', '٨': '8', '٩': '9',
+})
+
+
+def normalize_arabic(text):
+    """تطبيع النص العربي: حذف التشكيل والتطويل وتوحيد الألف والياء والتاء المربوطة"""
+    text = _ARABIC_DIACRITICS.sub('', str(text or ''))
+    text = text.translate(_ARABIC_CHARS).lower()
+    text = re.sub(r'[^\w\s]', ' ', text)
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def text_shingles(title, description):
+    """مجموعة shingles من كلمات العنوان (مفردة وثنائية) وثلاثيات كلمات الوصف"""
+    title_words = normalize_arabic(title).split()
+    desc_words = normalize_arabic(description).split()
+
+    shingles = {f"t:{w}" for w in title_words}
+    shingles.update(f"t:{a} {b}" for a, b in zip(title_words, title_words[1:]))
+    shingles.update(f"d:{a} {b} {c}" for a, b, c in zip(desc_words, desc_words[1:], desc_words[2:]))
+    return shingles
+
+
+def minhash_signatures(shingle_sets, num_perm=NUM_PERM, seed=1):
+    """حساب توقيعات MinHash لكل المنتجات (مصفوفة n × num_perm) باستخدام multiply-shift hashing"""
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, 2**63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+    b = rng.integers(0, 2**63, size=num_perm, dtype=np.uint64)
+
+    signatures = np.full((len(shingle_sets), num_perm), np.iinfo(np.uint32).max, dtype=np.uint32)
+    with np.errstate(over='ignore'):
+        for i, shingles in enumerate(shingle_sets):
+            if not shingles:
+                continue
+            x = np.fromiter((zlib.crc32(s.encode('utf-8')) for s in shingles), dtype=np.uint64, count=len(shingles))
+            hashed = (np.outer(x, a) + b) >> np.uint64(32)
+            signatures[i] = hashed.min(axis=0).astype(np.uint32)
+    return signatures
+
+
+def lsh_candidate_pairs(keys_per_band):
+    """استخراج الأزواج المرشحة من buckets كل band (بدون مقارنة كل الأزواج)"""
+    pairs = set()
+    for band_keys in keys_per_band:
+        buckets = defaultdict(list)
+        for idx, key in enumerate(band_keys):
+            if key is not None:
+                buckets[key].append(idx)
+        for members in buckets.values():
+            if len(members) < 2 or len(members) > MAX_BUCKET_SIZE:
+                continue
+            for i in range(len(members)):
+                for j in range(i + 1, len(members)):
+                    pairs.add((members[i], members[j]))
+    return pairs
+
+
+def find_text_duplicates(products, descriptions, hashes=None):
+    """أزواج المنتجات المتشابهة نصياً (تشابه Jaccard تقديري للنص والعنوان فوق العتبات) وبنفس الصورة"""
+    shingle_sets = [
+        text_shingles(p.get('title', ''), descriptions.get(str(p.get('id')), ''))
+        for p in products
+    ]
+    signatures = minhash_signatures(shingle_sets)
+    title_signatures = minhash_signatures([text_shingles(p.get('title', ''), '') for p in products])
+    rows = NUM_PERM // LSH_BANDS
+
+    keys_per_band = []
+    for band in range(LSH_BANDS):
+        chunk = signatures[:, band * rows:(band + 1) * rows]
+        keys_per_band.append([
+            chunk[i].tobytes() if shingle_sets[i] else None
+            for i in range(len(products))
+        ])
+
+    pairs = {}
+    for i, j in lsh_candidate_pairs(keys_per_band):
+        similarity = float(np.mean(signatures[i] == signatures[j]))
+        if similarity < TEXT_THRESHOLD:
+            continue
+        distance = None
+        if hashes and hashes[i] is not None and hashes[j] is not None:
+            distance = bin(hashes[i] ^ hashes[j]).count('1')
+        if same_listing(products[i], products[j], np.mean(title_signatures[i] == title_signatures[j]), distance):
+            pairs[(i, j)] = similarity
+    return pairs
+
+
+def same_listing(a, b, title_similarity, image_distance=None):
+    """هل المنتجان نفس المنتج فعلاً (وليس لونين/مقاسين أو موديلين بعنوانين متقاربين)
+
+    image_distance: مسافة Hamming بين بصمتي الصورتين إن كانتا في الكاش
+    """
+    same_image = ((a.get('image_link') and a.get('image_link') == b.get('image_link'))
+                  or (image_distance is not None and image_distance <= IMAGE_THRESHOLD))
+    if not same_image:
+        return False
+    if normalize_arabic(a.get('title', '')) == normalize_arabic(b.get('title', '')):
+        return True
+    return title_similarity >= TITLE_THRESHOLD and a.get('sale_price') == b.get('sale_price')
+
+
+def image_cache_path(product):
+    """مسار الصورة المخزنة محلياً لمنتج"""
+    return IMAGE_CACHE_DIR / f"{product['id']}.jpg"
+
+
+def fetch_image(product):
+    """تحميل صورة منتج إلى الكاش إن لم تكن موجودة"""
+    path = image_cache_path(product)
+    url = product.get('image_link', '')
+    if path.exists() or not url:
+        return False
+    try:
+        with urllib.request.urlopen(url, timeout=15) as response:
+            path.write_bytes(response.read())
+        return True
+    except Exception as e:
+        print(f"⚠️ فشل تحميل صورة المنتج {product['id']}: {e}")
+        return False
+
+
+def dhash(path, hash_size=8):
+    """حساب بصمة dHash (64 بت) لصورة"""
+    with Image.open(path) as img:
+        img = img.convert('L').resize((hash_size + 1, hash_size), Image.LANCZOS)
+        pixels = np.asarray(img, dtype=np.int16)
+    bits = (pixels[:, 1:] > pixels[:, :-1]).flatten()
+    return int(''.join('1' if b else '0' for b in bits), 2)
+
+
+def load_image_hashes():
+    """تحميل بصمات الصور المحسوبة سابقاً (مفتاحها رابط الصورة)"""
+    if not IMAGE_HASHES_FILE.exists():
+        return {}
+    try:
+        with open(IMAGE_HASHES_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return {}
+
+
+def compute_image_hashes(products):
+    """بصمات الصور لكل المنتجات التي لها صورة في الكاش، مع إعادة استخدام البصمات المحفوظة"""
+    stored = load_image_hashes()
+    hashes = [None] * len(products)
+    updated = False
+
+    for i, product in enumerate(products):
+        url = product.get('image_link', '')
+        path = image_cache_path(product)
+        if url in stored:
+            hashes[i] = int(stored[url], 16)
+        elif path.exists():
+            try:
+                hashes[i] = dhash(path)
+                stored[url] = f"{hashes[i]:016x}"
+                updated = True
+            except Exception as e:
+                print(f"⚠️ تعذر قراءة صورة المنتج {product['id']}: {e}")
+
+    if updated:
+        write_output(IMAGE_HASHES_FILE, json.dumps(stored))
+    return hashes
+
+
+def find_image_duplicates(hashes):
+    """أزواج الصور المتطابقة تقريباً (مسافة Hamming <= IMAGE_THRESHOLD)"""
+    bits_per_band = -(-64 // IMAGE_BANDS)
+    mask = (1 << bits_per_band) - 1
+
+    keys_per_band = []
+    for band in range(IMAGE_BANDS):
+        shift = band * bits_per_band
+        keys_per_band.append([None if h is None else (h >> shift) & mask for h in hashes])
+
+    pairs = {}
+    for i, j in lsh_candidate_pairs(keys_per_band):
+        distance = bin(hashes[i] ^ hashes[j]).count('1')
+        if distance <= IMAGE_THRESHOLD:
+            pairs[(i, j)] = distance
+    return pairs
+
+
+def build_clusters(n, pair_groups):
+    """تجميع الأزواج في مجموعات (union-find) مع سبب التكرار لكل مجموعة"""
+    parent = list(range(n))
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for pairs in pair_groups.values():
+        for i, j in pairs:
+            root_i, root_j = find(i), find(j)
+            if root_i != root_j:
+                parent[max(root_i, root_j)] = min(root_i, root_j)
+
+    reasons = defaultdict(set)
+    for reason, pairs in pair_groups.items():
+        for i, _ in pairs:
+            reasons[find(i)].add(reason)
+
+    clusters = defaultdict(list)
+    for i in range(n):
+        clusters[find(i)].append(i)
+    return [(members, sorted(reasons[root])) for root, members in clusters.items() if len(members) > 1]
+
+
+@profiled
+def detect_duplicates(products, descriptions):
+    """كشف المجموعات المكررة وإرجاع قائمة قابلة للحفظ"""
+    hashes = compute_image_hashes(products)
+    pair_groups = {
+        'text': find_text_duplicates(products, descriptions, hashes),
+        'image': find_image_duplicates(hashes),
+    }
+
+    clusters = []
+    for members, reasons in build_clusters(len(products), pair_groups):
+        members.sort(key=lambda i: products[i]['id'])
+        clusters.append({
+            'keep': products[members[0]]['id'],
+            'duplicates': [products[i]['id'] for i in members[1:]],
+            'reasons': reasons,
+            'titles': [products[i]['title'].strip() for i in members],
+        })
+
+    clusters.sort(key=lambda c: c['keep'])
+    exclude_ids = sorted(pid for c in clusters for pid in c['duplicates'])
+    return {'clusters': clusters, 'exclude_ids': exclude_ids}
+
+
+def write_report(result, total):
+    """كتابة التقرير المقروء والقائمة الآلية"""
+    write_output(DUPLICATES_FILE, json.dumps(result, ensure_ascii=False, indent=2))
+
+    lines = [
+        f"إجمالي المنتجات: {total}",
+        f"مجموعات مكررة: {len(result['clusters'])}",
+        f"منتجات مستبعدة: {len(result['exclude_ids'])}",
+        "",
+    ]
+    for cluster in result['clusters']:
+        ids = [cluster['keep']] + cluster['duplicates']
+        lines.append(f"[{'+'.join(cluster['reasons'])}] keep={cluster['keep']} drop={cluster['duplicates']}")
+        for pid, title in zip(ids, cluster['titles']):
+            lines.append(f"    {pid}: {title}")
+    write_output(REPORT_FILE, '\n'.join(lines) + '\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='كشف المنتجات المكررة')
+    parser.add_argument('--fetch-images', action='store_true', help='تحميل الصور الناقصة إلى .cache/images')
+    args = parser.parse_args()
+
+    try:
+        with open_catalog() as store:
+            products = list(store.iter_products())
+            descriptions = store.descriptions()
+    except Exception as e:
+        print(f"❌ خطأ في قراءة كتالوج المنتجات: {e}")
+        sys.exit(1)
+
+    if args.fetch_images:
+        IMAGE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            fetched = sum(executor.map(fetch_image, products))
+        print(f"📥 تم تحميل {fetched} صورة جديدة إلى الكاش")
+
+    result = detect_duplicates(products, descriptions)
+    write_report(result, len(products))
+
+    print(f"🔍 مجموعات مكررة: {len(result['clusters'])}")
+    print(f"🚫 منتجات مستبعدة من الصفحات والفيد: {len(result['exclude_ids'])}")
+    print(f"📄 التقرير: {REPORT_FILE}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+وضع المراقبة وخادم التطوير المحلي (python build.py --watch)
+
+- عملية واحدة دافئة: الكتالوج والأوصاف وفهرس المنتجات المشابهة في الذاكرة
+- مراقبة الملفات بالـ polling: products.json و descriptions.json و config.json
+  وقوالب الصفحات (generate_all_pages.py و seo_optimizer.py) و css/main.css
+- صفحات المنتجات تُولد عند الطلب من الذاكرة بالقالب الحالي => المعاينة فورية بعد أي تعديل
+- تعديل الكتالوج يعيد كتابة صفحات المنتجات المتغيرة فقط على القرص ثم الفيد و sitemap
+- تعديل القالب يعيد تحميله ويعيد كتابة كل الصفحات في الخلفية
+- تعديل css/main.css يعيد بناء CSS الحرج و css/site.css (critical_css.py) ثم البصمات (fingerprint_assets.py)
+- إعادة تحميل المتصفح تلقائياً (Server-Sent Events) بعد كل تغيير
+
+ملاحظة: "منتجات مشابهة" للمنتجات الأخرى لا يُعاد حسابها هنا - تتحدث مع build.py الكامل.
+"""
+
+import os
+import sys
+import time
+import threading
+import importlib
+from pathlib import Path
+from urllib.parse import unquote, urlparse
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+import generate_all_pages
+import seo_optimizer
+from catalog_store import open_catalog
+from output_writer import write_output
+
+# Force UTF-8 for output to avoid encoding errors on Windows
+if sys.stdout.encoding and sys.stdout.encoding.lower() != 'utf-8':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+POLL_INTERVAL = 0.25
+CATALOG_FILES = ['products.json', 'descriptions.json']
+TEMPLATE_FILES = ['generate_all_pages.py', 'seo_optimizer.py', 'config.json']
+STATIC_FILES = ['css/main.css']
+
+LIVE_RELOAD_PATH = '/__livereload'
+LIVE_RELOAD_SCRIPT = f"""<script>
+(function() {{
+    var source = new EventSource('{LIVE_RELOAD_PATH}');
+    var version = null;
+    source.onmessage = function(e) {{
+        if (version !== null && e.data !== version) location.reload();
+        version = e.data;
+    }};
+}})();
+</script>
+</body>"""
+
+
+class SiteState:
+    """الكتالوج في الذاكرة + رقم إصدار يتغير مع كل تعديل (لإعادة تحميل المتصفح)"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.changed = threading.Condition(self.lock)
+        self.version = 0
+        self.products = {}
+        self.descriptions = {}
+        self.load_catalog()
+
+    def load_catalog(self):
+        excluded_ids = generate_all_pages.load_excluded_duplicates()
+        self.products = {}
+        self.descriptions = {}
+        with open_catalog() as store:
+            for product, description in store.iter_products(with_descriptions=True):
+                if product.get('id') not in excluded_ids:
+                    self.products[product['id']] = product
+                    self.descriptions[product['id']] = description
+        self.related_index = generate_all_pages.load_related_index()
+        self.lb_schema = seo_optimizer.create_local_business_schema()
+        self.slugs = {generate_all_pages.create_slug(p): pid for pid, p in self.products.items()}
+
+    def refresh_catalog(self):
+        """إعادة استيراد ملفات JSON وتحديث المنتجات المتغيرة فقط: يُرجع (المتغيرة، المحذوفة)"""
+        since = time.time()
+        excluded_ids = generate_all_pages.load_excluded_duplicates()
+        # اتصال SQLite لكل تحديث لأن خيط المراقبة غير خيط التحميل الأول
+        with open_catalog(refresh=False) as store:
+            store.import_json()
+            current_ids = set(store.ids()) - excluded_ids
+            removed = [pid for pid in self.products if pid not in current_ids]
+            changed = [pid for pid in store.changed_since(since) if pid in current_ids]
+            for pid in removed:
+                page = Path('products') / f"{generate_all_pages.create_slug(self.products.pop(pid))}.html"
+                self.descriptions.pop(pid, None)
+                if page.exists():
+                    page.unlink()
+            for pid in changed:
+                old = self.products.get(pid)
+                self.products[pid] = store.get(pid)
+                self.descriptions[pid] = store.get_description(pid)
+                # تغير العنوان يغير اسم الملف
+                if old and generate_all_pages.create_slug(old) != generate_all_pages.create_slug(self.products[pid]):
+                    old_page = Path('products') / f"{generate_all_pages.create_slug(old)}.html"
+                    if old_page.exists():
+                        old_page.unlink()
+        self.slugs = {generate_all_pages.create_slug(p): pid for pid, p in self.products.items()}
+        return changed, removed
+
+    def render(self, product_id):
+        """صفحة منتج كاملة (القالب + SEO) كما يكتبها build.py"""
+        product = self.products[product_id]
+        descriptions = {str(product_id): self.descriptions.get(product_id, '')}
+        related = generate_all_pages.get_related_products(product, self.related_index, self.products)
+        return generate_all_pages.render_product_page(product, descriptions, related, self.lb_schema)
+
+    def write_page(self, product_id):
+        slug = generate_all_pages.create_slug(self.products[product_id])
+        write_output(Path('products') / f"{slug}.html", self.render(product_id))
+
+    def bump(self):
+        with self.changed:
+            self.version += 1
+            self.changed.notify_all()
+
+
+def make_handler(state):
+    class DevHandler(SimpleHTTPRequestHandler):
+        """ملفات الموقع من القرص، وصفحات المنتجات من الذاكرة، + سكريبت إعادة التحميل"""
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            path = unquote(urlparse(self.path).path)
+            if path == LIVE_RELOAD_PATH:
+                return self.send_events()
+            if path.startswith('/products/') and path.endswith('.html'):
+                slug = path[len('/products/'):-len('.html')]
+                product_id = state.slugs.get(slug)
+                if product_id is not None:
+                    with state.lock:
+                        html = state.render(product_id)
+                    return self.send_html(html)
+            if path == '/' or path.endswith('.html'):
+                file_path = Path(self.translate_path(self.path))
+                if file_path.is_dir():
+                    file_path = file_path / 'index.html'
+                if file_path.is_file():
+                    return self.send_html(file_path.read_text(encoding='utf-8'))
+            return super().do_GET()
+
+        def send_html(self, html):
+            body = html.replace('</body>', LIVE_RELOAD_SCRIPT, 1).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('Cache-Control', 'no-store')
+            self.end_headers()
+            self.wfile.write(body)
+
+        def send_events(self):
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Cache-Control', 'no-store')
+            self.end_headers()
+            version = None
+            try:
+                while True:
+                    with state.changed:
+                        if version == state.version:
+                            state.changed.wait(timeout=15)
+                        version = state.version
+                    self.wfile.write(f"data: {version}\n\n".encode('utf-8'))
+                    self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+    return DevHandler
+
+
+def snapshot(paths):
+    """أوقات تعديل الملفات المراقبة"""
+    result = {}
+    for path in paths:
+        try:
+            result[path] = os.stat(path).st_mtime_ns
+        except OSError:
+            result[path] = None
+    return result
+
+
+def rebuild_artifacts():
+    """الفيد و sitemap بعد تغير الكتالوج (بعد تحديث المعاينة وليس قبلها)"""
+    import fix_feed_gmc
+    import generate_sitemap
+    fix_feed_gmc.fix_product_feed()
+    generate_sitemap.generate_sitemap()
+
+
+def rewrite_all_pages(state):
+    start_time = time.time()
+    with state.lock:
+        product_ids = list(state.products)
+    for product_id in product_ids:
+        with state.lock:
+            if product_id in state.products:
+                state.write_page(product_id)
+    print(f"💾 تمت إعادة كتابة {len(product_ids)} صفحة على القرص ({time.time() - start_time:.1f} ثانية)")
+
+
+def on_catalog_change(state):
+    start_time = time.time()
+    with state.lock:
+        changed, removed = state.refresh_catalog()
+        for product_id in changed:
+            if product_id in state.products:
+                state.write_page(product_id)
+    state.bump()
+    print(f"🔄 الكتالوج: {len(changed)} منتج متغير، {len(removed)} محذوف ({(time.time() - start_time) * 1000:.0f} ms)")
+    rebuild_artifacts()
+
+
+def on_template_change(state):
+    start_time = time.time()
+    with state.lock:
+        try:
+            importlib.reload(generate_all_pages)
+            importlib.reload(seo_optimizer)
+            state.lb_schema = seo_optimizer.create_local_business_schema()
+        except Exception as e:
+            print(f"❌ خطأ في القالب: {e}")
+            return
+    state.bump()
+    print(f"🎨 تم تحميل القالب الجديد ({(time.time() - start_time) * 1000:.0f} ms)")
+    threading.Thread(target=rewrite_all_pages, args=(state,), daemon=True).start()
+
+
+def on_static_change(state, changed):
+    """الصفحات تستخدم CSS حرج مضمّن + css/site.<بصمة>.css وليس css/main.css مباشرة => إعادة بناء الاثنين"""
+    import critical_css
+    import fingerprint_assets
+    start_time = time.time()
+    critical_css.build()
+    manifest, _, _ = fingerprint_assets.build_fingerprints()
+    pages = fingerprint_assets.page_files()
+    static = [path for path in pages if path.as_posix() in fingerprint_assets.STATIC_PAGES]
+    fingerprint_assets.rewrite_pages(static, manifest['assets'])
+    state.bump()
+    print(f"🎨 {', '.join(sorted(changed))}: CSS حرج و {fingerprint_assets.asset_url(critical_css.SITE_CSS)} "
+          f"({(time.time() - start_time) * 1000:.0f} ms)")
+    # صفحات المنتجات تُعرض من الذاكرة بالبصمة الجديدة؛ نسخها على القرص تتحدث في الخلفية
+    products = [path for path in pages if path not in static]
+    threading.Thread(target=fingerprint_assets.rewrite_pages, args=(products, manifest['assets']), daemon=True).start()
+
+
+def watch(state):
+    watched = CATALOG_FILES + TEMPLATE_FILES + STATIC_FILES
+    last = snapshot(watched)
+    while True:
+        time.sleep(POLL_INTERVAL)
+        current = snapshot(watched)
+        changed = {path for path in watched if current[path] != last[path]}
+        last = current
+        if not changed:
+            continue
+        try:
+            if changed & set(TEMPLATE_FILES):
+                on_template_change(state)
+            if changed & set(CATALOG_FILES):
+                on_catalog_change(state)
+            if changed & set(STATIC_FILES):
+                on_static_change(state, changed & set(STATIC_FILES))
+        except Exception as e:
+            print(f"❌ خطأ أثناء إعادة البناء: {e}")
+
+
+def main(port=8000):
+    print("🔌 تحميل الكتالوج في الذاكرة...")
+    state = SiteState()
+    print(f"✅ {len(state.products)} منتج جاهز")
+
+    threading.Thread(target=watch, args=(state,), daemon=True).start()
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(state))
+    server.daemon_threads = True
+    print(f"🌐 http://127.0.0.1:{port}/ - مراقبة التعديلات (Ctrl+C للإيقاف)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 تم الإيقاف")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 8000)
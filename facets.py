@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+فهارس الفلاتر والترتيب للمتجر (facets.json) محسوبة وقت البناء => لا فلترة على الكتالوج كاملاً في المتصفح
+
+- bitmap لكل قيمة فلتر: البت i = المنتج رقم i في ids (بترتيب الكتالوج)، base64 لبايتات np.packbits (bitorder=little)
+    category : فئات المتجر (STOREFRONT_CATEGORIES - المنتج قد يكون في أكثر من فئة)
+    price    : شرائح السعر بعد الخصم (pricing.PRICE_BANDS)
+    discount : نسبة الخصم "X% فأكثر" (DISCOUNT_THRESHOLDS)
+- ترتيبات جاهزة (أرقام المنتجات في ids): price (الأرخص أولاً)، discount (أفضل العروض)، newest (الأحدث = أعلى ID)
+- js/catalog-worker.js يجمع الفلاتر بـ AND على الـ bitmaps ثم يمر على الترتيب المطلوب
+- المنتجات المكررة المستبعدة (detect_duplicates.py) ليست في ids، وقائمتها في excluded => المتجر لا يعرض منتجات بدون صفحات
+- التقرير على الشاشة: عدد المنتجات في كل قيمة
+
+الاستخدام:
+    python facets.py
+"""
+
+import sys
+import json
+import base64
+from pathlib import Path
+
+import numpy as np
+
+from catalog_store import open_catalog
+from output_writer import write_output
+from pricing import CatalogPricing, PRICE_BAND_LABELS
+from generate_all_pages import load_excluded_duplicates
+
+# Force UTF-8 for output to avoid encoding errors on Windows
+if sys.stdout.encoding and sys.stdout.encoding.lower() != 'utf-8':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+FACETS_FILE = Path('facets.json')
+FACETS_VERSION = 2
+
+# أزرار الفئات في index.html (data-category) => كلمات في العنوان
+# (نفس الكلمات في CATEGORY_PATTERNS في js/catalog-worker.js للعمل بدون facets.json)
+STOREFRONT_CATEGORIES = {
+    'beauty': ['شعر', 'بشرة', 'كريم', 'جمال', 'مكياج'],
+    'health': ['صحة', 'فيتامين', 'علاج', 'مكمل'],
+    'electronics': ['جهاز', 'ماكينة', 'كهربائي', 'جوال', 'ساعة'],
+    'home': ['منزل', 'مطبخ', 'أدوات'],
+}
+# فلتر الخصم: "X% فأكثر"
+DISCOUNT_THRESHOLDS = [10, 20, 30, 40, 50]
+
+
+def encode_bitmap(mask):
+    """مصفوفة bool => base64 (البت i في البايت i // 8، من البت الأدنى)"""
+    return base64.b64encode(np.packbits(np.asarray(mask, dtype=bool), bitorder='little').tobytes()).decode('ascii')
+
+
+def category_masks(titles):
+    masks = {}
+    lowered = [str(title).lower() for title in titles]
+    for name, keywords in STOREFRONT_CATEGORIES.items():
+        masks[name] = np.fromiter((any(word in title for word in keywords) for title in lowered),
+                                  dtype=bool, count=len(lowered))
+    return masks
+
+
+def build_facets(pricing, titles, excluded=()):
+    """facets.json من أعمدة التسعير والعناوين (بنفس ترتيب الكتالوج، بدون المنتجات المستبعدة)"""
+    positions = np.arange(len(pricing.ids))
+    facets = {'category': [], 'price': [], 'discount': []}
+
+    for name, mask in category_masks(titles).items():
+        facets['category'].append({'key': name, 'count': int(mask.sum()), 'bits': encode_bitmap(mask)})
+    for band, label in enumerate(PRICE_BAND_LABELS):
+        mask = pricing.band == band
+        facets['price'].append({'key': str(band), 'label': label, 'count': int(mask.sum()), 'bits': encode_bitmap(mask)})
+    for threshold in DISCOUNT_THRESHOLDS:
+        mask = pricing.discount_percent >= threshold
+        facets['discount'].append({'key': str(threshold), 'label': f'خصم {threshold}% فأكثر',
+                                   'count': int(mask.sum()), 'bits': encode_bitmap(mask)})
+
+    return {
+        'version': FACETS_VERSION,
+        'ids': pricing.ids.tolist(),
+        'excluded': sorted(excluded),
+        'facets': facets,
+        'sort': {
+            'price': np.lexsort((positions, pricing.sale_price)).tolist(),
+            'discount': pricing.by_discount().tolist(),
+            'newest': np.lexsort((positions, -pricing.ids)).tolist(),
+        },
+    }
+
+
+def main():
+    import time
+    start_time = time.time()
+    excluded = load_excluded_duplicates()
+    with open_catalog() as store:
+        ids, price, sale_price, categories = store.price_columns()
+        titles = [product.get('title', '') for product in store.iter_products()]
+
+    keep = [i for i, pid in enumerate(ids) if pid not in excluded]
+    pricing = CatalogPricing(*([column[i] for i in keep] for column in (ids, price, sale_price, categories)))
+    data = build_facets(pricing, [titles[i] for i in keep], excluded & set(ids))
+    content = json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+    write_output(FACETS_FILE, content)
+
+    print(f"🧮 {FACETS_FILE}: {len(data['ids'])} منتج ({len(data['excluded'])} مستبعد)، "
+          f"{len(content.encode('utf-8')) / 1024:.1f} KB في {(time.time() - start_time) * 1000:.0f} ms")
+    for name, values in data['facets'].items():
+        print(f"   {name}: " + '، '.join(f"{value.get('label', value['key'])} ({value['count']})" for value in values))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+فيدات القنوات الإضافية (Meta / Pinterest / TikTok) من نفس عنصر الفيد الموحد
+
+fix_feed_gmc.py يبني عنصر الفيد مرة واحدة لكل منتج (build_feed_item) ثم يمرره
+لفيد Google ولكل كاتب هنا في نفس المرور على الكتالوج - بدون إعادة تنظيف العناوين والأوصاف.
+كل كاتب يكتب صفاً واحداً لكل منتج، والملف يُحفظ عند close() بـ write_output.
+"""
+
+import io
+import csv
+import json
+
+from output_writer import write_output
+
+DEFAULT_CHANNELS = ['meta', 'pinterest', 'tiktok']
+
+
+class CsvFeedWriter:
+    """كاتب فيد CSV: COLUMNS = [(اسم العمود في القناة، الحقل في عنصر الفيد)]"""
+
+    output_file = None
+    COLUMNS = []
+    # حدود الطول لكل قناة (الحقول الأطول تُقص)
+    MAX_LENGTH = {}
+
+    def __init__(self, output_file=None):
+        self.output_file = output_file or self.output_file
+        self.buffer = io.StringIO()
+        self.writer = csv.writer(self.buffer, lineterminator='\n')
+        self.writer.writerow([column for column, _ in self.COLUMNS])
+        self.count = 0
+
+    def row(self, item):
+        values = []
+        for column, field in self.COLUMNS:
+            value = item.get(field, '')
+            limit = self.MAX_LENGTH.get(column)
+            if limit and len(value) > limit:
+                value = value[:limit - 1].rstrip() + '…'
+            values.append(value)
+        return values
+
+    def write(self, item):
+        self.writer.writerow(self.row(item))
+        self.count += 1
+
+    def close(self):
+        if write_output(self.output_file, self.buffer.getvalue(), durable=True):
+            print(f"✅ {self.output_file}: {self.count} منتج")
+        else:
+            print(f"⏭️ {self.output_file}: بدون تغيير ({self.count} منتج)")
+
+
+class MetaFeedWriter(CsvFeedWriter):
+    """كتالوج Facebook / Instagram (Commerce Manager)"""
+
+    output_file = 'product-feed-meta.csv'
+    COLUMNS = [
+        ('id', 'id'),
+        ('title', 'title'),
+        ('description', 'description'),
+        ('availability', 'availability'),
+        ('condition', 'condition'),
+        ('price', 'price'),
+        ('sale_price', 'sale_price'),
+        ('link', 'link'),
+        ('image_link', 'image_link'),
+        ('brand', 'brand'),
+        ('google_product_category', 'google_product_category'),
+        ('product_type', 'product_type'),
+    ]
+    MAX_LENGTH = {'title': 200, 'description': 9999}
+
+
+class PinterestFeedWriter(CsvFeedWriter):
+    """كتالوج Pinterest"""
+
+    output_file = 'product-feed-pinterest.csv'
+    COLUMNS = [
+        ('id', 'id'),
+        ('title', 'title'),
+        ('description', 'description'),
+        ('link', 'link'),
+        ('image_link', 'image_link'),
+        ('price', 'price'),
+        ('sale_price', 'sale_price'),
+        ('availability', 'availability'),
+        ('condition', 'condition'),
+        ('brand', 'brand'),
+        ('mpn', 'mpn'),
+        ('google_product_category', 'google_product_category'),
+        ('product_type', 'product_type'),
+    ]
+    MAX_LENGTH = {'title': 500, 'description': 10000}
+
+
+class TikTokFeedWriter(CsvFeedWriter):
+    """كتالوج TikTok (معرف المنتج باسم sku_id)"""
+
+    output_file = 'product-feed-tiktok.csv'
+    COLUMNS = [
+        ('sku_id', 'id'),
+        ('title', 'title'),
+        ('description', 'description'),
+        ('availability', 'availability'),
+        ('condition', 'condition'),
+        ('price', 'price'),
+        ('sale_price', 'sale_price'),
+        ('link', 'link'),
+        ('image_link', 'image_link'),
+        ('brand', 'brand'),
+        ('google_product_category', 'google_product_category'),
+        ('product_type', 'product_type'),
+    ]
+    MAX_LENGTH = {'title': 150, 'description': 5000}
+
+
+CHANNELS = {
+    'meta': MetaFeedWriter,
+    'pinterest': PinterestFeedWriter,
+    'tiktok': TikTokFeedWriter,
+}
+
+
+def load_channels():
+    """القنوات المفعلة من config.json (feed_config.channels)"""
+    try:
+        with open('config.json', 'r', encoding='utf-8') as f:
+            channels = json.load(f).get('feed_config', {}).get('channels')
+    except Exception:
+        channels = None
+    return DEFAULT_CHANNELS if channels is None else channels
+
+
+def create_writers(channels=None):
+    """كاتب لكل قناة مطلوبة (None = حسب config.json)"""
+    writers = []
+    for name in load_channels() if channels is None else channels:
+        if name not in CHANNELS:
+            print(f"⚠️ قناة فيد غير معروفة: {name}")
+            continue
+        writers.append(CHANNELS[name]())
+    return writers
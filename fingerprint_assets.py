@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+أسماء ملفات ببصمة المحتوى للملفات الثابتة (css/site.css و js/ و assets/) => تخزين دائم في المتصفح بدون إعادة تحقق
+
+- كل ملف يُنسخ باسم يحتوي أول 8 أحرف من sha1 محتواه: css/site.css => css/site.1a2b3c4d.css
+- assets/fingerprints.json: {المسار الأصلي: المسار بالبصمة}؛ asset_url() يُرجع الاسم بالبصمة للقوالب
+  (favicon_links و logo_picture و stylesheet_tags و الخطوط) فلا تتغير الصفحات إذا لم تتغير الملفات
+- إعادة كتابة كل المراجع (الأصلية أو ببصمة قديمة) في صفحات المنتجات والصفحات الثابتة و index.html في مرور واحد
+- حذف البصمات القديمة: تبقى بصمة البناء السابق فقط (للصفحات المخزنة أثناء النشر) ثم تُحذف
+
+الاستخدام:
+    python fingerprint_assets.py
+"""
+
+import re
+import sys
+import json
+import hashlib
+from pathlib import Path
+
+from output_writer import write_output
+
+# Force UTF-8 for output to avoid encoding errors on Windows
+if sys.stdout.encoding and sys.stdout.encoding.lower() != 'utf-8':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+MANIFEST_FILE = Path('assets/fingerprints.json')
+ASSET_GLOBS = ['css/site.css', 'js/*.js', 'assets/**/*']
+# أين تُبحث البصمات القديمة للحذف
+CLEANUP_GLOBS = ['css/*', 'js/*', 'assets/**/*']
+# ملفات لا تُعطى بصمة (مانيفست البناء نفسه)
+EXCLUDED_SUFFIXES = {'.json'}
+HASH_LENGTH = 8
+STATIC_PAGES = ['index.html', 'about.html', 'contact.html', 'privacy.html', 'terms.html',
+                'shipping.html', 'return-policy.html', 'reviews.html', '404.html']
+
+FINGERPRINTED = re.compile(r'\.[0-9a-f]{%d}$' % HASH_LENGTH)
+FINGERPRINT_IN_PATH = re.compile(r'\.[0-9a-f]{%d}(?=\.[^./]+$)' % HASH_LENGTH)
+
+_manifest = None
+
+
+def load_manifest():
+    """assets/fingerprints.json أو {} قبل أول بناء"""
+    global _manifest
+    if _manifest is None:
+        try:
+            with open(MANIFEST_FILE, 'r', encoding='utf-8') as f:
+                _manifest = json.load(f)
+        except Exception:
+            _manifest = {}
+    return _manifest
+
+
+def asset_url(path):
+    """المسار بالبصمة لملف ثابت (أو المسار نفسه إذا لم تكن له بصمة)"""
+    return load_manifest().get('assets', {}).get(path, path)
+
+
+def fingerprinted_name(path, digest):
+    return path.with_name(f"{path.stem}.{digest[:HASH_LENGTH]}{path.suffix}")
+
+
+def is_fingerprint(path):
+    return bool(FINGERPRINTED.search(path.stem))
+
+
+def source_assets():
+    """الملفات الأصلية (بدون النسخ ذات البصمة والمانيفست)"""
+    paths = set()
+    for pattern in ASSET_GLOBS:
+        for path in Path('.').glob(pattern):
+            if path.is_file() and path.suffix not in EXCLUDED_SUFFIXES and not is_fingerprint(path):
+                paths.add(path)
+    return sorted(paths)
+
+
+def build_fingerprints():
+    """نسخ الملفات بأسماء البصمة: (manifest، عدد الملفات الجديدة، عدد المحذوفة)"""
+    global _manifest
+    previous = load_manifest()
+    old_assets = previous.get('assets', {})
+    old_previous = previous.get('previous', {})
+
+    assets = {}
+    created = 0
+    for path in source_assets():
+        data = path.read_bytes()
+        target = fingerprinted_name(path, hashlib.sha1(data).hexdigest())
+        if not target.exists():
+            write_output(target, data)
+            created += 1
+        assets[path.as_posix()] = target.as_posix()
+
+    # البصمة السابقة لكل ملف تغير (أو التي بقيت من تغيير سابق) تُحفظ لبناء واحد إضافي
+    previous_assets = {}
+    for original, old_target in old_assets.items():
+        if assets.get(original) != old_target:
+            previous_assets[original] = old_target
+        elif original in old_previous and old_previous[original] != old_target:
+            previous_assets[original] = old_previous[original]
+
+    keep = set(assets.values()) | set(previous_assets.values())
+    removed = 0
+    for pattern in CLEANUP_GLOBS:
+        for path in Path('.').glob(pattern):
+            if path.is_file() and is_fingerprint(path) and path.as_posix() not in keep:
+                path.unlink()
+                removed += 1
+
+    _manifest = {'assets': assets, 'previous': previous_assets}
+    write_output(MANIFEST_FILE, json.dumps(_manifest, ensure_ascii=False, indent=2))
+    return _manifest, created, removed
+
+
+def reference_pattern(originals):
+    """تعبير واحد لكل المراجع: المسار الأصلي أو بأي بصمة، مع ../ اختيارياً"""
+    alternatives = []
+    for original in sorted(originals, key=len, reverse=True):
+        path = Path(original)
+        stem = (path.parent / path.stem).as_posix()
+        alternatives.append(re.escape(stem) + r'(?:\.[0-9a-f]{%d})?' % HASH_LENGTH + re.escape(path.suffix))
+    return re.compile(r'(?<![\w./-])((?:\.\./)?)(' + '|'.join(alternatives) + r')(?![\w-])')
+
+
+def rewrite_pages(paths, assets):
+    """استبدال كل المراجع بالبصمة الحالية: عدد الصفحات التي تغيرت"""
+    if not assets:
+        return 0
+    pattern = reference_pattern(assets)
+
+    def replace(match):
+        original = FINGERPRINT_IN_PATH.sub('', match.group(2))
+        return match.group(1) + assets.get(original, match.group(2))
+
+    rewritten = 0
+    for path in paths:
+        content = path.read_text(encoding='utf-8')
+        if write_output(path, pattern.sub(replace, content)):
+            rewritten += 1
+    return rewritten
+
+
+def page_files():
+    from validate_pages import catalog_pages
+    pages = [Path(page) for page in STATIC_PAGES if Path(page).exists()]
+    return pages + [path for path in catalog_pages() if path.exists()]
+
+
+def main():
+    import time
+    start_time = time.time()
+    manifest, created, removed = build_fingerprints()
+    pages = page_files()
+    rewritten = rewrite_pages(pages, manifest['assets'])
+
+    print(f"🔖 {len(manifest['assets'])} ملف ثابت ({created} بصمة جديدة، {removed} بصمة قديمة حُذفت، "
+          f"{len(manifest['previous'])} من البناء السابق)")
+    print(f"✅ {len(pages)} صفحة، {rewritten} منها تحدثت ({time.time() - start_time:.2f} ثانية)")
+
+
+if __name__ == '__main__':
+    main()
@@ -3,53 +3,68 @@ import re
 import os
 from urllib.parse import quote
 import sys
-import html
+import hashlib
+import argparse
+from pathlib import Path
+
+from build_profile import profiled_items
+from catalog_store import open_catalog, get_product_category
+from output_writer import write_output
+from feed_channels import create_writers
+import description_cache
+from generate_all_pages import create_slug
 
 # Force UTF-8 for output to avoid encoding errors on Windows
 if sys.stdout.encoding.lower() != 'utf-8':
     sys.stdout.reconfigure(encoding='utf-8')
 
-# Global cache for descriptions
-_DESCRIPTIONS_CACHE = None
+BASE_URL = "https://sherow1982.github.io/alsooq-alsaudi"
+FEED_FILE = 'product-feed.xml'
+SUPPLEMENTAL_FEED_FILE = 'product-feed-supplemental.xml'
+FEED_STATE_FILE = Path('.cache/feed-state.json')
+# إذا تغير سعر أكثر من هذه النسبة من المنتجات يُعاد بناء الفيد الأساسي بدلاً من فيد تكميلي كبير
+CONSOLIDATE_RATIO = 0.2
+# الحقول المتغيرة التي يمكن تحديثها عبر الفيد التكميلي (بمسافة بادئة 6 = حقول المنتج وليس الشحن)
+VOLATILE_FIELD = re.compile(r'^      <g:(price|sale_price|availability)>(.*)</g:\1>$')
 
-def load_descriptions():
-    """تحميل الوصف من ملف descriptions.json كقاموس (ID -> text)"""
-    global _DESCRIPTIONS_CACHE
-    if _DESCRIPTIONS_CACHE is not None:
-        return _DESCRIPTIONS_CACHE
-        
+# قائمة الماركات المحظورة (عربي وإنجليزي) - قائمة شاملة جداً لتجنب تعليق الحساب
+PROHIBITED_BRANDS = [
+    # الساعات والمجوهرات
+    'rolex', 'رولكس', 'hublot', 'هوبلو', 'casio', 'كاسيو', 'tissot', 'تيسو', 
+    'omega', 'أوميغا', 'أوميجا', 'patek philippe', 'باتيك فيليب', 'audemars piguet', 'أوديمار بيجيه',
+    'cartier', 'كارتير', 'كارتيه', 'van cleef', 'فان كليف', 'tiffany', 'تيفاني', 'bulgari', 'بلغاري',
+    'patek', 'باتيك', 'audemars', 'أوديمار', 'vacheron', 'فاشيرون', 'breitling', 'بريتلينغ',
+    # الملابس والأحذية والحقائب
+    'nike', 'نايك', 'نايكي', 'adidas', 'أديداس', 'puma', 'بوما', 'gucci', 'قوتشي',
+    'prada', 'برادا', 'louis vuitton', 'لويس فيتون', 'chanel', 'شانيل', 'dior', 'ديور',
+    'zara', 'زارا', 'h&m', 'lacoste', 'لاكوست', 'tommy hilfiger', 'تومي هيلفيغر', 'تومي',
+    'hermes', 'هيرميس', 'هيرمز', 'burberry', 'بربري', 'fendi', 'فندي', 'balenciaga', 'بالنسياغا',
+    'versace', 'فرزاتشي', 'reebok', 'ريبوك', 'new balance', 'نيو بالانس', 'skechers', 'سكيتشرز',
+    'yeezy', 'ييزي', 'off-white', 'أوف وايت', 'balmain', 'بالمان', 'valentino', 'فالنتينو',
+    # الإلكترونيات والهواتف
+    'apple', 'أبل', 'iphone', 'ايفون', 'ipad', 'ايباد', 'samsung', 'سامسونج', 'sony', 'سوني',
+    'panasonic', 'باناسونيك', 'huawei', 'هواوي', 'xiaomi', 'شاومي', 'hp', 'dell', 'lenovo', 'لينوفو',
+    'canon', 'كانون', 'nikon', 'نيكون', 'lg', 'ال جي', 'philips', 'فيلبس', 'فيليبس',
+    'dyson', 'دايسون', 'nintendo', 'نينتندو', 'playstation', 'بلايستيشن', 'xbox', 'اكس بوكس',
+    # العطور ومواد التجميل العالمية
+    'sauvage', 'سوفاج', 'bleu de chanel', 'بلو دي شانيل', 'creed', 'كريد', 
+    'tom ford', 'توم فورد', 'mac', 'ماك', 'loreal', 'لوريال', 'maybelline', 'ميبيلين',
+    'gillette', 'جيليت', 'braun', 'براون', 'oral-b', 'أورال بي', 'pantene', 'بانتين'
+]
+
+def load_excluded_duplicates():
+    """تحميل IDs المنتجات المكررة المستبعدة من reports/duplicates.json (ناتج detect_duplicates.py)"""
+    if not os.path.exists('reports/duplicates.json'):
+        return set()
     try:
-        with open('descriptions.json', 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            _DESCRIPTIONS_CACHE = {str(k): v for k, v in data.items()}
-            return _DESCRIPTIONS_CACHE
-    except Exception as f:
-        return {}
+        with open('reports/duplicates.json', 'r', encoding='utf-8') as f:
+            return set(json.load(f).get('exclude_ids', []))
+    except Exception:
+        return set()
 
 def clean_description(title, description):
-    """تنظيف الوصف وحذف العنوان المكرر من بدايته"""
-    if not description:
-        return f"{html.escape(str(title))} - منتج عالي الجودة متوفر الآن في السوق السعودي بتوصيل سريع."
-    
-    clean_title = html.escape(str(title).strip())
-    description = html.escape(str(description))
-    
-    if description.startswith(clean_title):
-        description = description[len(clean_title):].lstrip(' :-,.،')
-    
-    if len(description) < 10:
-        return f"اكتشف {html.escape(str(title))} - منتج عالي الجودة متوفر الآن في السوق السعودي بخصم حصري وتوصيل سريع."
-        
-    description = re.sub(r'[^\w\s\.\,\!\?\% ر.س]', '', description)
-    return description[:4900]
-
-def get_product_description(product_id, title, descriptions=None):
-    """الحصول على الوصف المطابق تماماً لما هو معروض في المتجر"""
-    if descriptions is None:
-        descriptions = load_descriptions()
-    pid_str = str(product_id)
-    raw_desc = descriptions.get(pid_str, "")
-    return clean_description(title, raw_desc)
+    """تنظيف الوصف وحذف العنوان المكرر من بدايته (من كاش الأوصاف)"""
+    return description_cache.cleaned(title, description, 'feed')
 
 def clean_product_title(title):
     """تنظيف العنوان من النصوص الترويجية"""
@@ -79,50 +94,179 @@ def fix_image_url(url):
         return url[:-5] + '.jpg'
     return url
 
-def get_product_category(title):
-    """تحديد فئة المنتج بناءً على العنوان"""
-    title_lower = title.lower()
+def split_item(lines):
+    """فصل عنصر الفيد إلى بصمة الحقول الثابتة + الحقول المتغيرة (السعر، سعر العرض، التوفر)"""
+    static_lines = []
+    volatile = {}
+    for line in lines:
+        match = VOLATILE_FIELD.match(line)
+        if match:
+            volatile[match.group(1)] = match.group(2)
+        else:
+            static_lines.append(line)
+    digest = hashlib.sha1('\n'.join(static_lines).encode('utf-8')).hexdigest()
+    return {'hash': digest, **volatile}
+
+
+def seed_feed_state(feed_file=FEED_FILE):
+    """حالة الفيد المنشور من ملف product-feed.xml الموجود (عند عدم وجود snapshot سابق)"""
+    if not os.path.exists(feed_file):
+        return None
+    with open(feed_file, 'r', encoding='utf-8') as f:
+        content = f.read()
+    state = {}
+    for block in re.findall(r'^    <item>\n.*?^    </item>$', content, re.S | re.M):
+        match = re.search(r'<g:id>(.*?)</g:id>', block)
+        if match:
+            state[match.group(1)] = split_item(block.split('\n'))
+    return state
+
+
+def load_feed_state():
+    if FEED_STATE_FILE.exists():
+        try:
+            with open(FEED_STATE_FILE, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception:
+            pass
+    return seed_feed_state()
+
+
+def build_supplemental_feed(items, published):
+    """فيد تكميلي بالمنتجات التي تغير سعرها أو توفرها فقط عن الفيد الأساسي المنشور"""
+    xml = ['<?xml version="1.0" encoding="UTF-8"?>']
+    xml.append('<rss xmlns:g="http://base.google.com/ns/1.0" version="2.0">')
+    xml.append('  <channel>')
+    xml.append('    <title>السوق السعودي - تحديثات الأسعار</title>')
+    changed = 0
+    for pid, state in items:
+        old = published[pid]
+        fields = [key for key in ('price', 'sale_price', 'availability') if state.get(key) != old.get(key)]
+        if not fields:
+            continue
+        changed += 1
+        xml.append('    <item>')
+        xml.append(f'      <g:id>{pid}</g:id>')
+        for key in fields:
+            xml.append(f'      <g:{key}>{state[key]}</g:{key}>')
+        xml.append('    </item>')
+    xml.append('  </channel>')
+    xml.append('</rss>')
+    return '\n'.join(xml), changed
+
+
+def find_prohibited_brand(clean_title):
+    """الماركة المحظورة الموجودة في العنوان: (الماركة، اللغة) أو None"""
+    title_lower = clean_title.lower()
     
-    if any(word in title_lower for word in ['شعر', 'شامبو', 'بلسم', 'زيت', 'ماسك', 'صبغة', 'حلاقة', 'فرد', 'تمويج', 'تصفيف', 'مشط', 'مبخرة']):
-        return 'Health & Beauty > Personal Care > Hair Care', 'العناية بالشعر'
-    elif any(word in title_lower for word in ['بشرة', 'كريم', 'سيروم', 'واقي', 'مرطب', 'تفتيح', 'صابون', 'غسول', 'مكياج', 'روج', 'شفاه', 'قناع', 'كولاجين', 'فيلر', 'بوتوكس']):
-        return 'Health & Beauty > Personal Care > Cosmetics', 'العناية بالجمال'
-    elif any(word in title_lower for word in ['جهاز', 'ماكينة', 'آلة', 'كهربائي', 'قابل للشحن', 'شاحن', 'سماعة', 'كاميرا', 'جوال', 'تابلت', 'ساعة', 'ضغط', 'مقياس', 'مساج', 'تدليك']):
-        return 'Electronics', 'الإلكترونيات'
-    elif any(word in title_lower for word in ['فيتامين', 'مكمل', 'كبسولات', 'حبوب', 'علاج', 'مشد', 'مصحح', 'ركبة', 'ظهر', 'كاحل']):
-        return 'Health & Beauty > Health Care', 'الصحة والعافية'
-    elif any(word in title_lower for word in ['ملابس', 'شورت', 'قميص', 'حقيبة', 'نظارة', 'حذاء', 'جورب', 'شماغ', 'باندل', 'عطر']):
-        return 'Apparel & Accessories', 'الأزياء والموضة'
-    else:
-        return 'Home & Garden', 'المنزل والأدوات'
+    # التحقق من الماركات المحظورة بدقة (باستخدام حدود الكلمات للإنجليزية)
+    for brand in PROHIBITED_BRANDS:
+        if re.search(r'[a-zA-Z]', brand): # English Brand
+            if re.search(r'\b' + re.escape(brand) + r'\b', title_lower):
+                return brand, 'English'
+        else: # Arabic Brand
+            if brand in title_lower:
+                # التحقق من أن الماركة ليست جزءاً من كلمة شائعة (مثل 'ماكينة')
+                # بالنسبة للعربية، سنعتزم أن الماركة كلمة مستقلة
+                if re.search(r'(^|\s)' + re.escape(brand) + r'($|\s)', title_lower):
+                    return brand, 'Arabic'
+    return None
 
-def create_slug(product):
-    """توليد slug فريد للمنتج"""
-    stop_words = ['من', 'في', 'على', 'الى', 'عن', 'و', 'مع', 'يا', 'أيها']
+
+def build_feed_item(product, raw_description):
+    """نموذج عنصر الفيد الموحد (تنظيف العنوان، الماركات، الفئة، الرابط، الوصف) - None إذا استُبعد المنتج"""
+    # تنظيف البيانات أولاً
+    clean_title = clean_product_title(product['title'])
+    
+    brand = find_prohibited_brand(clean_title)
+    if brand:
+        print(f"🚫 Excluded brand detected ({brand[1]}): {brand[0]} in {clean_title}")
+        return None
+    
+    # التحقق من صلاحية المنتج
+    if 'not compatible with our policy' in clean_title.lower():
+        return None
+    
+    # التحقق من الصور
+    image_link = fix_image_url(product['image_link'])
+    if not image_link or image_link.endswith('.mp4'):
+        return None
+    
+    # توليد slug
+    slug = create_slug({'id': product['id'], 'title': product['title']})
+    google_cat, product_type = get_product_category(clean_title)
     
-    title = product['title']
-    for word in stop_words:
-        title = title.replace(f' {word} ', ' ')
+    return {
+        'id': str(product['id']),
+        'title': clean_title,
+        # إنشاء وصف مطابق تماماً للمتجر
+        'description': clean_description(clean_title, raw_description),
+        'link': f"{BASE_URL}/products/{quote(slug)}.html",
+        'image_link': image_link,
+        'condition': 'new',
+        'availability': 'in stock',
+        'price': f"{product['price']:.2f} SAR",
+        'sale_price': f"{product['sale_price']:.2f} SAR",
+        'brand': 'السوق السعودي',
+        'mpn': f"ALS{product['id']:06d}",
+        'gtin': '',
+        'google_product_category': google_cat,
+        'product_type': product_type,
+    }
+
 
-    slug = re.sub(r'[^\w\s-]', '', title).strip().lower()
-    slug = re.sub(r'\s+', '-', slug)
-    # Truncate to 100 characters to avoid Windows MAX_PATH issues
-    if len(slug) > 100:
-        slug = slug[:100].rstrip('-')
-    return f"{product['id']}-{slug}"
+def render_google_item(item):
+    """أسطر عنصر Google Merchant RSS"""
+    lines = ['    <item>']
+    lines.append(f'      <g:id>{item["id"]}</g:id>')
+    lines.append(f'      <g:title><![CDATA[{item["title"]}]]></g:title>')
+    lines.append(f'      <g:description><![CDATA[{item["description"]}]]></g:description>')
+    lines.append(f'      <g:link>{item["link"]}</g:link>')
+    lines.append(f'      <g:image_link>{item["image_link"]}</g:image_link>')
+    lines.append(f'      <g:condition>{item["condition"]}</g:condition>')
+    lines.append(f'      <g:availability>{item["availability"]}</g:availability>')
+    lines.append(f'      <g:price>{item["price"]}</g:price>')
+    lines.append(f'      <g:sale_price>{item["sale_price"]}</g:sale_price>')
+    lines.append(f'      <g:brand>{item["brand"]}</g:brand>')
+    
+    # المعرفات الفريدة - أساسية لعام 2026
+    if item['mpn']:
+        lines.append(f'      <g:mpn>{item["mpn"]}</g:mpn>')
+    
+    if item['gtin']:
+        lines.append(f'      <g:gtin>{item["gtin"]}</g:gtin>')
+        lines.append('      <g:identifier_exists>yes</g:identifier_exists>')
+    else:
+        lines.append('      <g:identifier_exists>no</g:identifier_exists>')
 
-def fix_product_feed():
-    """إصلاح ملف product-feed.xml بالكامل"""
-    base_url = "https://sherow1982.github.io/alsooq-alsaudi"
+    # ترميز & في الفئة
+    lines.append(f'      <g:google_product_category>{escape_xml(item["google_product_category"])}</g:google_product_category>')
+    lines.append(f'      <g:product_type>{item["product_type"]}</g:product_type>')
     
+    # معلومات الشحن الموحدة
+    lines.append('      <g:shipping>')
+    lines.append('        <g:country>SA</g:country>')
+    lines.append('        <g:service>Standard</g:service>')
+    lines.append('        <g:price>0.00 SAR</g:price>')
+    lines.append('      </g:shipping>')
+    lines.append('    </item>')
+    return lines
+
+
+def fix_product_feed(full=False, channels=None):
+    """إصلاح ملف product-feed.xml وتصدير فيدات القنوات الأخرى في نفس المرور على الكتالوج
+
+    الوضع الافتراضي تزايدي: إذا تغيرت الأسعار/التوفر فقط يبقى الفيد الأساسي كما هو
+    وتُكتب التغييرات في product-feed-supplemental.xml. full=True يعيد بناء الفيد الأساسي دائماً.
+    channels: قنوات إضافية (meta, pinterest, tiktok) - الافتراضي من config.json
+    """
     # فحص وجود ملف المنتجات
     if not os.path.exists('products.json'):
         print("❌ products.json not found")
         return
     
     try:
-        with open('products.json', 'r', encoding='utf-8') as f:
-            products = json.load(f)
+        store = open_catalog()
     except (json.JSONDecodeError, UnicodeDecodeError) as e:
         print(f"❌ Error reading products.json: {e}")
         return
@@ -130,141 +274,78 @@ def fix_product_feed():
         print(f"❌ Unexpected error: {e}")
         return
     
-    if not products:
+    total_products = store.count()
+    if not total_products:
         print("⚠️ No products found")
+        store.close()
         return
     
-    descriptions = load_descriptions()
+    excluded_duplicates = load_excluded_duplicates()
     
-    # قائمة الماركات المحظورة (عربي وإنجليزي) - قائمة شاملة جداً لتجنب تعليق الحساب
-    PROHIBITED_BRANDS = [
-        # الساعات والمجوهرات
-        'rolex', 'رولكس', 'hublot', 'هوبلو', 'casio', 'كاسيو', 'tissot', 'تيسو', 
-        'omega', 'أوميغا', 'أوميجا', 'patek philippe', 'باتيك فيليب', 'audemars piguet', 'أوديمار بيجيه',
-        'cartier', 'كارتير', 'كارتيه', 'van cleef', 'فان كليف', 'tiffany', 'تيفاني', 'bulgari', 'بلغاري',
-        'patek', 'باتيك', 'audemars', 'أوديمار', 'vacheron', 'فاشيرون', 'breitling', 'بريتلينغ',
-        # الملابس والأحذية والحقائب
-        'nike', 'نايك', 'نايكي', 'adidas', 'أديداس', 'puma', 'بوما', 'gucci', 'قوتشي',
-        'prada', 'برادا', 'louis vuitton', 'لويس فيتون', 'chanel', 'شانيل', 'dior', 'ديور',
-        'zara', 'زارا', 'h&m', 'lacoste', 'لاكوست', 'tommy hilfiger', 'تومي هيلفيغر', 'تومي',
-        'hermes', 'هيرميس', 'هيرمز', 'burberry', 'بربري', 'fendi', 'فندي', 'balenciaga', 'بالنسياغا',
-        'versace', 'فرزاتشي', 'reebok', 'ريبوك', 'new balance', 'نيو بالانس', 'skechers', 'سكيتشرز',
-        'yeezy', 'ييزي', 'off-white', 'أوف وايت', 'balmain', 'بالمان', 'valentino', 'فالنتينو',
-        # الإلكترونيات والهواتف
-        'apple', 'أبل', 'iphone', 'ايفون', 'ipad', 'ايباد', 'samsung', 'سامسونج', 'sony', 'سوني',
-        'panasonic', 'باناسونيك', 'huawei', 'هواوي', 'xiaomi', 'شاومي', 'hp', 'dell', 'lenovo', 'لينوفو',
-        'canon', 'كانون', 'nikon', 'نيكون', 'lg', 'ال جي', 'philips', 'فيلبس', 'فيليبس',
-        'dyson', 'دايسون', 'nintendo', 'نينتندو', 'playstation', 'بلايستيشن', 'xbox', 'اكس بوكس',
-        # العطور ومواد التجميل العالمية
-        'sauvage', 'سوفاج', 'bleu de chanel', 'بلو دي شانيل', 'creed', 'كريد', 
-        'tom ford', 'توم فورد', 'mac', 'ماك', 'loreal', 'لوريال', 'maybelline', 'ميبيلين',
-        'gillette', 'جيليت', 'braun', 'براون', 'oral-b', 'أورال بي', 'pantene', 'بانتين'
-    ]
     
     xml = ['<?xml version="1.0" encoding="UTF-8"?>']
     xml.append('<rss xmlns:g="http://base.google.com/ns/1.0" version="2.0">')
     xml.append('  <channel>')
     xml.append('    <title>السوق السعودي</title>')
-    xml.append(f'    <link>{base_url}/</link>')
+    xml.append(f'    <link>{BASE_URL}/</link>')
     xml.append('    <description>أفضل العروض والمنتجات الأصلية بأسعار تنافسية</description>')
     
+    writers = create_writers(channels)
+    items = []
     excluded_count = 0
-    for product in products:
-        skip_product = False
-        
-        # تنظيف البيانات أولاً
-        clean_title = clean_product_title(product['title'])
-        title_lower = clean_title.lower()
-        
-        # التحقق من الماركات المحظورة بدقة (باستخدام حدود الكلمات للإنجليزية)
-        for brand in PROHIBITED_BRANDS:
-            if re.search(r'[a-zA-Z]', brand): # English Brand
-                if re.search(r'\b' + re.escape(brand) + r'\b', title_lower):
-                    print(f"🚫 Excluded brand detected (English): {brand} in {clean_title}")
-                    skip_product = True
-                    excluded_count += 1
-                    break
-            else: # Arabic Brand
-                if brand in title_lower:
-                    # التحقق من أن الماركة ليست جزءاً من كلمة شائعة (مثل 'ماكينة')
-                    # بالنسبة للعربية، سنعتزم أن الماركة كلمة مستقلة
-                    if re.search(r'(^|\s)' + re.escape(brand) + r'($|\s)', title_lower):
-                        print(f"🚫 Excluded brand detected (Arabic): {brand} in {clean_title}")
-                        skip_product = True
-                        excluded_count += 1
-                        break
-        
-        # التحقق من صلاحية المنتج
-        if 'not compatible with our policy' in clean_title.lower():
-            skip_product = True
-        
-        # التحقق من الصور
-        image_link = fix_image_url(product['image_link'])
-        if not image_link or image_link.endswith('.mp4'):
-            skip_product = True
-        
-        if skip_product:
+    for product, raw_description in profiled_items('feed_item', store.iter_products(with_descriptions=True)):
+        # المنتجات المكررة (detect_duplicates.py) تبقى نسخة واحدة منها فقط في الفيد
+        if product['id'] in excluded_duplicates:
+            excluded_count += 1
             continue
         
-        # توليد slug
-        slug = create_slug({'id': product['id'], 'title': product['title']})
-        encoded_slug = quote(slug)
-        product_link = f"{base_url}/products/{encoded_slug}.html"
-        
-        # الحصول على الفئة مع ترميز &
-        google_cat, product_type = get_product_category(clean_title)
-        google_cat = escape_xml(google_cat)
-        
-        # إنشاء وصف مطابق تماماً للمتجر
-        description = get_product_description(product['id'], clean_title, descriptions)
-        
-        # توليد المعرفات
-        mpn = f"ALS{product['id']:06d}"
-        gtin = ""
-        
-        # إضافة المنتج
-        xml.append('    <item>')
-        xml.append(f'      <g:id>{product["id"]}</g:id>')
-        xml.append(f'      <g:title><![CDATA[{clean_title}]]></g:title>')
-        xml.append(f'      <g:description><![CDATA[{description}]]></g:description>')
-        xml.append(f'      <g:link>{product_link}</g:link>')
-        xml.append(f'      <g:image_link>{image_link}</g:image_link>')
-        xml.append('      <g:condition>new</g:condition>')
-        xml.append('      <g:availability>in stock</g:availability>')
-        xml.append(f'      <g:price>{product["price"]}.00 SAR</g:price>')
-        xml.append(f'      <g:sale_price>{product["sale_price"]}.00 SAR</g:sale_price>')
-        xml.append('      <g:brand>السوق السعودي</g:brand>')
-        
-        # المعرفات الفريدة - أساسية لعام 2026
-        if mpn:
-            xml.append(f'      <g:mpn>{mpn}</g:mpn>')
+        # عنصر واحد لكل منتج تستخدمه كل القنوات
+        item = build_feed_item(product, raw_description)
+        if item is None:
+            excluded_count += 1
+            continue
         
-        if gtin:
-            xml.append(f'      <g:gtin>{gtin}</g:gtin>')
-            xml.append('      <g:identifier_exists>yes</g:identifier_exists>')
-        else:
-            xml.append('      <g:identifier_exists>no</g:identifier_exists>')
-
-        xml.append(f'      <g:google_product_category>{google_cat}</g:google_product_category>')
-        xml.append(f'      <g:product_type>{product_type}</g:product_type>')
+        items.append((item['id'], render_google_item(item)))
+        for writer in writers:
+            writer.write(item)
         
-        # معلومات الشحن الموحدة
-        xml.append('      <g:shipping>')
-        xml.append('        <g:country>SA</g:country>')
-        xml.append('        <g:service>Standard</g:service>')
-        xml.append('        <g:price>0.00 SAR</g:price>')
-        xml.append('      </g:shipping>')
-        xml.append('    </item>')
-        
-    xml.append('  </channel>')
-    xml.append('</rss>')
+    store.close()
+    description_cache.save_cache()
+    for writer in writers:
+        writer.close()
+    
+    current = {pid: split_item(lines) for pid, lines in items}
+    published = None if full or not os.path.exists(FEED_FILE) else load_feed_state()
     
-    with open('product-feed.xml', 'w', encoding='utf-8') as f:
-        f.write('\n'.join(xml))
+    # الفيد الأساسي يُعاد بناؤه فقط عند تغير الحقول الثابتة أو إضافة/حذف منتجات
+    rebuild = (
+        published is None
+        or published.keys() != current.keys()
+        or any(published[pid]['hash'] != state['hash'] for pid, state in current.items())
+    )
+    if not rebuild:
+        supplemental, changed_count = build_supplemental_feed(current.items(), published)
+        if changed_count > CONSOLIDATE_RATIO * len(current):
+            print(f"🔁 {changed_count} price changes - consolidating into the primary feed")
+            rebuild = True
+    
+    if rebuild:
+        for _, lines in items:
+            xml.extend(lines)
+        xml.append('  </channel>')
+        xml.append('</rss>')
+        write_output(FEED_FILE, '\n'.join(xml), durable=True)
+        supplemental, changed_count = build_supplemental_feed([], current)
+        write_output(SUPPLEMENTAL_FEED_FILE, supplemental, durable=True)
+        write_output(FEED_STATE_FILE, json.dumps(current, ensure_ascii=False, separators=(',', ':')))
+        print(f"Done! {FEED_FILE} generated successfully (full rebuild)")
+    else:
+        write_output(SUPPLEMENTAL_FEED_FILE, supplemental, durable=True)
+        print(f"Done! {FEED_FILE} unchanged - {changed_count} price/availability updates in {SUPPLEMENTAL_FEED_FILE}")
+        return
     
-    print(f"Done! product-feed.xml generated successfully")
-    print(f"Total products in feed: {len(products) - excluded_count}")
-    print(f"Total products excluded (brands/policy): {excluded_count}")
+    print(f"Total products in feed: {total_products - excluded_count}")
+    print(f"Total products excluded (brands/policy/duplicates): {excluded_count}")
     print("Fixed XML encoding issues (& to &amp;)")
     print("Added required fields: mpn")
     print("Cleaned descriptions from promotional text")
@@ -272,4 +353,9 @@ def fix_product_feed():
     print("Formatted prices correctly")
 
 if __name__ == "__main__":
-    fix_product_feed()
+    parser = argparse.ArgumentParser(description='توليد فيد Google Merchant')
+    parser.add_argument('--full', action='store_true', help='إعادة بناء الفيد الأساسي بالكامل وتفريغ الفيد التكميلي')
+    parser.add_argument('--channels', help='القنوات الإضافية مفصولة بفواصل (meta,pinterest,tiktok) أو none')
+    args = parser.parse_args()
+    channels = None if args.channels is None else [c for c in args.channels.split(',') if c and c != 'none']
+    fix_product_feed(full=args.full, channels=channels)
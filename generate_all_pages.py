@@ -10,6 +10,18 @@ from concurrent.futures import ProcessPoolExecutor, as_completed
 import multiprocessing
 import html
 
+from build_profile import profiled
+from catalog_store import open_catalog, get_product_category
+from output_writer import write_output
+import description_cache
+from pricing import product_discount, product_prices, format_price
+from optimize_assets import favicon_links, logo_picture
+from critical_css import stylesheet_tags
+from third_party import analytics_head, analytics_noscript
+from image_dimensions import lcp_image_hints, lcp_image_attrs
+from service_worker import service_worker_registration
+from speculation import prefetch_tags
+
 # Force UTF-8 for output to avoid encoding errors on Windows
 if sys.stdout.encoding and sys.stdout.encoding.lower() != 'utf-8':
     sys.stdout.reconfigure(encoding='utf-8')
@@ -43,21 +55,84 @@ def load_descriptions():
         _DESCRIPTIONS_CACHE = {}
         return _DESCRIPTIONS_CACHE
 
-def clean_description(title, description):
-    """تنظيف الوصف وحذف العنوان المكرر من بدايته"""
-    if not description:
+def load_excluded_duplicates():
+    """تحميل IDs المنتجات المكررة المستبعدة من reports/duplicates.json (ناتج detect_duplicates.py)"""
+    duplicates_file = Path('reports/duplicates.json')
+    if not duplicates_file.exists():
+        return set()
+    try:
+        with open(duplicates_file, 'r', encoding='utf-8') as f:
+            return set(json.load(f).get('exclude_ids', []))
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        print(f"⚠️ خطأ في قراءة duplicates.json: {e}")
+        return set()
+
+def excluded_page_files(excluded_ids, products_dir=Path('products')):
+    """صفحات المنتجات المستبعدة في products/ (اسم الصفحة يبدأ بـ ID المنتج)"""
+    if not excluded_ids or not products_dir.exists():
+        return []
+    pages = []
+    for path in products_dir.glob('*.html'):
+        prefix = path.name.split('-', 1)[0]
+        if prefix.isdigit() and int(prefix) in excluded_ids:
+            pages.append(path)
+    return sorted(pages)
+
+def load_related_index():
+    """تحميل فهرس المنتجات المشابهة من .cache/related-products.json (ناتج build_related_index.py)"""
+    index_file = Path('.cache/related-products.json')
+    if not index_file.exists():
+        return {}
+    try:
+        with open(index_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        print(f"⚠️ خطأ في قراءة related-products.json: {e}")
+        return {}
+
+def get_related_products(product, related_index, products_by_id):
+    """بيانات المنتجات المشابهة اللازمة للعرض فقط (بدون الوصف) لتقليل حجم ما يُرسل للعمليات"""
+    related = []
+    for pid in related_index.get(str(product['id']), []):
+        other = products_by_id.get(pid)
+        if other:
+            related.append({key: other.get(key) for key in ('id', 'title', 'image_link', 'price', 'sale_price')})
+    return related
+
+def render_related_products(related):
+    """قسم المنتجات المشابهة (روابط داخلية بين صفحات المنتجات)"""
+    if not related:
         return ""
     
-    clean_title = html.escape(str(title).strip())
-    description = html.escape(str(description))
-    
-    if description.startswith(clean_title):
-        description = description[len(clean_title):].lstrip(' :-,.،')
+    cards = []
+    for item in related:
+        title = html.escape(str(item['title']).strip())
+        cards.append(f"""
+                <a href="{quote(create_slug(item))}.html" class="product-card related-card" data-prefetch>
+                    <div class="product-image-wrapper">
+                        <img src="{fix_image_url(item.get('image_link', ''))}" alt="{title}" class="product-image" loading="lazy">
+                    </div>
+                    <div class="product-info">
+                        <h3 class="product-title">{title}</h3>
+                        <div class="product-price-row">
+                            <span class="price-current">{format_price(product_prices(item)[1])} ر.س</span>
+                            <span class="price-old">{format_price(product_prices(item)[0])} ر.س</span>
+                        </div>
+                    </div>
+                </a>""")
     
-    if len(description) < 10:
-        return f"اكتشف {html.escape(str(title))} - منتج عالي الجودة متوفر الآن في السوق السعودي بخصم حصري وتوصيل سريع."
-        
-    return description.strip()
+    return f"""
+        <!-- Related Products -->
+        <section class="related-products">
+            <h2 class="faq-title">منتجات مشابهة</h2>
+            <div class="related-grid">{''.join(cards)}
+            </div>
+        </section>
+"""
+
+def clean_description(title, description):
+    """تنظيف الوصف وحذف العنوان المكرر من بدايته (من كاش الأوصاف)"""
+    return description_cache.cleaned(title, description, 'html')
 
 def get_product_description(product_id, title, descriptions=None):
     """الحصول على الوصف الدقيق للمنتج بناءً على ID"""
@@ -69,6 +144,14 @@ def get_product_description(product_id, title, descriptions=None):
     
     return clean_description(title, description)
 
+def get_product_meta_descriptions(product_id, title, descriptions=None):
+    """وصف وسمي description و og:description (مقصوص ومُهرَّب) من كاش الأوصاف"""
+    if descriptions is None:
+        descriptions = load_descriptions()
+    raw_desc = descriptions.get(str(product_id), "")
+    return (description_cache.cleaned(title, raw_desc, 'meta'),
+            description_cache.cleaned(title, raw_desc, 'og'))
+
 def create_slug(product):
     """توليد slug فريد للمنتج"""
     stop_words = ['من', 'في', 'على', 'الى', 'عن', 'و', 'مع', 'يا', 'أيها', 'ال', 'لل', 'بال']
@@ -95,38 +178,23 @@ def fix_image_url(url):
         return re.sub(r'\.[^.]+$', '.jpg', url, flags=re.IGNORECASE)
     return url
 
-def get_product_category(title):
-    """تحديد فئة المنتج بناءً على العنوان"""
-    title_lower = title.lower()
-    
-    if any(word in title_lower for word in ['شعر', 'شامبو', 'بلسم', 'زيت', 'ماسك', 'صبغة', 'حلاقة']):
-        return 'Health & Beauty > Personal Care > Hair Care', 'العناية بالشعر'
-    elif any(word in title_lower for word in ['بشرة', 'كريم', 'سيروم', 'واقي', 'مرطب', 'تفتيح', 'صابون', 'غسول', 'مكياج', 'روج', 'شفاه']):
-        return 'Health & Beauty > Personal Care > Cosmetics', 'العناية بالجمال'
-    elif any(word in title_lower for word in ['جهاز', 'ماكينة', 'آلة', 'كهربائي', 'قابل للشحن', 'شاحن', 'سماعة', 'كاميرا', 'جوال', 'تابلت', 'ساعة']):
-        return 'Electronics', 'الإلكترونيات'
-    elif any(word in title_lower for word in ['فيتامين', 'مكمل', 'كبسولات', 'حبوب', 'علاج', 'مشد', 'مصحح', 'ركبة', 'ظهر']):
-        return 'Health & Beauty > Health Care', 'الصحة والعافية'
-    elif any(word in title_lower for word in ['ملابس', 'شورت', 'قميص', 'حقيبة', 'نظارة', 'حذاء', 'جورب']):
-        return 'Apparel & Accessories', 'الأزياء والموضة'
-    else:
-        return 'Home & Garden', 'المنزل والأدوات'
-
-def generate_product_html(product, descriptions=None):
+def generate_product_html(product, descriptions=None, related=None):
     """توليد صفحة HTML لمنتج واحد"""
     slug = create_slug(product)
     encoded_slug = quote(slug)
     image_link = fix_image_url(product.get('image_link', ''))
     
-    price = float(product.get('price', 0))
-    sale_price = float(product.get('sale_price', 0))
-    discount = price - sale_price
-    discount_percentage = int((discount / price) * 100) if price > 0 else 0
+    price, sale_price = (format_price(value) for value in product_prices(product))
+    amount, discount_percentage = product_discount(product)
+    discount = format_price(amount)
     
     description = get_product_description(product['id'], product['title'], descriptions)
+    meta_description, og_description = get_product_meta_descriptions(product['id'], product['title'], descriptions)
     
     product_url = f"https://sherow1982.github.io/alsooq-alsaudi/products/{encoded_slug}.html"
-    
+    # المنتجات المشابهة تُحمّل مسبقاً (js/prefetch.js)
+    related_urls = [f"{quote(create_slug(item))}.html" for item in related or []]
+
     whatsapp_message = f"""مرحباً، أريد طلب المنتج التالي:
 
 📦 المنتج: {product['title']}
@@ -145,27 +213,22 @@ def generate_product_html(product, descriptions=None):
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <meta name="description" content="{description[:160].replace('"', '&quot;')}">
+    <meta name="description" content="{meta_description}">
     <meta property="og:title" content="{product['title'].replace('"', '&quot;')}">
-    <meta property="og:description" content="{description[:200].replace('"', '&quot;')}">
+    <meta property="og:description" content="{og_description}">
     <meta property="og:image" content="{image_link}">
     <meta property="og:url" content="{product_url}">
     <title>{product['title']} | السوق السعودي للتميز</title>
 
-    <link rel="stylesheet" href="../css/main.css">
-    <link rel="icon" type="image/svg+xml" href="../favicon.svg">
+    {stylesheet_tags('../', 'product')}
+    {favicon_links('../')}
+    {lcp_image_hints(image_link, [fix_image_url(item.get('image_link', '')) for item in related or []])}
 
-    <!-- Google Tag Manager -->
-    <script>(function(w,d,s,l,i){{w[l]=w[l]||[];w[l].push({{'gtm.start':
-    new Date().getTime(),event:'gtm.js'}});var f=d.getElementsByTagName(s)[0],
-    j=d.createElement(s),dl=l!='dataLayer'?'&l='+l:'';j.async=true;j.src=
-    'https://www.googletagmanager.com/gtm.js?id='+i+dl;f.parentNode.insertBefore(j,f);
-    }})(window,document,'script','dataLayer','GTM-KD9H36GM');</script>
-    <!-- End Google Tag Manager -->
+    {prefetch_tags('../', related_urls)}
+    {analytics_head()}
 </head>
 <body>
-    <noscript><iframe src="https://www.googletagmanager.com/ns.html?id=GTM-KD9H36GM"
-    height="0" width="0" style="display:none;visibility:hidden"></iframe></noscript>
+    {analytics_noscript()}
 
     <div class="topbar">
         <div class="topbar-content">
@@ -182,7 +245,7 @@ def generate_product_html(product, descriptions=None):
         <div class="header-content">
             <div class="logo">
                 <a href="../index.html">
-                    <img src="../logo.png" alt="السوق السعودي">
+                    {logo_picture('../')}
                 </a>
             </div>
             <nav class="nav-links" id="navLinks">
@@ -213,7 +276,7 @@ def generate_product_html(product, descriptions=None):
 
         <div class="product-layout">
             <div class="product-gallery">
-                <img src="{image_link}" alt="{product['title']}" loading="lazy">
+                <img src="{image_link}" alt="{product['title']}" {lcp_image_attrs(image_link)}>
             </div>
             <div class="product-details">
                 <h1>{product['title']}</h1>
@@ -257,7 +320,7 @@ def generate_product_html(product, descriptions=None):
                 </div>
             </div>
         </div>
-
+{render_related_products(related)}
         <!-- FAQ Section -->
         <div class="product-faq">
             <h2 class="faq-title">الأسئلة الشائعة</h2>
@@ -353,12 +416,23 @@ def generate_product_html(product, descriptions=None):
             }});
         }}
     </script>
+    {service_worker_registration('../')}
 </body>
 </html>"""
 
     return html
 
-def process_single_product(product, descriptions):
+def render_product_page(product, descriptions, related=None, lb_schema=None):
+    """الصفحة النهائية: القالب + السيو والسكيما (seo_optimizer) => تُكتب مرة واحدة على القرص"""
+    # استيراد متأخر: seo_optimizer يستورد create_slug من هنا
+    import seo_optimizer
+    if lb_schema is None:
+        lb_schema = seo_optimizer.create_local_business_schema()
+    html = generate_product_html(product, descriptions, related)
+    return seo_optimizer.inject_seo_into_html(html, product, lb_schema, descriptions)
+
+@profiled
+def process_single_product(product, descriptions, related=None, lb_schema=None):
     """Worker function to process a single product"""
     product_id = product.get('id', 'unknown')
     product_title = product.get('title', 'بدون عنوان')
@@ -375,7 +449,7 @@ def process_single_product(product, descriptions):
         if not slug:
             return False, f"Failed to create slug for product {product_id}"
         
-        html = generate_product_html(product, descriptions)
+        html = render_product_page(product, descriptions, related, lb_schema)
         if not html:
             return False, f"Failed to generate HTML for product {product_id}"
         
@@ -384,8 +458,7 @@ def process_single_product(product, descriptions):
         
         file_path = products_dir / f"{slug}.html"
         
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(html)
+        write_output(file_path, html)
         
         # التحقق من كتابة الملف
         if not file_path.exists() or file_path.stat().st_size == 0:
@@ -415,22 +488,43 @@ def main():
         return
     
     try:
-        with open(products_file, 'r', encoding='utf-8') as f:
-            products = json.load(f)
+        with open_catalog() as store:
+            excluded_ids = load_excluded_duplicates()
+            entries = [
+                (product, description)
+                for product, description in store.iter_products(with_descriptions=True)
+                if product.get('id') not in excluded_ids
+            ]
     except (json.JSONDecodeError, UnicodeDecodeError) as e:
         print(f"❌ خطأ في قراءة products.json: {e}")
         return
     except Exception as e:
-        print(f"❌ خطأ غير متوقع في قراءة products.json: {e}")
+        print(f"❌ خطأ غير متوقع في قراءة كتالوج المنتجات: {e}")
         return
     
-    if not products:
+    if not entries:
         print("⚠️ لا توجد منتجات في الملف")
         return
     
-    descriptions = load_descriptions()
+    if excluded_ids:
+        print(f"🚫 تم استبعاد {len(excluded_ids)} منتج مكرر")
+        # صفحات المنتجات المستبعدة من بناء سابق
+        stale_pages = excluded_page_files(excluded_ids)
+        for page in stale_pages:
+            page.unlink()
+        if stale_pages:
+            print(f"🗑️ حذف {len(stale_pages)} صفحة لمنتجات مستبعدة")
+    
+    products = [product for product, _ in entries]
+    related_index = load_related_index()
+    products_by_id = {p.get('id'): p for p in products}
+    from seo_optimizer import create_local_business_schema
+    lb_schema = create_local_business_schema()
     
     print(f"عدد المنتجات: {len(products)}")
+    # تنظيف الأوصاف مرة واحدة هنا (أو من الكاش) قبل fork => العمال لا يعيدون التنظيف
+    description_cache.prepare(((p['title'], d) for p, d in entries), ('html', 'meta', 'og', 'seo'))
+    description_cache.save_cache()
     print("جاري استخدام المعالجة المتوازية...\n")
     
     success_count = 0
@@ -442,7 +536,14 @@ def main():
     # استخدام عدد مناسب من العمليات
     max_workers = min(multiprocessing.cpu_count(), 4)
     with ProcessPoolExecutor(max_workers=max_workers) as executor:
-        futures = {executor.submit(process_single_product, p, descriptions): p for p in products}
+        # كل عملية تستقبل وصف منتجها فقط بدلاً من نسخة كاملة من descriptions.json لكل مهمة
+        futures = {
+            executor.submit(
+                process_single_product, p, {str(p['id']): description},
+                get_related_products(p, related_index, products_by_id), lb_schema
+            ): p
+            for p, description in entries
+        }
         
         processed_count = 0
         for future in as_completed(futures):
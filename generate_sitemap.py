@@ -4,6 +4,12 @@ from datetime import datetime, timezone
 import xml.etree.ElementTree as ET
 from defusedxml import minidom as safe_minidom
 
+from build_profile import profiled
+from output_writer import write_output
+from generate_all_pages import load_excluded_duplicates, excluded_page_files
+
+
+@profiled
 def generate_sitemap():
     base_url = "https://sherow1982.github.io/alsooq-alsaudi/"
     sitemap_file = "sitemap.xml"
@@ -28,7 +34,9 @@ def generate_sitemap():
     # 2. Product Pages
     products_dir = "products"
     if os.path.exists(products_dir):
-        product_files = [f for f in os.listdir(products_dir) if f.endswith(".html")]
+        # Duplicates excluded by detect_duplicates.py are not listed even if a stale page is left over
+        excluded = {path.name for path in excluded_page_files(load_excluded_duplicates())}
+        product_files = [f for f in os.listdir(products_dir) if f.endswith(".html") and f not in excluded]
         print(f"Found {len(product_files)} product pages.")
         
         for p_file in product_files:
@@ -45,8 +53,7 @@ def generate_sitemap():
     xml_str = ET.tostring(urlset, encoding='utf-8')
     pretty_xml = safe_minidom.parseString(xml_str).toprettyxml(indent="  ")
     
-    with open(sitemap_file, "w", encoding="utf-8") as f:
-        f.write(pretty_xml)
+    write_output(sitemap_file, pretty_xml, durable=True)
         
     print(f"Sitemap generated: {sitemap_file}")
 
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+أبعاد صور المنتجات (عرض × ارتفاع) مخزنة محلياً لتحسين LCP في صفحات المنتجات
+
+- الصورة الرئيسية في صفحة المنتج هي عنصر LCP: تُحمّل فوراً (loading=eager، fetchpriority=high)
+  مع preload في <head> و width/height لمنع إزاحة التخطيط، و preconnect لمصادر الصور
+- الأبعاد من رأس الصورة فقط: أول IMAGE_PROBE_BYTES بايت عبر طلب Range (أو من .cache/images إذا كانت الصورة محملة)
+- الكاش: .cache/image-dimensions.json (رابط الصورة => [العرض، الارتفاع])؛ المحاولات الفاشلة تُعاد بعد RETRY_DAYS
+- بدون إنترنت: تتوقف المحاولات بعد MAX_FAILURES فشل متتالٍ بلا أي نجاح، والصفحات تُولد بدون width/height للصور المجهولة
+
+الاستخدام:
+    python image_dimensions.py            # الصور الجديدة فقط
+    python image_dimensions.py --offline  # من .cache/images فقط بدون شبكة
+"""
+
+import sys
+import json
+import argparse
+import urllib.request
+from pathlib import Path
+from datetime import date, timedelta
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image, ImageFile
+
+from output_writer import write_output
+
+# Force UTF-8 for output to avoid encoding errors on Windows
+if sys.stdout.encoding and sys.stdout.encoding.lower() != 'utf-8':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+CACHE_FILE = Path('.cache/image-dimensions.json')
+IMAGE_CACHE_DIR = Path('.cache/images')
+BASE_URL = "https://sherow1982.github.io/alsooq-alsaudi"
+
+IMAGE_PROBE_BYTES = 64 * 1024
+PROBE_TIMEOUT = 10
+PROBE_WORKERS = 8
+PROBE_BATCH = 64
+MAX_FAILURES = 16
+RETRY_DAYS = 7
+
+_cache = None
+
+
+def load_cache():
+    """{'images': {رابط: [عرض، ارتفاع]}, 'failed': {رابط: تاريخ آخر محاولة}}"""
+    global _cache
+    if _cache is None:
+        try:
+            with open(CACHE_FILE, 'r', encoding='utf-8') as f:
+                _cache = json.load(f)
+        except Exception:
+            _cache = {}
+        _cache.setdefault('images', {})
+        _cache.setdefault('failed', {})
+    return _cache
+
+
+def image_size(url):
+    """(العرض، الارتفاع) من الكاش أو None"""
+    size = load_cache()['images'].get(url)
+    return tuple(size) if size else None
+
+
+# ----------------------------------------------------------------------
+# وسوم HTML لصورة LCP
+# ----------------------------------------------------------------------
+
+def image_preconnects(urls):
+    """preconnect لكل مصدر صور خارجي في الصفحة (بترتيب الظهور)"""
+    origins = []
+    for url in urls:
+        parsed = urlparse(url or '')
+        origin = f"{parsed.scheme}://{parsed.netloc}" if parsed.scheme and parsed.netloc else None
+        if origin and origin not in origins and not BASE_URL.startswith(origin):
+            origins.append(origin)
+    return '\n    '.join(f'<link rel="preconnect" href="{origin}">' for origin in origins)
+
+
+def lcp_image_hints(url, other_urls=()):
+    """preconnect + preload للصورة الرئيسية في <head>"""
+    if not url:
+        return ''
+    return (f'{image_preconnects([url, *other_urls])}\n'
+            f'    <link rel="preload" as="image" href="{url}" fetchpriority="high">')
+
+
+def lcp_image_attrs(url):
+    """خصائص <img> للصورة الرئيسية: تحميل فوري بأولوية عالية + الأبعاد إذا كانت معروفة"""
+    attrs = 'loading="eager" fetchpriority="high"'
+    size = image_size(url)
+    if size:
+        attrs = f'width="{size[0]}" height="{size[1]}" {attrs}'
+    return attrs
+
+
+# ----------------------------------------------------------------------
+# قراءة الأبعاد
+# ----------------------------------------------------------------------
+
+def local_size(product_id):
+    """الأبعاد من نسخة الصورة في .cache/images (يحملها detect_duplicates.py --fetch-images)"""
+    path = IMAGE_CACHE_DIR / f"{product_id}.jpg"
+    if not path.exists():
+        return None
+    try:
+        with Image.open(path) as img:
+            return list(img.size)
+    except Exception:
+        return None
+
+
+def probe_size(url):
+    """الأبعاد من رأس الصورة فقط (طلب Range) - None عند الفشل"""
+    request = urllib.request.Request(url, headers={'Range': f'bytes=0-{IMAGE_PROBE_BYTES - 1}'})
+    parser = ImageFile.Parser()
+    try:
+        with urllib.request.urlopen(request, timeout=PROBE_TIMEOUT) as response:
+            while parser.image is None:
+                chunk = response.read(8192)
+                if not chunk:
+                    break
+                parser.feed(chunk)
+    except Exception:
+        return None
+    return list(parser.image.size) if parser.image else None
+
+
+def update_cache(products, offline=False):
+    """أبعاد الصور غير المعروفة: (من الكاش المحلي، من الشبكة، فشل)"""
+    from generate_all_pages import fix_image_url
+
+    cache = load_cache()
+    images, failed = cache['images'], cache['failed']
+    retry_before = (date.today() - timedelta(days=RETRY_DAYS)).isoformat()
+
+    missing = []
+    local = 0
+    for product in products:
+        url = fix_image_url(product.get('image_link', ''))
+        if not url or url in images:
+            continue
+        size = local_size(product['id'])
+        if size:
+            images[url] = size
+            failed.pop(url, None)
+            local += 1
+        elif failed.get(url, '') < retry_before and url not in missing:
+            missing.append(url)
+
+    probed = errors = 0
+    if missing and not offline:
+        with ThreadPoolExecutor(max_workers=PROBE_WORKERS) as executor:
+            for start in range(0, len(missing), PROBE_BATCH):
+                batch = missing[start:start + PROBE_BATCH]
+                for url, size in zip(batch, executor.map(probe_size, batch)):
+                    if size:
+                        images[url] = size
+                        failed.pop(url, None)
+                        probed += 1
+                    else:
+                        failed[url] = date.today().isoformat()
+                        errors += 1
+                if not probed and errors >= MAX_FAILURES:
+                    print(f"⚠️ فشل {errors} طلب بدون أي نجاح - إيقاف قراءة الأبعاد (لا يوجد اتصال؟)")
+                    break
+
+    write_output(CACHE_FILE, json.dumps(cache, ensure_ascii=False, indent=2))
+    return local, probed, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description='أبعاد صور المنتجات لتحسين LCP')
+    parser.add_argument('--offline', action='store_true', help='استخدام .cache/images فقط بدون طلبات شبكة')
+    args = parser.parse_args()
+
+    from catalog_store import open_catalog
+    with open_catalog() as store:
+        products = list(store.iter_products())
+
+    local, probed, errors = update_cache(products, offline=args.offline)
+    known = len(load_cache()['images'])
+    print(f"📐 أبعاد {known} صورة معروفة ({local} من الكاش المحلي، {probed} من الشبكة، {errors} فشل)")
+    if known < len(products):
+        print(f"ℹ️ {len(products) - known} صورة بدون أبعاد - تُعرض بدون width/height حتى تنجح القراءة")
+
+
+if __name__ == '__main__':
+    main()
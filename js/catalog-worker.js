@@ -0,0 +1,236 @@
+/*
+ * فلترة منتجات المتجر وترتيبها وتقسيمها لصفحات خارج الخيط الرئيسي (Web Worker لـ index.html)
+ *
+ * - الـ worker يحمّل products.json و pricing.json و facets.json ويحتفظ بالكتالوج؛ الصفحة تستقبل منتجات الصفحة الحالية فقط
+ * - الفلاتر (الفئة، شريحة السعر، الخصم) من facets.json (facets.py): AND على bitmaps (32 منتج لكل عملية)
+ *   والترتيب (السعر، الخصم، الأحدث) جاهز من البناء => البحث بالنص هو الشيء الوحيد الذي يمر على العناوين
+ * - كل استعلام له رقم (seq): المرور على المنتجات على دفعات (CHUNK_SIZE) ويتوقف إذا وصل استعلام أحدث
+ * - نتيجة آخر استعلام محفوظة => "اكتشف المزيد" لا يعيد الفلترة
+ * - المنتجات المكررة المستبعدة (facets.excluded) لا تُعرض لأن صفحاتها محذوفة
+ * - بدون facets.json أو إذا لم تطابق IDs فيه products.json: الفئات من CATEGORY_PATTERNS والبحث بترتيب الكتالوج
+ *   (بدون فلاتر السعر والخصم)
+ *
+ * الرسائل:
+ *   {type: 'load', products, pricing, facets}                            => {type: 'loaded', total, facets}
+ *   {type: 'query', seq, search, filters: {category, price, discount},
+ *    sort, offset, limit}                                                 => {type: 'result', seq, offset, total, ids, items}
+ *   أي خطأ                                                                => {type: 'error', seq, message}
+ *
+ *   قيمة الفلتر 'all' أو غير موجودة = بدون فلتر؛ sort: 'default' | 'price' | 'price_desc' | 'discount' | 'newest'
+ */
+'use strict';
+
+const CHUNK_SIZE = 2000;
+// نفس كلمات STOREFRONT_CATEGORIES في facets.py - بديل bitmaps الفئات إذا لم يتوفر facets.json صالح
+const CATEGORY_PATTERNS = {
+    beauty: /شعر|بشرة|كريم|جمال|مكياج/i,
+    health: /صحة|فيتامين|علاج|مكمل/i,
+    electronics: /جهاز|ماكينة|كهربائي|جوال|ساعة/i,
+    home: /منزل|مطبخ|أدوات/i,
+};
+
+// المنتجات بترتيب facets.json (البت i في كل bitmap = products[i])
+let products = [];
+let titles = [];
+// اسم الفلتر => (القيمة => Uint32Array)
+let bitmaps = {};
+// اسم الترتيب => Uint32Array من أرقام المنتجات
+let orders = {};
+// نسب الخصم المحسوبة مسبقاً (pricing.py) - ID -> نسبة
+let discountPercents = new Map();
+let ready = null;
+let latestSeq = 0;
+let lastResult = null;
+
+const nextTick = () => new Promise(resolve => setTimeout(resolve, 0));
+
+function discountPercent(product) {
+    if (discountPercents.has(product.id)) return discountPercents.get(product.id);
+    // نفس معادلة pricing.py (تقريب للأسفل) إذا لم يتوفر pricing.json
+    return product.price > 0 ? Math.max(Math.floor((product.price - product.sale_price) / product.price * 100 + 1e-9), 0) : 0;
+}
+
+async function fetchOptional(url, name) {
+    try {
+        const res = await fetch(url);
+        if (res.ok) return await res.json();
+    } catch (e) {
+        console.warn(`${name} غير متوفر`, e);
+    }
+    return null;
+}
+
+// base64 من np.packbits(bitorder='little') => Uint32Array (بحجم مضاعف لـ 4 بايت)
+function decodeBitmap(bits, size) {
+    const bytes = new Uint8Array(Math.ceil(size / 32) * 4);
+    const binary = atob(bits);
+    for (let i = 0; i < binary.length; i++) bytes[i] = binary.charCodeAt(i);
+    return new Uint32Array(bytes.buffer);
+}
+
+// bitmaps الفئات من العناوين مباشرة (بنفس تنسيق facets.json)
+function categoryBitmaps(list) {
+    const result = {};
+    for (const [name, pattern] of Object.entries(CATEGORY_PATTERNS)) {
+        const bitmap = new Uint32Array(Math.ceil(list.length / 32));
+        list.forEach((p, i) => {
+            if (pattern.test(p.title)) bitmap[i >>> 5] |= 1 << (i & 31);
+        });
+        result[name] = bitmap;
+    }
+    return result;
+}
+
+// facets.json مبني من نفس products.json؟ (نفس المنتجات بالضبط، بأي ترتيب)
+function facetsMatch(facets, byId) {
+    return facets.ids.length === byId.size && new Set(facets.ids).size === byId.size
+        && facets.ids.every(id => byId.has(id));
+}
+
+async function load(urls) {
+    const [res, pricing, facets] = await Promise.all([
+        fetch(urls.products),
+        fetchOptional(urls.pricing, 'pricing.json'),
+        fetchOptional(urls.facets, 'facets.json'),
+    ]);
+    if (!res.ok) throw new Error('فشل تحميل products.json');
+    const excluded = new Set(facets && facets.excluded || []);
+    const catalog = (await res.json()).filter(p => !excluded.has(p.id));
+    if (pricing) discountPercents = new Map(pricing.ids.map((id, i) => [id, pricing.percent[i]]));
+
+    bitmaps = {};
+    orders = {};
+    products = catalog;
+    let summary = {};
+    if (facets) {
+        const byId = new Map(catalog.map(p => [p.id, p]));
+        if (facetsMatch(facets, byId)) {
+            products = facets.ids.map(id => byId.get(id));
+            for (const [name, values] of Object.entries(facets.facets)) {
+                bitmaps[name] = {};
+                for (const value of values) bitmaps[name][value.key] = decodeBitmap(value.bits, products.length);
+            }
+            for (const [name, order] of Object.entries(facets.sort)) orders[name] = Uint32Array.from(order);
+            summary = facetSummary(facets);
+        } else {
+            // facets.json من بناء أقدم أو أحدث من products.json
+            console.warn(`facets.json لا يطابق products.json (${facets.ids.length} مقابل ${catalog.length} منتج) - ` +
+                'الفئات من العناوين، وفلاتر السعر والخصم والترتيب غير متاحة');
+        }
+    }
+    bitmaps.category = { ...categoryBitmaps(products), ...bitmaps.category };
+    titles = products.map(p => String(p.title).toLowerCase());
+    return summary;
+}
+
+// القيم المتاحة لكل فلتر (بدون الـ bitmaps) لبناء القوائم في الصفحة
+function facetSummary(facets) {
+    const summary = {};
+    for (const [name, values] of Object.entries(facets.facets)) {
+        summary[name] = values.map(({ key, label, count }) => ({ key, label, count }));
+    }
+    return summary;
+}
+
+// تقاطع الفلاتر المختارة، أو null إذا لم يُختر أي فلتر
+function filterMask(filters) {
+    let mask = null;
+    for (const [name, value] of Object.entries(filters || {})) {
+        if (!value || value === 'all') continue;
+        let bitmap = bitmaps[name] && bitmaps[name][value];
+        if (!bitmap) {
+            // قيمة غير معروفة: لا نتائج بدلاً من تجاهل الفلتر وعرض كل المنتجات
+            console.warn(`فلتر غير متاح: ${name}=${value}`);
+            bitmap = new Uint32Array(Math.ceil(products.length / 32));
+        }
+        if (mask === null) {
+            mask = bitmap.slice();
+        } else {
+            for (let w = 0; w < mask.length; w++) mask[w] &= bitmap[w];
+        }
+    }
+    return mask;
+}
+
+function sortOrder(sort) {
+    if (sort === 'price_desc' && orders.price) return { order: orders.price, reverse: true };
+    return { order: orders[sort] || null, reverse: false };
+}
+
+// أرقام المنتجات المطابقة بالترتيب المطلوب، أو null إذا أُلغي الاستعلام بوصول استعلام أحدث
+async function filter(query) {
+    const search = query.search.toLowerCase();
+    const mask = filterMask(query.filters);
+    const { order, reverse } = sortOrder(query.sort);
+    const count = products.length;
+    const matches = [];
+    for (let start = 0; start < count; start += CHUNK_SIZE) {
+        if (start > 0) {
+            await nextTick();
+            if (query.seq !== latestSeq) return null;
+        }
+        const end = Math.min(start + CHUNK_SIZE, count);
+        for (let k = start; k < end; k++) {
+            const n = reverse ? count - 1 - k : k;
+            const i = order ? order[n] : n;
+            if (mask && !(mask[i >>> 5] & (1 << (i & 31)))) continue;
+            if (search && !titles[i].includes(search)) continue;
+            matches.push(i);
+        }
+    }
+    return matches;
+}
+
+function pageItem(index) {
+    const p = products[index];
+    return {
+        id: p.id,
+        title: p.title,
+        image_link: p.image_link,
+        price: p.price,
+        sale_price: p.sale_price,
+        discount: discountPercent(p),
+    };
+}
+
+function queryKey(query) {
+    const filters = Object.entries(query.filters || {}).sort().map(([name, value]) => `${name}=${value}`);
+    return [query.search.toLowerCase(), query.sort || 'default', ...filters].join('\u0000');
+}
+
+async function runQuery(query) {
+    latestSeq = query.seq;
+    await ready;
+    if (query.seq !== latestSeq) return;
+
+    const key = queryKey(query);
+    let matches = lastResult && lastResult.key === key ? lastResult.matches : await filter(query);
+    if (matches === null) return;
+    lastResult = { key, matches };
+
+    const page = matches.slice(query.offset, query.offset + query.limit);
+    self.postMessage({
+        type: 'result',
+        seq: query.seq,
+        offset: query.offset,
+        total: matches.length,
+        ids: page.map(i => products[i].id),
+        items: page.map(pageItem),
+    });
+}
+
+self.onmessage = async (event) => {
+    const message = event.data;
+    try {
+        if (message.type === 'load') {
+            lastResult = null;
+            ready = load(message);
+            const facets = await ready;
+            self.postMessage({ type: 'loaded', total: products.length, facets });
+        } else if (message.type === 'query') {
+            await runQuery(message);
+        }
+    } catch (e) {
+        self.postMessage({ type: 'error', seq: message.seq, message: String(e && e.message || e) });
+    }
+};
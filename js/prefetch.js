@@ -0,0 +1,135 @@
+/*
+ * تحميل مسبق لصفحات المنتجات المتوقع فتحها (Speculation Rules مع بديل <link rel="prefetch">)
+ *
+ * - الإعدادات من data-config في وسم السكربت (speculation.py => config.json prefetch_config)
+ * - العناصر المرشحة: [data-prefetch] (القيمة = الرابط، أو href إذا كانت فارغة) - حتى المضافة لاحقاً بـ JavaScript
+ *     ظاهرة في الشاشة  => prefetch عند خمول المتصفح
+ *     مرور الماوس/لمس  => prerender (أو prefetch إذا انتهت ميزانية prerender أو المتصفح لا يدعمه)
+ * - config.urls: روابط تُحمّل مسبقاً بعد التحميل مباشرة (المنتجات المشابهة في صفحة المنتج)
+ * - الحد الأقصى: budget رابط prefetch و prerender_budget رابط prerender لكل صفحة
+ * - لا شيء مع Save-Data أو الاتصالات البطيئة (slow_connections حسب navigator.connection.effectiveType)
+ */
+(function () {
+    'use strict';
+
+    var script = document.currentScript;
+    var config = {};
+    try {
+        config = JSON.parse(script && script.getAttribute('data-config') || '{}');
+    } catch (e) {
+        return;
+    }
+
+    var budget = config.budget || 0;
+    var prerenderBudget = config.prerender_budget || 0;
+    var slowConnections = config.slow_connections || [];
+    var supportsRules = !!(HTMLScriptElement.supports && HTMLScriptElement.supports('speculationrules'));
+    // رابط => 'prefetch' | 'prerender'
+    var done = new Map();
+    var queue = [];
+    var scheduled = false;
+
+    function allowed() {
+        var connection = navigator.connection;
+        if (!connection) return true;
+        return !connection.saveData && slowConnections.indexOf(connection.effectiveType) === -1;
+    }
+
+    function resolve(href) {
+        try {
+            var url = new URL(href, location.href);
+            url.hash = '';
+            return url.origin === location.origin && url.href !== location.href ? url.href : null;
+        } catch (e) {
+            return null;
+        }
+    }
+
+    function count(action) {
+        var n = 0;
+        done.forEach(function (value) { if (value === action) n++; });
+        return n;
+    }
+
+    function speculate(url, action) {
+        if (!url || !allowed()) return;
+        var previous = done.get(url);
+        if (previous === 'prerender' || (previous && action === 'prefetch')) return;
+        if (action === 'prerender' && (!supportsRules || count('prerender') >= prerenderBudget)) action = 'prefetch';
+        if (action === 'prefetch' && (previous || count('prefetch') >= budget)) return;
+        done.set(url, action);
+
+        if (supportsRules) {
+            var rules = document.createElement('script');
+            rules.type = 'speculationrules';
+            var body = {};
+            body[action] = [{ source: 'list', urls: [url] }];
+            rules.textContent = JSON.stringify(body);
+            document.head.appendChild(rules);
+        } else {
+            var link = document.createElement('link');
+            link.rel = 'prefetch';
+            link.as = 'document';
+            link.href = url;
+            document.head.appendChild(link);
+        }
+    }
+
+    function flush() {
+        scheduled = false;
+        while (queue.length) speculate(queue.shift(), 'prefetch');
+    }
+
+    function enqueue(url) {
+        if (!url || done.has(url) || queue.indexOf(url) !== -1) return;
+        queue.push(url);
+        if (!scheduled) {
+            scheduled = true;
+            (window.requestIdleCallback || function (callback) { setTimeout(callback, 1); })(flush, { timeout: 2000 });
+        }
+    }
+
+    function target(element) {
+        return resolve(element.getAttribute('data-prefetch') || element.getAttribute('href') || '');
+    }
+
+    if (!budget || !allowed()) return;
+
+    var visible = 'IntersectionObserver' in window ? new IntersectionObserver(function (entries) {
+        entries.forEach(function (entry) {
+            if (!entry.isIntersecting) return;
+            visible.unobserve(entry.target);
+            enqueue(target(entry.target));
+        });
+    }, { threshold: 0.5 }) : null;
+
+    function observe(root) {
+        if (!visible || !root.querySelectorAll) return;
+        if (root.matches && root.matches('[data-prefetch]')) visible.observe(root);
+        root.querySelectorAll('[data-prefetch]').forEach(function (element) { visible.observe(element); });
+    }
+
+    function onIntent(event) {
+        var element = event.target.closest && event.target.closest('[data-prefetch]');
+        if (element) speculate(target(element), 'prerender');
+    }
+
+    document.addEventListener('pointerover', onIntent, { passive: true });
+    document.addEventListener('touchstart', onIntent, { passive: true });
+    document.addEventListener('focusin', onIntent);
+
+    function start() {
+        observe(document);
+        // بطاقات المتجر تُضاف بعد التحميل
+        new MutationObserver(function (mutations) {
+            mutations.forEach(function (mutation) { mutation.addedNodes.forEach(observe); });
+        }).observe(document.body, { childList: true, subtree: true });
+        (config.urls || []).forEach(function (href) { enqueue(resolve(href)); });
+    }
+
+    if (document.readyState === 'loading') {
+        document.addEventListener('DOMContentLoaded', start);
+    } else {
+        start();
+    }
+})();
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+تحسين الصور الثابتة للموقع (الأيقونة، الشعار، صورة الواجهة)
+
+- favicon.svg (صورة PNG بحجم 1024px رغم الامتداد) => favicon.ico + PNG صغيرة + apple-touch-icon
+- logo.png => نسخ بحجم العرض الفعلي (55px و 110px للشاشات عالية الدقة) بصيغ AVIF و WebP و PNG
+- hero-banner.png => عروض متعددة (srcset) بصيغ AVIF و WebP و JPEG
+- الناتج في assets/ مع assets/manifest.json، ولا يُعاد الترميز إذا لم يتغير المصدر
+- إعادة كتابة المراجع في الصفحات الثابتة (index.html، about.html، ...)؛ صفحات المنتجات
+  تستخدم favicon_links() و logo_picture() مباشرة في القالب
+- تقرير الحجم قبل وبعد: reports/assets.json
+
+الاستخدام:
+    python optimize_assets.py
+"""
+
+import re
+import sys
+import json
+import hashlib
+from io import BytesIO
+from pathlib import Path
+
+from output_writer import write_output
+from fingerprint_assets import asset_url
+
+# Force UTF-8 for output to avoid encoding errors on Windows
+if sys.stdout.encoding and sys.stdout.encoding.lower() != 'utf-8':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+ASSETS_DIR = Path('assets')
+MANIFEST_FILE = ASSETS_DIR / 'manifest.json'
+REPORT_FILE = Path('reports/assets.json')
+
+FAVICON_SOURCE = Path('favicon.svg')
+LOGO_SOURCE = Path('logo.png')
+HERO_SOURCE = Path('hero-banner.png')
+
+ICO_SIZES = [16, 32, 48]
+FAVICON_PNG_SIZE = 32
+APPLE_TOUCH_SIZE = 180
+# ارتفاع الشعار في css/main.css (.logo img) => نسخة 1x و 2x
+LOGO_HEIGHT = 55
+HERO_WIDTHS = [640, 1024]
+
+AVIF_QUALITY = 55
+WEBP_QUALITY = 80
+JPEG_QUALITY = 80
+
+STATIC_PAGES = ['index.html', 'about.html', 'contact.html', 'privacy.html', 'terms.html',
+                'shipping.html', 'return-policy.html', 'reviews.html', '404.html']
+
+_manifest = None
+
+
+def load_manifest():
+    """assets/manifest.json (أو {} إذا لم تُولد الصور بعد => القوالب تستخدم الملفات الأصلية)"""
+    global _manifest
+    if _manifest is None:
+        try:
+            with open(MANIFEST_FILE, 'r', encoding='utf-8') as f:
+                _manifest = json.load(f)
+        except Exception:
+            _manifest = {}
+    return _manifest
+
+
+# ----------------------------------------------------------------------
+# وسوم HTML (prefix = '' للصفحات الثابتة و '../' لصفحات المنتجات)
+# ----------------------------------------------------------------------
+
+def favicon_links(prefix=''):
+    favicon = load_manifest().get('favicon')
+    if not favicon:
+        return f'<link rel="icon" type="image/svg+xml" href="{prefix}favicon.svg">'
+    return (f'<link rel="icon" href="{prefix}{asset_url(favicon["ico"])}" sizes="any">\n'
+            f'    <link rel="icon" type="image/png" sizes="{FAVICON_PNG_SIZE}x{FAVICON_PNG_SIZE}" href="{prefix}{asset_url(favicon["png"])}">\n'
+            f'    <link rel="apple-touch-icon" href="{prefix}{asset_url(favicon["apple_touch"])}">')
+
+
+def _srcset(prefix, files):
+    return ', '.join(f'{prefix}{asset_url(path)} {descriptor}' for descriptor, path in files)
+
+
+def logo_picture(prefix='', alt='السوق السعودي'):
+    logo = load_manifest().get('logo')
+    if not logo:
+        return f'<img src="{prefix}logo.png" alt="{alt}">'
+    width, height = logo['width'], logo['height']
+    return (f'<picture>'
+            f'<source type="image/avif" srcset="{_srcset(prefix, logo["avif"])}">'
+            f'<source type="image/webp" srcset="{_srcset(prefix, logo["webp"])}">'
+            f'<img src="{prefix}{asset_url(logo["png"][0][1])}" srcset="{_srcset(prefix, logo["png"])}" '
+            f'alt="{alt}" width="{width}" height="{height}">'
+            f'</picture>')
+
+
+def hero_picture(prefix='', alt='', css_class='hero-image'):
+    hero = load_manifest().get('hero')
+    if not hero:
+        return f'<img src="{prefix}hero-banner.png" alt="{alt}" class="{css_class}">'
+    return (f'<picture>'
+            f'<source type="image/avif" srcset="{_srcset(prefix, hero["avif"])}" sizes="100vw">'
+            f'<source type="image/webp" srcset="{_srcset(prefix, hero["webp"])}" sizes="100vw">'
+            f'<img src="{prefix}{asset_url(hero["jpeg"][-1][1])}" srcset="{_srcset(prefix, hero["jpeg"])}" sizes="100vw" '
+            f'alt="{alt}" class="{css_class}" width="{hero["width"]}" height="{hero["height"]}">'
+            f'</picture>')
+
+
+# ----------------------------------------------------------------------
+# الترميز
+# ----------------------------------------------------------------------
+
+def _file_hash(path):
+    return hashlib.sha1(path.read_bytes()).hexdigest()
+
+
+def _encode(image, fmt, **options):
+    output = BytesIO()
+    image.save(output, format=fmt, **options)
+    return output.getvalue()
+
+
+def _save(name, data):
+    """حفظ ملف في assets/ وإرجاع مساره من جذر الموقع"""
+    path = ASSETS_DIR / name
+    write_output(path, data)
+    return path.as_posix()
+
+
+def _resize(image, width, height):
+    from PIL import Image
+    return image.resize((width, height), Image.LANCZOS)
+
+
+def _open(path):
+    from PIL import Image
+    image = Image.open(path)
+    image.load()
+    return image.convert('RGBA') if image.mode in ('RGBA', 'LA', 'P') else image.convert('RGB')
+
+
+def build_favicon(source):
+    image = _open(source)
+    square = min(image.size)
+    image = image.crop((0, 0, square, square))
+    icon = _resize(image, max(ICO_SIZES), max(ICO_SIZES))
+    return {
+        'ico': _save('favicon.ico', _encode(icon, 'ICO', sizes=[(s, s) for s in ICO_SIZES])),
+        'png': _save(f'favicon-{FAVICON_PNG_SIZE}.png',
+                     _encode(_resize(image, FAVICON_PNG_SIZE, FAVICON_PNG_SIZE), 'PNG', optimize=True)),
+        'apple_touch': _save('apple-touch-icon.png',
+                             _encode(_resize(image, APPLE_TOUCH_SIZE, APPLE_TOUCH_SIZE).convert('RGB'), 'PNG', optimize=True)),
+    }
+
+
+def build_logo(source):
+    image = _open(source)
+    width = round(image.width * LOGO_HEIGHT / image.height)
+    result = {'width': width, 'height': LOGO_HEIGHT, 'avif': [], 'webp': [], 'png': []}
+    for scale in (1, 2):
+        resized = _resize(image, width * scale, LOGO_HEIGHT * scale)
+        base = f'logo-{LOGO_HEIGHT * scale}'
+        result['avif'].append([f'{scale}x', _save(f'{base}.avif', _encode(resized, 'AVIF', quality=AVIF_QUALITY))])
+        result['webp'].append([f'{scale}x', _save(f'{base}.webp', _encode(resized, 'WEBP', quality=WEBP_QUALITY, method=6))])
+        # PNG بلوحة 256 لون (الشعار بألوان قليلة) للمتصفحات القديمة
+        palette = resized.quantize(256) if resized.mode == 'RGB' else resized
+        result['png'].append([f'{scale}x', _save(f'{base}.png', _encode(palette, 'PNG', optimize=True))])
+    return result
+
+
+def build_hero(source):
+    image = _open(source).convert('RGB')
+    result = {'width': image.width, 'height': image.height, 'avif': [], 'webp': [], 'jpeg': []}
+    for width in HERO_WIDTHS:
+        width = min(width, image.width)
+        resized = image if width == image.width else _resize(image, width, round(image.height * width / image.width))
+        base = f'hero-{width}'
+        result['avif'].append([f'{width}w', _save(f'{base}.avif', _encode(resized, 'AVIF', quality=AVIF_QUALITY))])
+        result['webp'].append([f'{width}w', _save(f'{base}.webp', _encode(resized, 'WEBP', quality=WEBP_QUALITY, method=6))])
+        result['jpeg'].append([f'{width}w', _save(f'{base}.jpg', _encode(resized, 'JPEG', quality=JPEG_QUALITY,
+                                                                           optimize=True, progressive=True))])
+    return result
+
+
+BUILDERS = {
+    'favicon': (FAVICON_SOURCE, build_favicon),
+    'logo': (LOGO_SOURCE, build_logo),
+    'hero': (HERO_SOURCE, build_hero),
+}
+
+
+def _outputs(entry):
+    """كل ملفات الناتج في عنصر من المانيفست"""
+    for value in entry.values():
+        if isinstance(value, str) and value.startswith(f"{ASSETS_DIR.as_posix()}/"):
+            yield value
+        elif isinstance(value, list):
+            yield from (path for _, path in value)
+
+
+def build_assets():
+    """توليد الصور المتغيرة فقط وتحديث المانيفست"""
+    global _manifest
+    previous = load_manifest()
+    manifest = {}
+    for name, (source, builder) in BUILDERS.items():
+        if not source.exists():
+            print(f"⚠️ {source} غير موجود - تم التخطي")
+            continue
+        digest = _file_hash(source)
+        entry = previous.get(name)
+        if entry and entry.get('source_hash') == digest and all(Path(p).exists() for p in _outputs(entry)):
+            manifest[name] = entry
+            continue
+        entry = builder(source)
+        entry['source'] = str(source)
+        entry['source_hash'] = digest
+        manifest[name] = entry
+        print(f"🖼️ {source} => {len(list(_outputs(entry)))} ملف")
+    write_output(MANIFEST_FILE, json.dumps(manifest, ensure_ascii=False, indent=2))
+    _manifest = manifest
+    return manifest
+
+
+# ----------------------------------------------------------------------
+# إعادة كتابة المراجع في الصفحات الثابتة
+# ----------------------------------------------------------------------
+
+ICON_LINK = re.compile(r'<link rel="icon" type="image/(?:svg\+xml|png)" href="(?:favicon\.svg|logo\.png)">')
+LOGO_IMG = re.compile(r'<img src="logo\.png" alt="([^"]*)">')
+HERO_IMG = re.compile(r'<img src="hero-banner\.png" alt="([^"]*)" class="([^"]*)">')
+
+
+def rewrite_page(path):
+    content = path.read_text(encoding='utf-8')
+    updated = ICON_LINK.sub(lambda m: favicon_links(), content)
+    updated = LOGO_IMG.sub(lambda m: logo_picture(alt=m.group(1)), updated)
+    updated = HERO_IMG.sub(lambda m: hero_picture(alt=m.group(1), css_class=m.group(2)), updated)
+    return write_output(path, updated)
+
+
+# ----------------------------------------------------------------------
+# التقرير
+# ----------------------------------------------------------------------
+
+def _size(path):
+    return path.stat().st_size if path.exists() else 0
+
+
+def build_report(manifest):
+    """الحجم قبل/بعد لكل صورة، وحجم الصور في أول زيارة لصفحة منتج (أيقونة + شعار 2x بصيغة AVIF)"""
+    assets = {}
+    for name, entry in manifest.items():
+        outputs = {path: _size(Path(path)) for path in _outputs(entry)}
+        assets[name] = {'source': entry['source'], 'source_bytes': _size(Path(entry['source'])), 'outputs': outputs}
+
+    before = _size(FAVICON_SOURCE) + _size(LOGO_SOURCE)
+    after = 0
+    if 'favicon' in manifest:
+        after += _size(Path(manifest['favicon']['png']))
+    if 'logo' in manifest:
+        after += _size(Path(manifest['logo']['avif'][-1][1]))
+    return {
+        'assets': assets,
+        'product_page_first_visit': {'before_bytes': before, 'after_bytes': after, 'saved_bytes': before - after},
+    }
+
+
+def main():
+    manifest = build_assets()
+    rewritten = [page for page in STATIC_PAGES if Path(page).exists() and rewrite_page(Path(page))]
+    report = build_report(manifest)
+    write_output(REPORT_FILE, json.dumps(report, ensure_ascii=False, indent=2))
+
+    for name, stats in report['assets'].items():
+        total = sum(stats['outputs'].values())
+        print(f"   {stats['source']}: {stats['source_bytes'] / 1024:.0f} KB => {len(stats['outputs'])} ملف ({total / 1024:.0f} KB إجمالاً)")
+    if rewritten:
+        print(f"✏️ تحديث المراجع في: {', '.join(rewritten)}")
+    first_visit = report['product_page_first_visit']
+    print(f"✅ صور صفحة المنتج في أول زيارة: {first_visit['before_bytes'] / 1024:.0f} KB => "
+          f"{first_visit['after_bytes'] / 1024:.1f} KB (توفير {first_visit['saved_bytes'] / 1024:.0f} KB)")
+
+
+if __name__ == '__main__':
+    main()
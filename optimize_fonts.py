@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+خط Tajawal مستضاف محلياً ومقلّص إلى الحروف المستخدمة فعلاً (WOFF2) - بدون اتصال بالإنترنت
+
+- المصدر: ملفات الخط في fonts/ (مثل fonts/Tajawal-Regular.ttf و fonts/Tajawal-Bold.ttf)
+- الحروف: كل نصوص الصفحات المولدة والثابتة + عناوين وأوصاف الكتالوج (المتجر يعرضها بـ JavaScript)
+  + الأرقام اللاتينية والعربية وعلامات الترقيم دائماً
+- الأوزان: المستخدمة في css/main.css فقط (400 للنص، 700 للعناوين، وكل font-weight مذكور) بأقرب وزن متوفر
+- الناتج: assets/fonts/tajawal-{الوزن}.woff2 + assets/fonts/manifest.json (لا يُعاد التقليص إذا لم يتغير الخط أو الحروف)
+- critical_css.py يضمّن قواعد @font-face (font-display: swap) و preload للأوزان الأساسية بدلاً من Google Fonts
+- بدون ملفات في fonts/ تفشل المرحلة (exit code 1) بدلاً من الرجوع بصمت إلى Google Fonts
+- --fetch يحمّل الأوزان المطلوبة وترخيصها (SIL OFL 1.1) من مستودع google/fonts إلى fonts/ مرة واحدة لتُضاف للمستودع
+
+الاستخدام:
+    python optimize_fonts.py
+    python optimize_fonts.py --fetch   # تحميل ملفات الخط الناقصة إلى fonts/ ثم التقليص
+"""
+
+import re
+import sys
+import json
+import hashlib
+from pathlib import Path
+
+from output_writer import write_output
+from fingerprint_assets import asset_url
+
+# Force UTF-8 for output to avoid encoding errors on Windows
+if sys.stdout.encoding and sys.stdout.encoding.lower() != 'utf-8':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+FONT_FAMILY = 'Tajawal'
+SOURCE_DIR = Path('fonts')
+OUTPUT_DIR = Path('assets/fonts')
+MANIFEST_FILE = OUTPUT_DIR / 'manifest.json'
+SOURCE_CSS = Path('css/main.css')
+PRODUCTS_FILE = Path('products.json')
+PAGE_GLOBS = ['*.html', 'products/*.html']
+# ملفات Tajawal الأصلية (SIL Open Font License 1.1) لـ --fetch
+FONT_SOURCE_URL = 'https://raw.githubusercontent.com/google/fonts/main/ofl/tajawal/'
+LICENSE_FILE = 'OFL.txt'
+FETCH_TIMEOUT = 30
+
+# اسم الوزن في ملف الخط => قيمة font-weight
+WEIGHT_NAMES = {
+    'ExtraLight': 200, 'Light': 300, 'Regular': 400, 'Medium': 500,
+    'Bold': 700, 'ExtraBold': 800, 'Black': 900,
+}
+# النص (400) والعناوين و <strong> (700) دائماً
+DEFAULT_WEIGHTS = {400, 700}
+# الأوزان التي تُحمّل مبكراً (preload) - الباقي يُحمّل عند الحاجة
+PRELOAD_WEIGHTS = (400, 700)
+# الأرقام وعلامات الترقيم اللاتينية والعربية تُضمّن دائماً
+ALWAYS_INCLUDED = ''.join(chr(c) for c in range(0x20, 0x7F)) + '٠١٢٣٤٥٦٧٨٩،؛؟ـ٪«» ‌‍‏'
+
+FONT_WEIGHT = re.compile(r'font-weight\s*:\s*(\d{3}|bold|normal)', re.IGNORECASE)
+TAGS = re.compile(r'<[^>]+>')
+
+_manifest = None
+
+
+def load_manifest():
+    """assets/fonts/manifest.json أو {} إذا لم تُبنَ الخطوط"""
+    global _manifest
+    if _manifest is None:
+        try:
+            with open(MANIFEST_FILE, 'r', encoding='utf-8') as f:
+                _manifest = json.load(f)
+        except Exception:
+            _manifest = {}
+    return _manifest
+
+
+def font_face_css(prefix=''):
+    """قواعد @font-face للخطوط المحلية (نص فارغ إذا لم تُبنَ)"""
+    faces = load_manifest().get('faces', [])
+    return ''.join(
+        f"@font-face{{font-family:'{FONT_FAMILY}';font-style:normal;font-weight:{face['weight']};"
+        f"font-display:swap;src:url({prefix}{asset_url(face['file'])}) format('woff2')}}"
+        for face in faces
+    )
+
+
+def font_preload_tags(prefix=''):
+    faces = load_manifest().get('faces', [])
+    return [
+        f'<link rel="preload" href="{prefix}{asset_url(face["file"])}" as="font" type="font/woff2" crossorigin>'
+        for face in faces if face['weight'] in PRELOAD_WEIGHTS
+    ]
+
+
+def _sha1(data):
+    return hashlib.sha1(data).hexdigest()
+
+
+def source_fonts():
+    """{الوزن: ملف الخط} من fonts/"""
+    fonts = {}
+    for path in sorted(SOURCE_DIR.glob(f'{FONT_FAMILY}-*')):
+        if path.suffix.lower() not in ('.ttf', '.otf', '.woff', '.woff2'):
+            continue
+        weight = WEIGHT_NAMES.get(path.stem.split('-', 1)[1])
+        if weight:
+            fonts[weight] = path
+    return fonts
+
+
+def fetch_fonts():
+    """تحميل ملفات الأوزان المذكورة في css/main.css والترخيص الناقصة في fonts/ - قائمة الملفات المحملة"""
+    import urllib.request
+
+    names = {weight: name for name, weight in WEIGHT_NAMES.items()}
+    files = [f'{FONT_FAMILY}-{names[w]}.ttf' for w in sorted(referenced_weights()) if w in names] + [LICENSE_FILE]
+    fetched = []
+    for name in files:
+        path = SOURCE_DIR / name
+        if path.exists():
+            continue
+        with urllib.request.urlopen(FONT_SOURCE_URL + name, timeout=FETCH_TIMEOUT) as response:
+            write_output(path, response.read(), durable=True)
+        fetched.append(path.as_posix())
+    return fetched
+
+
+def referenced_weights():
+    """الأوزان المذكورة في css/main.css + DEFAULT_WEIGHTS"""
+    weights = set(DEFAULT_WEIGHTS)
+    for value in FONT_WEIGHT.findall(SOURCE_CSS.read_text(encoding='utf-8')):
+        value = value.lower()
+        weights.add(700 if value == 'bold' else 400 if value == 'normal' else int(value))
+    return weights
+
+
+def closest_weight(weight, available):
+    """الوزن الذي سيختاره المتصفح من المتوفر (قواعد font matching في CSS)"""
+    if weight in available:
+        return weight
+    lighter = sorted((w for w in available if w < weight), reverse=True)
+    heavier = sorted(w for w in available if w > weight)
+    if weight == 400:
+        order = [w for w in heavier if w <= 500] + lighter + [w for w in heavier if w > 500]
+    elif weight == 500:
+        order = [w for w in available if w == 400] + [w for w in lighter if w < 400] + heavier
+    elif weight > 500:
+        order = heavier + lighter
+    else:
+        order = lighter + heavier
+    return order[0]
+
+
+def used_characters():
+    """كل الحروف في الصفحات والكتالوج + ALWAYS_INCLUDED"""
+    import html
+    characters = set(ALWAYS_INCLUDED)
+    for pattern in PAGE_GLOBS:
+        for path in Path('.').glob(pattern):
+            characters.update(html.unescape(TAGS.sub(' ', path.read_text(encoding='utf-8'))))
+    try:
+        with open(PRODUCTS_FILE, 'r', encoding='utf-8') as f:
+            for product in json.load(f):
+                characters.update(str(product.get('title', '')))
+                characters.update(str(product.get('description', '')))
+    except Exception:
+        pass
+    return ''.join(sorted(c for c in characters if c.isprintable() or c in ALWAYS_INCLUDED))
+
+
+def subset_font(source, characters, output):
+    """نسخة WOFF2 من الخط تحتوي الحروف المطلوبة فقط (مع خصائص التشكيل العربي)"""
+    from fontTools import subset
+    from fontTools.ttLib import TTFont
+
+    options = subset.Options()
+    options.flavor = 'woff2'
+    options.layout_features = ['*']
+    options.name_IDs = ['*']
+    options.notdef_outline = True
+    font = TTFont(source)
+    subsetter = subset.Subsetter(options=options)
+    subsetter.populate(unicodes=[ord(c) for c in characters])
+    subsetter.subset(font)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    font.flavor = 'woff2'
+    font.save(output)
+
+
+def build_fonts():
+    """تقليص الأوزان المطلوبة: (manifest، عدد الملفات المعاد بناؤها)"""
+    global _manifest
+    available = source_fonts()
+    if not available:
+        return {}, 0
+
+    weights = sorted({closest_weight(w, available) for w in referenced_weights()})
+    characters = used_characters()
+    charset_hash = _sha1(characters.encode('utf-8'))
+    previous = {face['weight']: face for face in load_manifest().get('faces', [])}
+
+    faces = []
+    rebuilt = 0
+    for weight in weights:
+        source = available[weight]
+        source_hash = _sha1(source.read_bytes())
+        output = OUTPUT_DIR / f'{FONT_FAMILY.lower()}-{weight}.woff2'
+        face = previous.get(weight)
+        if (not face or face.get('source_hash') != source_hash
+                or face.get('charset_hash') != charset_hash or not output.exists()):
+            subset_font(source, characters, output)
+            rebuilt += 1
+        faces.append({
+            'weight': weight,
+            'file': output.as_posix(),
+            'source': source.as_posix(),
+            'source_hash': source_hash,
+            'charset_hash': charset_hash,
+            'source_bytes': source.stat().st_size,
+            'bytes': output.stat().st_size,
+        })
+
+    # حذف أوزان لم تعد مستخدمة
+    current = {face['file'] for face in faces}
+    for path in OUTPUT_DIR.glob(f'{FONT_FAMILY.lower()}-[0-9][0-9][0-9].woff2'):
+        if path.as_posix() not in current:
+            path.unlink()
+
+    _manifest = {'family': FONT_FAMILY, 'characters': len(characters), 'faces': faces}
+    write_output(MANIFEST_FILE, json.dumps(_manifest, ensure_ascii=False, indent=2))
+    return _manifest, rebuilt
+
+
+def main():
+    import time
+    import argparse
+    parser = argparse.ArgumentParser(description='تقليص خط Tajawal المحلي إلى الحروف المستخدمة')
+    parser.add_argument('--fetch', action='store_true', help=f'تحميل ملفات الخط الناقصة إلى {SOURCE_DIR}/ أولاً')
+    args = parser.parse_args()
+
+    start_time = time.time()
+    if args.fetch:
+        try:
+            fetched = fetch_fonts()
+        except OSError as e:
+            print(f"❌ فشل تحميل الخط من {FONT_SOURCE_URL}: {e}")
+            sys.exit(1)
+        if fetched:
+            print(f"⬇️ تم التحميل: {', '.join(fetched)} (أضفها للمستودع)")
+    manifest, rebuilt = build_fonts()
+    if not manifest:
+        print(f"❌ لا توجد ملفات {FONT_FAMILY}-*.ttf في {SOURCE_DIR}/ - أضف ملفات الخط وترخيصها (OFL) للمستودع "
+              f"(مرة واحدة: python optimize_fonts.py --fetch)")
+        sys.exit(1)
+
+    for face in manifest['faces']:
+        print(f"🔤 {face['source']} ({face['weight']}): {face['source_bytes'] / 1024:.0f} KB => "
+              f"{face['file']}: {face['bytes'] / 1024:.1f} KB")
+    print(f"✅ {manifest['characters']} حرف، {len(manifest['faces'])} وزن ({rebuilt} أعيد بناؤها) "
+          f"في {time.time() - start_time:.2f} ثانية")
+
+
+if __name__ == '__main__':
+    main()
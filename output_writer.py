@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+كتابة آمنة لكل الملفات المولدة (الصفحات، الفيد، sitemap، ملفات الكاش)
+
+- الكتابة في ملف مؤقت بنفس المجلد ثم os.replace => القارئ يرى الملف القديم أو الجديد كاملاً فقط
+- إذا كان المحتوى مطابقاً للملف الموجود لا تتم الكتابة إطلاقاً (لا I/O ولا تغيير في وقت التعديل)
+- fsync حسب السياسة في config.json (output_config.fsync) أو متغير البيئة BUILD_FSYNC:
+    never     : بدون fsync (الأسرع)
+    artifacts : fsync للملفات المهمة فقط (الفيد، sitemap) - الافتراضي
+    always    : fsync لكل ملف
+"""
+
+import os
+import json
+import tempfile
+
+FSYNC_ENV = 'BUILD_FSYNC'
+FSYNC_POLICIES = ('never', 'artifacts', 'always')
+DEFAULT_FSYNC = 'artifacts'
+
+_fsync_policy = None
+
+# os.umask هي الطريقة الوحيدة لقراءة الـ umask (mkstemp ينشئ الملفات بصلاحيات 0600)
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def fsync_policy():
+    """سياسة fsync الحالية (متغير البيئة له الأولوية على config.json)"""
+    global _fsync_policy
+    if _fsync_policy is None:
+        policy = os.environ.get(FSYNC_ENV)
+        if not policy:
+            try:
+                with open('config.json', 'r', encoding='utf-8') as f:
+                    policy = json.load(f).get('output_config', {}).get('fsync')
+            except Exception:
+                policy = None
+        _fsync_policy = policy if policy in FSYNC_POLICIES else DEFAULT_FSYNC
+    return _fsync_policy
+
+
+def _unchanged(path, data):
+    """مقارنة سريعة: الحجم أولاً ثم المحتوى"""
+    try:
+        if os.path.getsize(path) != len(data):
+            return False
+        with open(path, 'rb') as f:
+            return f.read() == data
+    except OSError:
+        return False
+
+
+def write_output(path, content, encoding='utf-8', durable=False):
+    """كتابة ملف ناتج بشكل ذري. يُرجع True إذا تغير الملف، و False إذا كان مطابقاً فلم يُكتب
+
+    durable=True للملفات المهمة (تُطبق عليها fsync مع سياسة artifacts).
+    """
+    path = os.fspath(path)
+    data = content.encode(encoding) if isinstance(content, str) else content
+    if _unchanged(path, data):
+        return False
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    policy = fsync_policy()
+    sync = policy == 'always' or (policy == 'artifacts' and durable)
+
+    try:
+        mode = os.stat(path).st_mode & 0o777
+    except OSError:
+        mode = 0o666 & ~_UMASK
+
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            os.chmod(tmp_path, mode)
+            f.write(data)
+            if sync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+    if sync and hasattr(os, 'O_DIRECTORY'):
+        # تثبيت عملية الـ rename نفسها في المجلد
+        dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+    return True
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+حسابات الأسعار والخصومات للكتالوج كاملاً بـ NumPy (مصدر واحد لكل المولدات)
+
+- مبلغ الخصم ونسبته لكل المنتجات دفعة واحدة - النسبة تُقرب للأسفل دائماً (لا نعلن خصماً أكبر من الحقيقي)
+- شرائح الأسعار (PRICE_BANDS) وإحصائيات كل فئة (العدد، أقل/أعلى/متوسط سعر، متوسط وأعلى خصم)
+- product_discount() لمنتج واحد بنفس المعادلة، و product_prices() / format_price() لأسعار العرض (صفحات المنتجات، السيو، التغريدات)
+- pricing.json للمتجر (index.html): الخصم والشريحة لكل منتج + الترتيب حسب الخصم ("أفضل العروض")
+- التقرير: reports/pricing.json
+
+الاستخدام:
+    python pricing.py
+"""
+
+import sys
+import json
+from pathlib import Path
+
+import numpy as np
+
+from catalog_store import open_catalog
+from output_writer import write_output
+
+# Force UTF-8 for output to avoid encoding errors on Windows
+if sys.stdout.encoding and sys.stdout.encoding.lower() != 'utf-8':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+STOREFRONT_FILE = Path('pricing.json')
+REPORT_FILE = Path('reports/pricing.json')
+BEST_DEALS_COUNT = 50
+
+# حدود شرائح السعر بعد الخصم (ر.س): الشريحة i = [PRICE_BANDS[i], PRICE_BANDS[i + 1])
+PRICE_BANDS = [0, 100, 200, 300, 500, 1000]
+PRICE_BAND_LABELS = ['أقل من 100', '100 - 199', '200 - 299', '300 - 499', '500 - 999', '1000 فأكثر']
+
+
+def discounts(price, sale_price):
+    """مبلغ الخصم (بخانتين) ونسبته المئوية (عدد صحيح للأسفل) - تعمل على أرقام أو مصفوفات"""
+    price = np.asarray(price, dtype=np.float64)
+    sale_price = np.asarray(sale_price, dtype=np.float64)
+    amount = np.round(np.maximum(price - sale_price, 0), 2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # + 1e-9 حتى لا تصبح 30% مثلاً 29% بسبب أخطاء الفاصلة العائمة
+        percent = np.where(price > 0, np.floor(amount / price * 100 + 1e-9), 0).astype(np.int64)
+    return amount, percent
+
+
+def price_bands(sale_price):
+    """رقم شريحة السعر لكل منتج (فهرس في PRICE_BAND_LABELS)"""
+    return np.digitize(np.asarray(sale_price, dtype=np.float64), PRICE_BANDS[1:])
+
+
+def product_prices(product):
+    """(السعر الأصلي، سعر البيع) لمنتج واحد - بدون sale_price يكون سعر البيع = السعر الأصلي"""
+    price = float(product.get('price', 0))
+    return price, float(product.get('sale_price', price))
+
+
+def format_price(value):
+    """السعر للعرض كما في products.json والمتجر: 185 وليس 185.0، و 99.5 بدون أصفار زائدة"""
+    return f"{float(value):.2f}".rstrip('0').rstrip('.')
+
+
+def product_discount(product):
+    """(مبلغ الخصم، النسبة) لمنتج واحد بنفس معادلة الكتالوج"""
+    amount, percent = discounts(*product_prices(product))
+    return float(amount), int(percent)
+
+
+class CatalogPricing:
+    """أعمدة الأسعار والخصومات للكتالوج كاملاً"""
+
+    def __init__(self, ids, price, sale_price, categories):
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.price = np.asarray(price, dtype=np.float64)
+        self.sale_price = np.asarray(sale_price, dtype=np.float64)
+        self.categories = np.asarray(categories, dtype=str)
+        self.discount, self.discount_percent = discounts(self.price, self.sale_price)
+        self.band = price_bands(self.sale_price)
+
+    @classmethod
+    def from_store(cls, store):
+        ids, price, sale_price, categories = store.price_columns()
+        return cls(ids, price, sale_price, categories)
+
+    def by_discount(self):
+        """فهارس المنتجات مرتبة حسب نسبة الخصم ثم مبلغه (الأعلى أولاً) - ترتيب ثابت"""
+        return np.lexsort((np.arange(len(self.ids)), -self.discount, -self.discount_percent))
+
+    def best_deals(self, count=BEST_DEALS_COUNT):
+        """IDs أفضل العروض"""
+        return self.ids[self.by_discount()[:count]].tolist()
+
+    def band_stats(self):
+        counts = np.bincount(self.band, minlength=len(PRICE_BAND_LABELS))
+        return [{'band': label, 'count': int(count)} for label, count in zip(PRICE_BAND_LABELS, counts)]
+
+    def category_stats(self):
+        """إحصائيات كل فئة بعمليات مجمعة (bincount / ufunc.at) بدون حلقة على المنتجات"""
+        names, group = np.unique(self.categories, return_inverse=True)
+        counts = np.bincount(group, minlength=len(names))
+        sums = np.bincount(group, weights=self.sale_price, minlength=len(names))
+        percent_sums = np.bincount(group, weights=self.discount_percent, minlength=len(names))
+        minimum = np.full(len(names), np.inf)
+        maximum = np.full(len(names), -np.inf)
+        max_percent = np.zeros(len(names), dtype=np.int64)
+        np.minimum.at(minimum, group, self.sale_price)
+        np.maximum.at(maximum, group, self.sale_price)
+        np.maximum.at(max_percent, group, self.discount_percent)
+
+        stats = []
+        for i in np.argsort(-counts, kind='stable'):
+            stats.append({
+                'category': str(names[i]),
+                'count': int(counts[i]),
+                'min_price': float(minimum[i]),
+                'max_price': float(maximum[i]),
+                'avg_price': round(float(sums[i] / counts[i]), 2),
+                'avg_discount_percent': round(float(percent_sums[i] / counts[i]), 1),
+                'max_discount_percent': int(max_percent[i]),
+            })
+        return stats
+
+    def storefront_data(self):
+        """بيانات مضغوطة للمتجر (أعمدة متوازية بدلاً من كائن لكل منتج)"""
+        return {
+            'bands': PRICE_BAND_LABELS,
+            'ids': self.ids.tolist(),
+            'discount': [int(v) if v.is_integer() else v for v in self.discount.tolist()],
+            'percent': self.discount_percent.tolist(),
+            'band': self.band.tolist(),
+            'by_discount': self.ids[self.by_discount()].tolist(),
+        }
+
+    def report(self):
+        discounted = self.discount_percent > 0
+        return {
+            'products': int(len(self.ids)),
+            'discounted_products': int(discounted.sum()),
+            'avg_discount_percent': round(float(self.discount_percent[discounted].mean()), 1) if discounted.any() else 0,
+            'total_discount': round(float(self.discount.sum()), 2),
+            'price_bands': self.band_stats(),
+            'categories': self.category_stats(),
+            'best_deals': self.best_deals(),
+        }
+
+
+def main():
+    import time
+    start_time = time.time()
+    with open_catalog() as store:
+        pricing = CatalogPricing.from_store(store)
+
+    report = pricing.report()
+    write_output(STOREFRONT_FILE, json.dumps(pricing.storefront_data(), ensure_ascii=False, separators=(',', ':')))
+    write_output(REPORT_FILE, json.dumps(report, ensure_ascii=False, indent=2))
+
+    print(f"💰 {report['products']} منتج، {report['discounted_products']} بخصم (متوسط {report['avg_discount_percent']}%) "
+          f"في {(time.time() - start_time) * 1000:.0f} ms")
+    for stats in report['categories']:
+        print(f"   {stats['category']}: {stats['count']} منتج، متوسط {stats['avg_price']} ر.س، "
+              f"خصم حتى {stats['max_discount_percent']}%")
+    print(f"📄 {STOREFRONT_FILE} + {REPORT_FILE}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+طابور منشورات جاهزة مسبقاً للبوت
+
+يعمل خارج مهمة النشر (يدوياً أو بجدول يومي): يحجز المنتجات التالية من دورة النشر،
+ويجهز لكل منها نص التغريدة ورابط الواتساب وصورة JPEG مصغرة في scripts/post_queue/.
+مهمة النشر كل 8 ساعات تسحب أقدم عنصر وترفعه فقط - بدون تحميل أو معالجة صور.
+ملفات JSON فقط تُحفظ في git؛ الصور في actions/cache (تُحمّل من جديد إذا لم تعد في الكاش).
+
+الاستخدام:
+    python scripts/post_queue.py            # ملء الطابور حتى QUEUE_SIZE عنصر
+    python scripts/post_queue.py --size 21  # أسبوع كامل (3 منشورات يومياً)
+"""
+
+import os
+import sys
+import json
+import argparse
+from io import BytesIO
+from datetime import datetime
+
+import requests
+from PIL import Image
+
+# مخزن الكتالوج في جذر المشروع
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from catalog_store import open_catalog
+from rotation import Rotation
+
+QUEUE_DIR = 'scripts/post_queue'
+QUEUE_SIZE = 9
+MAX_ATTEMPTS = 3
+MAX_IMAGE_SIDE = 1200
+JPEG_QUALITY = 82
+
+
+def prepare_image(content):
+    """ تحويل الصورة إلى JPEG بخلفية بيضاء وأبعاد مناسبة لتويتر """
+    img = Image.open(BytesIO(content))
+    if img.mode in ('RGBA', 'LA', 'P'):
+        img = img.convert('RGBA')
+        background = Image.new('RGB', img.size, (255, 255, 255))
+        background.paste(img, mask=img.split()[-1])
+        img = background
+    elif img.mode != 'RGB':
+        img = img.convert('RGB')
+
+    img.thumbnail((MAX_IMAGE_SIDE, MAX_IMAGE_SIDE))
+    output = BytesIO()
+    img.save(output, format='JPEG', quality=JPEG_QUALITY, optimize=True, progressive=True)
+    return output.getvalue()
+
+
+def fetch_image(url):
+    """ تحميل صورة المنتج ومعالجتها (None عند الفشل) """
+    try:
+        response = requests.get(url, timeout=15)
+        response.raise_for_status()
+        return prepare_image(response.content)
+    except Exception as e:
+        print(f"⚠️ فشل تجهيز الصورة: {e}")
+        return None
+
+
+def _entry_paths(name):
+    base = os.path.join(QUEUE_DIR, name)
+    return f"{base}.json", f"{base}.jpg"
+
+
+def queued_entries():
+    """ أسماء عناصر الطابور بالترتيب (الأقدم أولاً) """
+    if not os.path.isdir(QUEUE_DIR):
+        return []
+    return sorted(f[:-5] for f in os.listdir(QUEUE_DIR) if f.endswith('.json'))
+
+
+def add_entry(name, post, image_bytes):
+    os.makedirs(QUEUE_DIR, exist_ok=True)
+    json_path, image_path = _entry_paths(name)
+    if image_bytes:
+        with open(image_path, 'wb') as f:
+            f.write(image_bytes)
+        post['image'] = os.path.basename(image_path)
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(post, f, ensure_ascii=False, indent=2)
+
+
+def peek_entry():
+    """ أقدم منشور جاهز في الطابور: (name, post, image_bytes) أو None """
+    for name in queued_entries():
+        json_path, image_path = _entry_paths(name)
+        with open(json_path, 'r', encoding='utf-8') as f:
+            post = json.load(f)
+        if post.get('attempts', 0) >= MAX_ATTEMPTS:
+            print(f"⚠️ تجاوز المنشور {name} عدد المحاولات المسموح - تم حذفه من الطابور")
+            remove_entry(name)
+            continue
+        image_bytes = None
+        if post.get('image') and os.path.exists(image_path):
+            with open(image_path, 'rb') as f:
+                image_bytes = f.read()
+        elif post.get('image') and post.get('image_link'):
+            # الصورة ليست في git - حُذفت من كاش actions
+            image_bytes = fetch_image(post['image_link'])
+        return name, post, image_bytes
+    return None
+
+
+def remove_entry(name):
+    for path in _entry_paths(name):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def mark_failed(name, error):
+    """ تسجيل محاولة فاشلة مع إبقاء المنشور في الطابور لإعادة المحاولة بدون إعادة التحميل """
+    json_path, _ = _entry_paths(name)
+    with open(json_path, 'r', encoding='utf-8') as f:
+        post = json.load(f)
+    post['attempts'] = post.get('attempts', 0) + 1
+    post['last_error'] = str(error)
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(post, f, ensure_ascii=False, indent=2)
+
+
+def fill_queue(size=QUEUE_SIZE):
+    """ حجز المنتجات التالية من دورة النشر وتجهيزها حتى يصل الطابور إلى size """
+    from posting import create_tweet_text, create_whatsapp_link, tweet_length
+
+    missing = size - len(queued_entries())
+    if missing <= 0:
+        print(f"✅ الطابور ممتلئ ({size} منشور)")
+        return 0
+
+    added = 0
+    with open_catalog() as store:
+        rotation = Rotation().load(store)
+        for _ in range(missing):
+            product = rotation.peek(store)
+            if not product:
+                break
+            name = f"{rotation.cycle:04d}-{rotation.cursor:05d}-{product['id']}"
+            text = create_tweet_text(product)
+            image_bytes = fetch_image(product['image_link']) if product.get('image_link') else None
+            add_entry(name, {
+                'id': product['id'],
+                'title': product.get('title', ''),
+                'image_link': product.get('image_link', ''),
+                'text': text,
+                'whatsapp_link': create_whatsapp_link(product),
+                'attempts': 0,
+                'created_at': datetime.now().isoformat(timespec='seconds'),
+            }, image_bytes)
+            rotation.advance()
+            added += 1
+            print(f"📦 {name}: {tweet_length(text)}/280 حرف، صورة {len(image_bytes or b'') // 1024} KB")
+        rotation.save()
+    return added
+
+
+def main():
+    parser = argparse.ArgumentParser(description='تجهيز طابور منشورات تويتر')
+    parser.add_argument('--size', type=int, default=QUEUE_SIZE, help='عدد المنشورات الجاهزة المطلوب')
+    args = parser.parse_args()
+
+    added = fill_queue(args.size)
+    print(f"\n✅ تمت إضافة {added} منشور - الطابور الآن {len(queued_entries())} منشور")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,521 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+محرك النشر الموحد على الشبكات الاجتماعية
+
+- نص المنشور يُبنى في مكان واحد (create_tweet_text)
+- المنتج التالي يأتي من طابور المنشورات الجاهزة ثم من دورة النشر (rotation)
+- الواجهات (backends): تويتر، ملف JSON (للنشر اليدوي والتجربة)، أو خادم HTTP محلي
+- المجدول يحترم حدود الـ API بـ token bucket ويعيد المحاولة بـ exponential backoff
+  (حالة الـ bucket لتويتر محفوظة في scripts/rate_limit_state.json => الحد يسري بين تشغيلات الجدول)
+- اتصال واحد لكل واجهة طوال التشغيل (بدلاً من إنشاء عملاء جدد لكل منشور)
+
+الاستخدام:
+    python scripts/posting.py                                  # نشر منشور واحد على تويتر
+    python scripts/posting.py --count 3                        # عدة منشورات ضمن حدود المعدل
+    python scripts/posting.py --backend file --output out.json # كتابة المنشور في ملف
+    python scripts/posting.py --backend file --no-advance      # معاينة بدون تحريك دورة النشر
+    python scripts/posting.py --backend http --url http://127.0.0.1:8000
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import random
+import argparse
+from abc import ABC, abstractmethod
+from io import BytesIO
+from datetime import datetime
+from urllib.parse import quote
+
+# مخزن الكتالوج في جذر المشروع
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from catalog_store import open_catalog
+from pricing import product_discount, product_prices, format_price
+from rotation import Rotation
+from output_writer import write_output
+from post_queue import fetch_image, peek_entry, remove_entry, mark_failed, queued_entries
+
+# Force UTF-8 for output to avoid encoding errors on Windows
+if sys.stdout.encoding and sys.stdout.encoding.lower() != 'utf-8':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+WHATSAPP_NUMBER = '201110760081'
+READY_POST_FILE = 'scripts/ready_post.json'
+RATE_LIMIT_FILE = 'scripts/rate_limit_state.json'
+
+TWEET_MAX_LENGTH = 280
+TWEET_URL_LENGTH = 23
+URL_PATTERN = re.compile(r'https?://\S+')
+
+MAX_RETRIES = 4
+BACKOFF_BASE = 2.0
+MAX_WAIT = 15 * 60
+# نتيجة submit عند الوصول لحد المعدل: ليس فشلاً (لا يُحسب من محاولات منشور الطابور)
+DEFERRED = 'deferred'
+
+
+# ----------------------------------------------------------------------
+# نص المنشور
+# ----------------------------------------------------------------------
+
+def tweet_length(text):
+    """ طول التغريدة كما يحسبه تويتر: كل رابط 23 حرفاً والإيموجي وزنه 2 """
+    length = 0
+    for part in URL_PATTERN.split(text):
+        for char in part:
+            code = ord(char)
+            if (code <= 0x10FF or 0x2000 <= code <= 0x200D or 0x2010 <= code <= 0x201F
+                    or 0x2032 <= code <= 0x2037):
+                length += 1
+            else:
+                length += 2
+    return length + TWEET_URL_LENGTH * len(URL_PATTERN.findall(text))
+
+
+def create_product_hashtag(title):
+    """ إنشاء هاشتاج من اسم المنتج """
+    # تنظيف العنوان من الرموز والأرقام
+    clean_title = re.sub(r'[^\w\s\u0600-\u06FF]', '', title)
+    # أخذ أول 3-4 كلمات
+    words = clean_title.split()[:4]
+    # دمج بـ underscore
+    hashtag = '_'.join(words)
+    return f"#{hashtag}"
+
+
+def create_whatsapp_link(product):
+    """ رابط الطلب عبر واتساب """
+    whatsapp_msg = f"مرحباً، أريد الاستفسار عن المنتج رقم {product.get('id')} ({product.get('title', '')})"
+    return f"https://wa.me/{WHATSAPP_NUMBER}?text={quote(whatsapp_msg)}"
+
+
+def create_tweet_text(product):
+    """ إنشاء نص التغريدة """
+    title = product.get('title', '')
+    old_price, price = (format_price(value) for value in product_prices(product))
+    whatsapp = create_whatsapp_link(product)
+
+    # نسبة التخفيض (نفس حساب صفحات المنتج والمتجر)
+    _, discount = product_discount(product)
+
+    # هاشتاج المنتج
+    product_hashtag = create_product_hashtag(title)
+
+    # محافظات السعودية
+    governorates = "#الرياض #جدة #مكة #الدمام #المدينة_المنورة #الخبر #الطائف #الأحساء #بريدة #تبوك"
+
+    # نص التغريدة
+    tweet = f"🔥 {title}\n\n"
+
+    if discount > 0:
+        tweet += f"⚡ خصم {discount}%\n"
+        tweet += f"❌ السعر القديم: {old_price} ر.س\n"
+
+    tweet += f"✅ السعر الآن: {price} ر.س\n\n"
+    tweet += f"📱 اطلبه عبر واتساب الآن: {whatsapp}\n\n"
+    tweet += f"{product_hashtag}\n"
+    tweet += f"#السوق_السعودي #عروض_اليوم #تسوق_اونلاين\n"
+    tweet += governorates
+
+    # التأكد من طول التغريدة (280 حرف)
+    if tweet_length(tweet) > TWEET_MAX_LENGTH:
+        # نسخة مختصرة
+        max_title_len = 40
+        short_title = title[:max_title_len] + '...' if len(title) > max_title_len else title
+
+        tweet = f"🔥 {short_title}\n\n"
+        if discount > 0:
+            tweet += f"⚡ خصم {discount}%\n"
+        tweet += f"✅ {price} ر.س\n\n"
+        tweet += f"📱 اطلبه عبر واتساب: {whatsapp}\n\n"
+        tweet += f"{product_hashtag} #السوق_السعودي\n"
+        tweet += "#الرياض #جدة #مكة"
+
+    return tweet
+
+
+# ----------------------------------------------------------------------
+# الواجهات (backends)
+# ----------------------------------------------------------------------
+
+class RetryableError(Exception):
+    """ خطأ مؤقت (تجاوز حد المعدل أو خطأ خادم) يمكن إعادة المحاولة بعده """
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class Backend(ABC):
+    """ واجهة قناة نشر: رفع الصور ثم نشر النص """
+
+    name = 'backend'
+    needs_media = True
+    # حد المعدل: عدد المنشورات المسموح في نافذة زمنية (بالثواني)
+    rate_limit = (1, 1)
+    # حفظ حالة حد المعدل بين التشغيلات (RATE_LIMIT_FILE)
+    persist_rate_limit = False
+
+    def upload_media(self, images):
+        """ رفع الصور (JPEG bytes) دفعة واحدة وإرجاع معرفاتها """
+        return []
+
+    @abstractmethod
+    def publish(self, post, media_ids):
+        """ نشر المنشور وإرجاع رابطه """
+
+    def close(self):
+        pass
+
+
+class TwitterBackend(Backend):
+    """ تويتر: API v2 للتغريدة و v1.1 لرفع الصور، مع عميل واحد لكل تشغيل """
+
+    name = 'twitter'
+    # Free tier: 17 تغريدة لكل 24 ساعة
+    rate_limit = (17, 24 * 3600)
+    persist_rate_limit = True
+
+    def __init__(self):
+        import tweepy
+
+        self.tweepy = tweepy
+        keys = [os.getenv(k) for k in ('TWITTER_API_KEY', 'TWITTER_API_SECRET',
+                                        'TWITTER_ACCESS_TOKEN', 'TWITTER_ACCESS_SECRET')]
+        if not all(keys):
+            print("خطأ: مفاتيح Twitter API غير موجودة!")
+            sys.exit(1)
+        api_key, api_secret, access_token, access_secret = keys
+        self.client = tweepy.Client(
+            consumer_key=api_key,
+            consumer_secret=api_secret,
+            access_token=access_token,
+            access_token_secret=access_secret
+        )
+        # للرفع الصور نحتاج API v1.1
+        self.api = tweepy.API(tweepy.OAuth1UserHandler(api_key, api_secret, access_token, access_secret))
+
+    def _call(self, func, *args, **kwargs):
+        """ تحويل أخطاء tweepy المؤقتة إلى RetryableError """
+        try:
+            return func(*args, **kwargs)
+        except self.tweepy.TooManyRequests as e:
+            reset = e.response.headers.get('x-rate-limit-reset') if e.response is not None else None
+            retry_after = max(int(reset) - time.time(), 0) if reset else None
+            raise RetryableError(f"تجاوز حد المعدل: {e}", retry_after)
+        except self.tweepy.TwitterServerError as e:
+            raise RetryableError(f"خطأ خادم تويتر: {e}")
+        except self.tweepy.Forbidden:
+            print("❌ خطأ 403 Forbidden: الحساب لا يملك صلاحيات الكتابة.")
+            print("App Settings → User authentication settings → App permissions → Read and Write")
+            print("ثم Regenerate Access Token & Secret وحدث GitHub Secrets")
+            raise
+
+    def upload_media(self, images):
+        media_ids = []
+        for i, image in enumerate(images):
+            media = self._call(self.api.media_upload, filename=f"product-{i}.jpg", file=BytesIO(image))
+            media_ids.append(media.media_id)
+        if media_ids:
+            print(f"تم رفع {len(media_ids)} صورة بنجاح!")
+        return media_ids
+
+    def publish(self, post, media_ids):
+        response = self._call(self.client.create_tweet, text=post['text'], media_ids=media_ids or None)
+        return f"https://twitter.com/user/status/{response.data['id']}"
+
+    def close(self):
+        self.client.session.close()
+        self.api.session.close()
+
+
+class FileBackend(Backend):
+    """ كتابة المنشور في ملف JSON (للنشر اليدوي أو التجربة بدون شبكة) """
+
+    name = 'file'
+    needs_media = False
+    rate_limit = (1000, 1)
+
+    def __init__(self, output=READY_POST_FILE):
+        self.output = output
+
+    def publish(self, post, media_ids):
+        data = {key: value for key, value in post.items() if key != 'images'}
+        data['timestamp'] = datetime.now().isoformat()
+        with open(self.output, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        return self.output
+
+
+class HttpBackend(Backend):
+    """ خادم HTTP محلي بنفس تسلسل تويتر (POST /media ثم POST /posts) عبر session واحدة """
+
+    name = 'http'
+    rate_limit = (60, 60)
+
+    def __init__(self, url):
+        import requests
+
+        self.url = url.rstrip('/')
+        self.session = requests.Session()
+
+    def _post(self, path, **kwargs):
+        response = self.session.post(f"{self.url}{path}", timeout=15, **kwargs)
+        if response.status_code == 429 or response.status_code >= 500:
+            retry_after = response.headers.get('Retry-After')
+            raise RetryableError(f"HTTP {response.status_code}", float(retry_after) if retry_after else None)
+        response.raise_for_status()
+        return response.json()
+
+    def upload_media(self, images):
+        return [self._post('/media', data=image, headers={'Content-Type': 'image/jpeg'})['id']
+                for image in images]
+
+    def publish(self, post, media_ids):
+        payload = {key: value for key, value in post.items() if key != 'images'}
+        payload['media_ids'] = media_ids
+        return self._post('/posts', json=payload).get('url', '')
+
+    def close(self):
+        self.session.close()
+
+
+BACKENDS = {'twitter': TwitterBackend, 'file': FileBackend, 'http': HttpBackend}
+
+
+# ----------------------------------------------------------------------
+# المجدول
+# ----------------------------------------------------------------------
+
+class TokenBucket:
+    """ token bucket: capacity منشور كحد أقصى، ويمتلئ بمعدل capacity / period
+
+    state = {'tokens', 'updated'} من تشغيل سابق (updated بتوقيت clock، لذلك الافتراضي time.time)
+    """
+
+    def __init__(self, capacity, period, clock=time.time, sleep=time.sleep, state=None):
+        self.capacity = capacity
+        self.rate = capacity / period
+        self.tokens = float(capacity)
+        self.clock = clock
+        self.sleep = sleep
+        self.updated = clock()
+        if state:
+            self.tokens = min(float(state.get('tokens', capacity)), float(capacity))
+            self.updated = min(float(state.get('updated', self.updated)), self.updated)
+
+    def state(self):
+        return {'tokens': round(self.tokens, 4), 'updated': self.updated}
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, max_wait=MAX_WAIT):
+        """ حجز توكن، مع الانتظار حتى max_wait ثانية (False إذا كان الانتظار أطول) """
+        self._refill()
+        if self.tokens < 1:
+            wait = (1 - self.tokens) / self.rate
+            if wait > max_wait:
+                return False
+            self.sleep(wait)
+            self._refill()
+        self.tokens -= 1
+        return True
+
+
+def load_rate_limit_state(name):
+    """ حالة الـ bucket المحفوظة لواجهة (أو None) """
+    try:
+        with open(RATE_LIMIT_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f).get(name)
+    except (OSError, ValueError):
+        return None
+
+
+def save_rate_limit_state(name, state):
+    try:
+        with open(RATE_LIMIT_FILE, 'r', encoding='utf-8') as f:
+            states = json.load(f)
+    except (OSError, ValueError):
+        states = {}
+    states[name] = state
+    write_output(RATE_LIMIT_FILE, json.dumps(states, indent=2) + '\n', durable=True)
+
+
+class Scheduler:
+    """ تمرير المنشورات للواجهة ضمن حد المعدل مع إعادة المحاولة للأخطاء المؤقتة """
+
+    def __init__(self, backend, max_retries=MAX_RETRIES, max_wait=MAX_WAIT, sleep=time.sleep):
+        self.backend = backend
+        state = load_rate_limit_state(backend.name) if backend.persist_rate_limit else None
+        self.bucket = TokenBucket(*backend.rate_limit, sleep=sleep, state=state)
+        self.max_retries = max_retries
+        self.max_wait = max_wait
+        self.sleep = sleep
+
+    def submit(self, post):
+        """ نشر منشور واحد: يُرجع رابط المنشور، أو DEFERRED عند الوصول لحد المعدل، أو None عند الفشل """
+        acquired = self.bucket.acquire(self.max_wait)
+        if self.backend.persist_rate_limit:
+            save_rate_limit_state(self.backend.name, self.bucket.state())
+        if not acquired:
+            print(f"⏳ تم الوصول لحد النشر على {self.backend.name} - يؤجل للتشغيل القادم")
+            return DEFERRED
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                media_ids = self.backend.upload_media(post.get('images', []))
+                return self.backend.publish(post, media_ids)
+            except RetryableError as e:
+                delay = BACKOFF_BASE ** attempt + random.uniform(0, 1)
+                if e.retry_after is not None:
+                    delay = max(delay, e.retry_after)
+                if attempt == self.max_retries or delay > self.max_wait:
+                    print(f"❌ {e} - تم الاستسلام بعد {attempt + 1} محاولة")
+                    return None
+                print(f"⚠️ {e} - إعادة المحاولة بعد {delay:.0f} ثانية")
+                self.sleep(delay)
+            except Exception as e:
+                print(f"❌ خطأ في النشر على {self.backend.name}: {e}")
+                return None
+
+
+# ----------------------------------------------------------------------
+# المحرك
+# ----------------------------------------------------------------------
+
+def render_post(product, with_media=True):
+    """ تجهيز منشور من منتج (النص + الصورة) """
+    post = {
+        'id': product['id'],
+        'title': product.get('title', ''),
+        'text': create_tweet_text(product),
+        'whatsapp_link': create_whatsapp_link(product),
+        'image_url': product.get('image_link', ''),
+        'images': [],
+    }
+    if with_media and product.get('image_link'):
+        print(f"تحميل الصورة من: {product['image_link']}")
+        image = fetch_image(product['image_link'])
+        if image:
+            post['images'].append(image)
+    return post
+
+
+class PostingEngine:
+    """ مصدر المنشورات (الطابور ثم دورة النشر) + مجدول واحد للواجهة """
+
+    def __init__(self, backend, use_queue=True, advance=True):
+        self.backend = backend
+        self.scheduler = Scheduler(backend)
+        self.use_queue = use_queue
+        # advance=False: معاينة - المنتج لا يُحسب منشوراً في دورة النشر المشتركة
+        self.advance = advance
+        self.store = None
+        self.rotation = None
+        # توقف التشغيل بسبب حد المعدل (ليس فشلاً)
+        self.deferred = False
+
+    def _next_from_queue(self):
+        entry = peek_entry() if self.use_queue else None
+        if not entry:
+            return None
+        name, post, image = entry
+        print(f"📦 منشور جاهز من الطابور: {name} (متبقي {len(queued_entries()) - 1})")
+        post['images'] = [image] if image and self.backend.needs_media else []
+        return name, post
+
+    def _next_from_rotation(self):
+        if self.store is None:
+            self.store = open_catalog()
+            self.rotation = Rotation().load(self.store)
+            print(f"✅ تم تحميل {self.store.count()} منتج")
+            print(f"   - الدورة: {self.rotation.cycle + 1} | تم نشرها: {self.rotation.cursor} | المتبقية: {self.rotation.remaining}")
+        product = self.rotation.peek(self.store)
+        return render_post(product, self.backend.needs_media) if product else None
+
+    def publish_next(self):
+        """ نشر المنشور التالي: True عند النجاح، False عند الفشل، DEFERRED عند التأجيل، None إذا لم يوجد منشور """
+        queued = self._next_from_queue()
+        post = queued[1] if queued else self._next_from_rotation()
+        if not post:
+            print("❌ لا توجد منتجات للنشر")
+            return None
+
+        print(f"\n🎯 منتج مختار: {post.get('title')}")
+        print(f"   ID: {post.get('id')}")
+        print(f"\nنص التغريدة:\n{post['text']}\n")
+        print(f"طول التغريدة: {tweet_length(post['text'])}/{TWEET_MAX_LENGTH} حرف\n")
+
+        url = self.scheduler.submit(post)
+        if url == DEFERRED:
+            # حد المعدل: المنشور يبقى كما هو (بدون زيادة attempts) والمؤشر لا يتحرك
+            return DEFERRED
+        if queued:
+            # المنشور الفاشل يبقى في الطابور مع صورته لإعادة المحاولة في التشغيل القادم
+            if url:
+                remove_entry(queued[0])
+            else:
+                mark_failed(queued[0], 'فشل النشر')
+        elif url and self.advance:
+            # تحريك المؤشر بعد نجاح النشر فقط
+            self.rotation.advance()
+            self.rotation.save()
+
+        if url:
+            print(f"✅ تم النشر بنجاح على {self.backend.name}")
+            print(f"🔗 الرابط: {url}")
+        return bool(url)
+
+    def run(self, count=1):
+        """ نشر حتى count منشور، والتوقف عند أول فشل أو تأجيل """
+        published = 0
+        try:
+            for _ in range(count):
+                result = self.publish_next()
+                if result == DEFERRED:
+                    self.deferred = True
+                if result is not True:
+                    break
+                published += 1
+        finally:
+            self.backend.close()
+            if self.store is not None:
+                self.store.close()
+        return published
+
+
+def create_backend(name, output=READY_POST_FILE, url=None):
+    if name == 'file':
+        return FileBackend(output)
+    if name == 'http':
+        return HttpBackend(url or 'http://127.0.0.1:8000')
+    return TwitterBackend()
+
+
+def main(argv=None, default_backend='twitter'):
+    parser = argparse.ArgumentParser(description='محرك النشر على الشبكات الاجتماعية')
+    parser.add_argument('--backend', choices=sorted(BACKENDS), default=default_backend)
+    parser.add_argument('--count', type=int, default=1, help='عدد المنشورات في هذا التشغيل')
+    parser.add_argument('--output', default=READY_POST_FILE, help='ملف الناتج لواجهة file')
+    parser.add_argument('--url', help='عنوان الخادم لواجهة http')
+    parser.add_argument('--no-queue', action='store_true', help='تجاهل طابور المنشورات الجاهزة')
+    parser.add_argument('--no-advance', action='store_true', help='معاينة: عدم تحريك دورة النشر بعد النشر')
+    args = parser.parse_args(argv)
+
+    engine = PostingEngine(create_backend(args.backend, args.output, args.url),
+                           use_queue=not args.no_queue, advance=not args.no_advance)
+    published = engine.run(args.count)
+    print(f"\n📊 تم نشر {published} من {args.count} منشور")
+    if engine.deferred:
+        print("⏳ الباقي مؤجل بسبب حد النشر")
+    return 0 if published == args.count or engine.deferred else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
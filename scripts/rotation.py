@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+حالة دورة النشر: ترتيب عشوائي ثابت لكل دورة + مؤشر
+
+- rotation_order.txt : ترتيب IDs للدورة الحالية (سطر لكل ID)، يُكتب مرة واحدة لكل دورة
+  والمنتجات الجديدة تُضاف في آخره فقط (append-only)
+- rotation_state.txt : "رقم_الدورة المؤشر" - الملف الوحيد الذي يتغير بعد كل نشر
+
+اختيار المنتج التالي O(1)، وعند اكتمال الدورة يُعاد الخلط بشكل حتمي (seed = رقم الدورة)
+"""
+
+import os
+import json
+import random
+
+from output_writer import write_output
+
+ORDER_FILE = 'scripts/rotation_order.txt'
+STATE_FILE = 'scripts/rotation_state.txt'
+LEGACY_POSTED_FILE = 'scripts/posted_products.json'
+SHUFFLE_SEED = 'alsooq-alsaudi'
+
+
+def shuffled_ids(ids, cycle):
+    """ترتيب عشوائي حتمي لـ IDs الكتالوج خاص بكل دورة"""
+    order = sorted(ids)
+    random.Random(f"{SHUFFLE_SEED}:{cycle}").shuffle(order)
+    return order
+
+
+class Rotation:
+    """ مؤشر على ترتيب الدورة الحالية """
+
+    def __init__(self, order_file=ORDER_FILE, state_file=STATE_FILE):
+        self.order_file = order_file
+        self.state_file = state_file
+        self.order = []
+        self.cycle = 0
+        self.cursor = 0
+
+    def load(self, store):
+        """ تحميل الحالة، أو إنشاؤها من الكتالوج (مع ترحيل posted_products.json القديم إن وجد) """
+        if os.path.exists(self.order_file):
+            with open(self.order_file, 'r', encoding='utf-8') as f:
+                self.order = [int(line) for line in f if line.strip()]
+            if os.path.exists(self.state_file):
+                with open(self.state_file, 'r', encoding='utf-8') as f:
+                    cycle, cursor = f.read().split()
+                self.cycle, self.cursor = int(cycle), int(cursor)
+            self._append_new_products(store)
+        else:
+            self._start_from_legacy(store)
+        return self
+
+    def _start_from_legacy(self, store):
+        """ الدورة الأولى: المنتجات المنشورة سابقاً أولاً ثم الباقي بترتيب عشوائي """
+        posted = []
+        if os.path.exists(LEGACY_POSTED_FILE):
+            with open(LEGACY_POSTED_FILE, 'r', encoding='utf-8') as f:
+                posted = list(dict.fromkeys(json.load(f).get('posted_ids', [])))
+        catalog_ids = store.ids()
+        posted_set = set(posted)
+        self.cycle = 0
+        self.order = posted + shuffled_ids([pid for pid in catalog_ids if pid not in posted_set], self.cycle)
+        self.cursor = len(posted)
+        self._write_order()
+        self.save()
+        if os.path.exists(LEGACY_POSTED_FILE):
+            os.remove(LEGACY_POSTED_FILE)
+
+    def _append_new_products(self, store):
+        """ إضافة المنتجات الجديدة في آخر ترتيب الدورة (مقارنة IDs - منتج مضاف وآخر محذوف لا يغيران العدد) """
+        known = set(self.order)
+        new_ids = [pid for pid in store.ids() if pid not in known]
+        if new_ids:
+            self.order.extend(new_ids)
+            with open(self.order_file, 'a', encoding='utf-8') as f:
+                f.write(''.join(f"{pid}\n" for pid in new_ids))
+
+    def _write_order(self):
+        write_output(self.order_file, ''.join(f"{pid}\n" for pid in self.order), durable=True)
+
+    def _reshuffle(self, store):
+        print("\n🔄 تم نشر كل المنتجات! بدء دورة جديدة بترتيب جديد...")
+        self.cycle += 1
+        self.cursor = 0
+        self.order = shuffled_ids(store.ids(), self.cycle)
+        self._write_order()
+
+    def peek(self, store):
+        """ المنتج التالي بدون تحريك المؤشر (المنتجات المحذوفة من الكتالوج يتم تخطيها) """
+        while True:
+            if self.cursor >= len(self.order):
+                self._reshuffle(store)
+                if not self.order:
+                    return None
+            product = store.get(self.order[self.cursor])
+            if product:
+                return product
+            self.cursor += 1
+
+    def advance(self):
+        """ تحريك المؤشر بعد نجاح النشر """
+        self.cursor += 1
+
+    def save(self):
+        write_output(self.state_file, f"{self.cycle} {self.cursor}\n", durable=True)
+
+    @property
+    def remaining(self):
+        return max(len(self.order) - self.cursor, 0)
@@ -3,6 +3,12 @@
 """
 سكريبت تحسين السيو وإضافة السكيما لجميع صفحات المنتجات تلقائياً
 يعمل على Windows - يعدل كل صفحات المنتجات دفعة واحدة - نسخة محسنة بالأداء
+
+generate_all_pages.py يحقن السيو قبل كتابة الصفحة (inject_seo_into_html)، لذلك هذه المرحلة
+لا تعدل إلا الصفحات التي لا تحتوي SEO_MARKER (صفحات قديمة أو مكتوبة يدوياً).
+
+    python seo_optimizer.py          # الصفحات الناقصة فقط
+    python seo_optimizer.py --force  # إعادة الحقن في كل الصفحات
 """
 
 import json
@@ -14,7 +20,14 @@ from datetime import datetime, timedelta, timezone
 from concurrent.futures import ProcessPoolExecutor, as_completed
 from urllib.parse import quote
 import multiprocessing
-import html
+
+from build_profile import profiled
+from catalog_store import open_catalog
+from output_writer import write_output
+import description_cache
+# نفس slug صفحات المنتجات تماماً (الصفحة التي يكتبها generate_all_pages.py هي التي تُحقن)
+from generate_all_pages import create_slug, load_excluded_duplicates
+from pricing import product_prices, format_price
 
 # Force UTF-8 for output to avoid encoding errors on Windows
 if sys.stdout.encoding.lower() != 'utf-8':
@@ -23,72 +36,29 @@ if sys.stdout.encoding.lower() != 'utf-8':
 # Configuration
 BASE_URL = "https://sherow1982.github.io/alsooq-alsaudi"
 PHONE_NUMBER = "+201110760081"
+# موجود في كل صفحة حُقن فيها السيو
+SEO_MARKER = '<!-- SEO Meta Tags -->'
+# مفاتيح وسوم meta في كتلة السيو (تحل محل وسوم القالب بنفس المفتاح)
+META_KEY = re.compile(r'<meta (name|property)="([^"]+)"')
 
-# Cache for descriptions
-_DESCRIPTIONS = None
-
-def load_descriptions():
-    """تحميل الوصف من ملف descriptions.json"""
-    global _DESCRIPTIONS
-    if _DESCRIPTIONS is not None:
-        return _DESCRIPTIONS
-    
-    descriptions_file = Path('descriptions.json')
-    if not descriptions_file.exists():
-        print("⚠️ descriptions.json not found")
-        _DESCRIPTIONS = {}
-        return _DESCRIPTIONS
-        
-    try:
-        with open(descriptions_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            _DESCRIPTIONS = {str(k): v for k, v in data.items()}
-            return _DESCRIPTIONS
-    except (json.JSONDecodeError, UnicodeDecodeError) as e:
-        print(f"⚠️ Error reading descriptions.json: {e}")
-        _DESCRIPTIONS = {}
-        return _DESCRIPTIONS
-    except Exception as e:
-        print(f"⚠️ Unexpected error loading descriptions.json: {e}")
-        _DESCRIPTIONS = {}
-        return _DESCRIPTIONS
 
 def clean_description(title, description):
-    """تنظيف الوصف وحذف العنوان المكرر من بدايته"""
-    if not description:
-        return f"{html.escape(str(title))} - منتج عالي الجودة متوفر الآن في السوق السعودي بتوصيل سريع."
-    
-    clean_title = html.escape(str(title).strip())
-    description = html.escape(str(description))
-    
-    if description.startswith(clean_title):
-        description = description[len(clean_title):].lstrip(' :-,.،')
-    
-    if len(description) < 10:
-        return f"اكتشف {html.escape(str(title))} - منتج عالي الجودة متوفر الآن في السوق السعودي بخصم حصري وتوصيل سريع."
-        
-    return description
-
-def create_slug(product):
-    """توليد slug فريد للمنتج - يجب أن يطابق تماماً ما في generate_all_pages.py"""
-    stop_words = ['من', 'في', 'على', 'الى', 'عن', 'و', 'مع', 'يا', 'أيها']
-    
-    title = product['title']
-    for word in stop_words:
-        title = title.replace(f' {word} ', ' ')
-
-    slug = re.sub(r'[^\w\s-]', '', title).strip().lower()
-    slug = re.sub(r'\s+', '-', slug)
-    # Truncate to 100 characters to avoid Windows MAX_PATH issues
-    if len(slug) > 100:
-        slug = slug[:100].rstrip('-')
-    return f"{product['id']}-{slug}"
+    """تنظيف الوصف وحذف العنوان المكرر من بدايته (من كاش الأوصاف)"""
+    return description_cache.cleaned(title, description, 'seo')
 
 def load_products():
-    """تحميل بيانات المنتجات"""
+    """تحميل بيانات المنتجات مع وصف كل منتج من مخزن الكتالوج: [(product, description)]
+
+    المنتجات المكررة المستبعدة (detect_duplicates.py) ليس لها صفحات فلا تُحقن.
+    """
+    excluded_ids = load_excluded_duplicates()
     try:
-        with open('products.json', 'r', encoding='utf-8') as f:
-            return json.load(f)
+        with open_catalog() as store:
+            return [
+                (product, description)
+                for product, description in store.iter_products(with_descriptions=True)
+                if product.get('id') not in excluded_ids
+            ]
     except Exception as e:
         print(f"❌ Error loading products: {e}")
         sys.exit(1)
@@ -103,7 +73,7 @@ def create_product_schema(product, descriptions):
     description = clean_description(title, raw_desc)
     
     image = product.get('image_link', '')
-    price = product.get('sale_price', product.get('price', 0))
+    price = format_price(product_prices(product)[1])
     
     slug = create_slug(product)
     encoded_slug = quote(slug)
@@ -212,15 +182,10 @@ def create_local_business_schema():
 
 def create_meta_tags(product, descriptions):
     """إنشاء Meta Tags احترافية للسوق السعودي"""
-    product_id = product.get('id')
     title = product.get('title', '')
     
-    # Get actual description
-    raw_desc = descriptions.get(str(product_id), "")
-    description = clean_description(title, raw_desc)
-    
     image = product.get('image_link', '')
-    price = product.get('sale_price', product.get('price', 0))
+    price = format_price(product_prices(product)[1])
     
     slug = create_slug(product)
     encoded_slug = quote(slug)
@@ -268,6 +233,15 @@ def create_meta_tags(product, descriptions):
     
     return meta_tags
 
+def remove_replaced_tags(head, meta_tags):
+    """حذف <title> و <link rel=canonical> ووسوم meta الموجودة في meta_tags من <head>"""
+    head = re.sub(r'\s*<title>.*?</title>', '', head, flags=re.DOTALL)
+    head = re.sub(r'\s*<link rel="canonical"[^>]*>', '', head)
+    for attr, key in sorted(set(META_KEY.findall(meta_tags))):
+        head = re.sub(rf'\s*<meta {attr}="{re.escape(key)}"[^>]*>', '', head)
+    return head
+
+
 def inject_seo_into_html(html_content, product, lb_schema, descriptions):
     """حقن السيو والسكيما في HTML"""
     product_schema = create_product_schema(product, descriptions)
@@ -280,11 +254,15 @@ def inject_seo_into_html(html_content, product, lb_schema, descriptions):
     html_content = re.sub(r'<script type="application/ld\+json">.*?</script>', '', html_content, flags=re.DOTALL)
     
     # 2. إزالة Meta Tags القديمة
-    html_content = re.sub(r'<!-- SEO Meta Tags -->.*?(?=</head>)', '', html_content, flags=re.DOTALL | re.IGNORECASE)
+    html_content = re.sub(r'\s*<!-- SEO Meta Tags -->.*?(?=</head>)', '', html_content, flags=re.DOTALL | re.IGNORECASE)
 
     # 3. إزالة التعليقات المتبقية
     html_content = html_content.replace('<!-- Product Schema JSON-LD -->', '')
     html_content = html_content.replace('<!-- LocalBusiness Schema JSON-LD -->', '')
+
+    # 4. وسوم القالب التي تعيد السيو تعريفها (title و description و viewport و og:*) تُستبدل ولا تتكرر
+    head, _, body = html_content.partition('</head>')
+    html_content = remove_replaced_tags(head, meta_tags).rstrip() + '\n</head>' + body
     
     # إضافة السكيما والميتا
     seo_injection = f"""
@@ -304,48 +282,62 @@ def inject_seo_into_html(html_content, product, lb_schema, descriptions):
     
     return html_content.replace('</head>', seo_injection)
 
+@profiled
 def process_single_file(product, products_dir, lb_schema, descriptions):
     """Worker function for single file processing"""
     try:
         slug = create_slug(product)
-        safe_slug = re.sub(r'[^a-z0-9\-]', '', slug.lower())
-        file_path = products_dir / f"{safe_slug}.html"
+        file_path = products_dir / f"{slug}.html"
         
         if not str(file_path.resolve()).startswith(str(products_dir.resolve())):
             return False, f"Path traversal attempt: {product['id']}"
         
         if not file_path.exists():
-            pattern = f"{product['id']}-*.html"
-            matching_files = list(products_dir.glob(pattern))
-            if matching_files:
-                file_path = matching_files[0]
-            else:
-                return False, f"Not found: {product['id']}"
+            return False, f"Not found: {product['id']}"
 
         with open(file_path, 'r', encoding='utf-8') as f:
             html_content = f.read()
         
         updated_content = inject_seo_into_html(html_content, product, lb_schema, descriptions)
         
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(updated_content)
+        write_output(file_path, updated_content)
             
         return True, file_path.name
     except Exception as e:
         return False, f"Error processing {product.get('id')}: {e}"
 
+def needs_seo(product, products_dir):
+    """الصفحة موجودة ولم يُحقن فيها السيو بعد"""
+    file_path = products_dir / f"{create_slug(product)}.html"
+    try:
+        return SEO_MARKER not in file_path.read_text(encoding='utf-8')
+    except OSError:
+        return False
+
 def main():
     """الدالة الرئيسية"""
+    import argparse
+    parser = argparse.ArgumentParser(description='حقن السيو والسكيما في صفحات المنتجات')
+    parser.add_argument('--force', action='store_true', help='إعادة الحقن حتى في الصفحات النهائية')
+    args = parser.parse_args()
+
     print("\n" + "="*60)
     print("Starting optimized SEO Optimization and Schema Injection")
     print("="*60 + "\n")
     
-    products = load_products()
-    descriptions = load_descriptions()
+    entries = load_products()
     products_dir = Path('products').resolve()
     lb_schema = create_local_business_schema()
     
-    print(f"📦 Total Products: {len(products)}")
+    print(f"📦 Total Products: {len(entries)}")
+    if not args.force:
+        entries = [(p, d) for p, d in entries if needs_seo(p, products_dir)]
+        if not entries:
+            print("✅ كل الصفحات نهائية (السيو محقون عند التوليد) - لا شيء للتعديل")
+            return
+        print(f"🔧 صفحات بدون سيو: {len(entries)}")
+    description_cache.prepare(((p.get('title', ''), d) for p, d in entries), ('seo',))
+    description_cache.save_cache()
     print("Using Parallel Processing...\n")
     
     success_count = 0
@@ -356,7 +348,10 @@ def main():
     
     max_workers = min(multiprocessing.cpu_count(), 4)
     with ProcessPoolExecutor(max_workers=max_workers) as executor:
-        futures = {executor.submit(process_single_file, p, products_dir, lb_schema, descriptions): p for p in products}
+        futures = {
+            executor.submit(process_single_file, p, products_dir, lb_schema, {str(p.get('id')): description}): p
+            for p, description in entries
+        }
         
         processed_count = 0
         for future in as_completed(futures):
@@ -373,7 +368,7 @@ def main():
                      print(f"❌ {result}")
             
             if processed_count % 200 == 0:
-                print(f"Progress: {processed_count}/{len(products)} pages processed...")
+                print(f"Progress: {processed_count}/{len(entries)} pages processed...")
     
     end_time = time.time()
     print(f"\nDone! Successfully updated {success_count} pages")
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+توليد Service Worker (sw.js) مرتبط بمانيفست البناء
+
+- shell-<الإصدار>: الواجهة الأساسية محملة مسبقاً (index.html، CSS، سكربتات js/، الأيقونات، الشعار، الخطوط المحلية)
+  الإصدار = بصمة قائمة الملفات + محتوى index.html => نشر جديد يغيّر الإصدار فقط إذا تغير شيء فيها،
+  والملفات ذات البصمة (assets/fingerprints.json) تُنسخ من الكاش القديم بدلاً من تحميلها مرة أخرى
+- assets: باقي الملفات ذات البصمة عند أول طلب (cache-first)، وتُحذف البصمات التي لم تعد في المانيفست
+- catalog: products.json و pricing.json و facets.json بطريقة stale-while-revalidate (فوري من الكاش ثم تحديث في الخلفية)
+- pages: صفحات المنتجات عند أول زيارة (stale-while-revalidate) بحد أقصى MAX_CACHED_PAGES (الأقدم استخداماً يُحذف)
+- بدون اتصال: الصفحات المخزنة أو index.html
+- قالب صفحات المنتجات يستخدم service_worker_registration()؛ هذه المرحلة تحدّث الصفحات الثابتة
+
+الاستخدام:
+    python service_worker.py
+"""
+
+import re
+import sys
+import json
+import hashlib
+from fnmatch import fnmatch
+from string import Template
+from pathlib import Path
+
+from output_writer import write_output
+from fingerprint_assets import load_manifest as load_fingerprints
+
+# Force UTF-8 for output to avoid encoding errors on Windows
+if sys.stdout.encoding and sys.stdout.encoding.lower() != 'utf-8':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+SW_FILE = Path('sw.js')
+SHELL_PAGES = ['index.html']
+# الملفات الأصلية (قبل البصمة) في الواجهة الأساسية
+SHELL_ASSETS = ['css/site.css', 'js/*.js', 'assets/favicon.ico', 'assets/favicon-32.png',
+                'assets/logo-55.*', 'assets/logo-110.*', 'assets/fonts/*.woff2']
+CATALOG_FILES = ['products.json', 'pricing.json', 'facets.json']
+MAX_CACHED_PAGES = 50
+STATIC_PAGES = ['index.html', 'about.html', 'contact.html', 'privacy.html', 'terms.html',
+                'shipping.html', 'return-policy.html', 'reviews.html', '404.html']
+
+BLOCK_START, BLOCK_END = '<!-- service-worker -->', '<!-- /service-worker -->'
+REGISTRATION_BLOCK = re.compile(re.escape(BLOCK_START) + r'.*?' + re.escape(BLOCK_END), re.DOTALL)
+
+SW_TEMPLATE = Template("""\
+/* مولد بواسطة service_worker.py - لا تعدله يدوياً */
+const VERSION = '$version';
+const SHELL_CACHE = 'shell-' + VERSION;
+const ASSETS_CACHE = 'assets';
+const CATALOG_CACHE = 'catalog';
+const PAGES_CACHE = 'pages';
+const MAX_PAGES = $max_pages;
+
+const toUrl = (path) => new URL(path, self.registration.scope).href;
+const SHELL = $shell.map(toUrl);
+const ASSETS = new Set($assets.map(toUrl));
+const CATALOG = new Set($catalog.map(toUrl));
+const INDEX = toUrl('index.html');
+
+self.addEventListener('install', (event) => {
+  event.waitUntil((async () => {
+    const cache = await caches.open(SHELL_CACHE);
+    await Promise.all(SHELL.map(async (url) => {
+      // الملفات ذات البصمة لا تتغير: نسخها من أي كاش سابق بدلاً من تحميلها
+      const cached = ASSETS.has(url) && await caches.match(url);
+      const response = cached || await fetch(url, {cache: 'reload'});
+      if (!response.ok) throw new Error(url + ': ' + response.status);
+      await cache.put(url, response);
+    }));
+    await self.skipWaiting();
+  })());
+});
+
+self.addEventListener('activate', (event) => {
+  event.waitUntil((async () => {
+    for (const name of await caches.keys()) {
+      if (name.startsWith('shell-') && name !== SHELL_CACHE) await caches.delete(name);
+    }
+    const assets = await caches.open(ASSETS_CACHE);
+    for (const request of await assets.keys()) {
+      if (!ASSETS.has(request.url)) await assets.delete(request);
+    }
+    await self.clients.claim();
+  })());
+});
+
+async function trimPages(cache) {
+  const keys = await cache.keys();
+  for (const request of keys.slice(0, Math.max(0, keys.length - MAX_PAGES))) await cache.delete(request);
+}
+
+async function staleWhileRevalidate(event, cacheName, key, lru) {
+  const cache = await caches.open(cacheName);
+  const cached = await cache.match(key);
+  const network = fetch(event.request).then(async (response) => {
+    if (response.ok) {
+      // حذف ثم إضافة => المدخل يصبح الأحدث استخداماً (ترتيب cache.keys)
+      await cache.delete(key);
+      await cache.put(key, response.clone());
+      if (lru) await trimPages(cache);
+    }
+    return response;
+  });
+  if (!cached) return network;
+  // النسخة قبل إرجاع cached للصفحة (جسم الاستجابة يُقرأ مرة واحدة فقط)
+  const copy = lru ? cached.clone() : null;
+  event.waitUntil(network.catch(async () => {
+    if (copy) {
+      await cache.delete(key);
+      await cache.put(key, copy);
+    }
+  }));
+  return cached;
+}
+
+async function cacheFirst(event, key) {
+  const cached = await caches.match(key);
+  if (cached) return cached;
+  const response = await fetch(event.request);
+  if (response.ok) {
+    const cache = await caches.open(ASSETS_CACHE);
+    event.waitUntil(cache.put(key, response.clone()));
+  }
+  return response;
+}
+
+async function offline(key) {
+  return (await caches.match(key)) || (await caches.match(INDEX)) || Response.error();
+}
+
+self.addEventListener('fetch', (event) => {
+  const request = event.request;
+  const url = new URL(request.url);
+  if (request.method !== 'GET' || url.origin !== self.location.origin) return;
+  let key = url.origin + url.pathname;
+  if (key.endsWith('/')) key += 'index.html';
+
+  if (request.mode === 'navigate') {
+    if (url.pathname.includes('/products/')) {
+      event.respondWith(staleWhileRevalidate(event, PAGES_CACHE, key, true).catch(() => offline(key)));
+    } else {
+      event.respondWith(fetch(request).catch(() => offline(key)));
+    }
+  } else if (CATALOG.has(key)) {
+    event.respondWith(staleWhileRevalidate(event, CATALOG_CACHE, key, false));
+  } else if (ASSETS.has(key)) {
+    event.respondWith(cacheFirst(event, key));
+  }
+});
+""")
+
+
+def service_worker_registration(prefix=''):
+    """تسجيل sw.js بعد تحميل الصفحة (prefix = '../' لصفحات المنتجات)"""
+    return (f"{BLOCK_START}<script>if('serviceWorker' in navigator){{addEventListener('load',function(){{"
+            f"navigator.serviceWorker.register('{prefix}{SW_FILE.as_posix()}');}});}}</script>{BLOCK_END}")
+
+
+def rewrite_page(path):
+    content = path.read_text(encoding='utf-8')
+    registration = service_worker_registration()
+    if REGISTRATION_BLOCK.search(content):
+        updated = REGISTRATION_BLOCK.sub(lambda m: registration, content, count=1)
+    else:
+        updated = content.replace('</body>', f'    {registration}\n</body>', 1)
+    return write_output(path, updated)
+
+
+def build_service_worker():
+    """sw.js من المانيفست الحالي: (الإصدار، ملفات الواجهة، عدد الملفات ذات البصمة)"""
+    fingerprints = load_fingerprints()
+    current = fingerprints.get('assets', {})
+    shell = list(SHELL_PAGES) + [
+        target for original, target in sorted(current.items())
+        if any(fnmatch(original, pattern) for pattern in SHELL_ASSETS)
+    ]
+    assets = sorted(set(current.values()) | set(fingerprints.get('previous', {}).values()))
+
+    version_source = hashlib.sha1(SW_TEMPLATE.template.encode('utf-8'))
+    version_source.update(json.dumps([shell, MAX_CACHED_PAGES]).encode('utf-8'))
+    for page in SHELL_PAGES:
+        if Path(page).exists():
+            version_source.update(Path(page).read_bytes())
+    version = version_source.hexdigest()[:12]
+
+    script = SW_TEMPLATE.substitute(
+        version=version,
+        max_pages=MAX_CACHED_PAGES,
+        shell=json.dumps(shell, ensure_ascii=False),
+        assets=json.dumps(assets, ensure_ascii=False),
+        catalog=json.dumps(CATALOG_FILES),
+    )
+    write_output(SW_FILE, script)
+    return version, shell, len(assets)
+
+
+def main():
+    # تحديث الصفحات أولاً لأن محتوى index.html جزء من الإصدار
+    rewritten = [page for page in STATIC_PAGES if Path(page).exists() and rewrite_page(Path(page))]
+    version, shell, assets = build_service_worker()
+    print(f"🧰 {SW_FILE} الإصدار {version}: {len(shell)} ملف في الواجهة الأساسية، {assets} ملف ببصمة")
+    if rewritten:
+        print(f"✏️ تسجيل Service Worker في: {', '.join(rewritten)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+تحميل مسبق لصفحات المنتجات المتوقع فتحها (Speculation Rules + <link rel="prefetch">) بتعريف واحد لكل الصفحات
+
+- js/prefetch.js: بطاقات [data-prefetch] الظاهرة => prefetch، مرور الماوس/لمس => prerender
+- الإعدادات في config.json (prefetch_config):
+    enabled           : تفعيل/إيقاف
+    budget            : أقصى عدد صفحات prefetch لكل صفحة
+    prerender_budget  : أقصى عدد صفحات prerender (مرور الماوس) لكل صفحة
+    related_prefetch  : عدد المنتجات المشابهة التي تُحمّل مسبقاً مباشرة في صفحة المنتج
+    slow_connections  : قيم effectiveType التي لا يُحمّل معها شيء (ومع Save-Data دائماً)
+- قالب صفحات المنتجات يستخدم prefetch_tags()؛ هذه المرحلة تحدّث المتجر (index.html)
+
+الاستخدام:
+    python speculation.py
+"""
+
+import re
+import sys
+import json
+import html
+from pathlib import Path
+
+from output_writer import write_output
+from fingerprint_assets import asset_url
+
+# Force UTF-8 for output to avoid encoding errors on Windows
+if sys.stdout.encoding and sys.stdout.encoding.lower() != 'utf-8':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+SCRIPT_FILE = 'js/prefetch.js'
+DEFAULT_CONFIG = {
+    'enabled': True,
+    'budget': 8,
+    'prerender_budget': 1,
+    'related_prefetch': 4,
+    'slow_connections': ['slow-2g', '2g', '3g'],
+}
+# صفحات فيها بطاقات منتجات (data-prefetch)
+STOREFRONT_PAGES = ['index.html']
+
+BLOCK_START, BLOCK_END = '<!-- prefetch -->', '<!-- /prefetch -->'
+PREFETCH_BLOCK = re.compile(re.escape(BLOCK_START) + r'.*?' + re.escape(BLOCK_END), re.DOTALL)
+
+_config = None
+
+
+def load_prefetch_config():
+    """prefetch_config من config.json مع القيم الافتراضية"""
+    global _config
+    if _config is None:
+        try:
+            with open('config.json', 'r', encoding='utf-8') as f:
+                settings = json.load(f).get('prefetch_config', {})
+        except Exception:
+            settings = {}
+        _config = {**DEFAULT_CONFIG, **settings}
+    return _config
+
+
+def prefetch_tags(prefix='', urls=(), config=None):
+    """js/prefetch.js مع إعداداته (urls = روابط تُحمّل مسبقاً مباشرة، نسبية للصفحة)"""
+    config = config or load_prefetch_config()
+    if not config['enabled'] or not config['budget']:
+        return f'{BLOCK_START}{BLOCK_END}'
+    settings = {
+        'budget': int(config['budget']),
+        'prerender_budget': int(config['prerender_budget']),
+        'slow_connections': list(config['slow_connections']),
+    }
+    urls = list(urls)[:int(config['related_prefetch'])]
+    if urls:
+        settings['urls'] = urls
+    data = html.escape(json.dumps(settings, ensure_ascii=False, separators=(',', ':')))
+    return f'{BLOCK_START}<script src="{prefix}{asset_url(SCRIPT_FILE)}" defer data-config="{data}"></script>{BLOCK_END}'
+
+
+def rewrite_page(path):
+    content = path.read_text(encoding='utf-8')
+    tags = prefetch_tags()
+    if PREFETCH_BLOCK.search(content):
+        updated = PREFETCH_BLOCK.sub(lambda m: tags, content, count=1)
+    else:
+        updated = content.replace('</head>', f'    {tags}\n</head>', 1)
+    return write_output(path, updated)
+
+
+def main():
+    config = load_prefetch_config()
+    rewritten = [page for page in STOREFRONT_PAGES if Path(page).exists() and rewrite_page(Path(page))]
+    if config['enabled']:
+        print(f"🔮 التحميل المسبق: {config['budget']} prefetch، {config['prerender_budget']} prerender، "
+              f"{config['related_prefetch']} منتج مشابه مباشرة (بدون Save-Data و {', '.join(config['slow_connections'])})")
+    else:
+        print("ℹ️ التحميل المسبق غير مفعل (prefetch_config.enabled)")
+    if rewritten:
+        print(f"✏️ تحديث: {', '.join(rewritten)}")
+
+
+if __name__ == '__main__':
+    main()
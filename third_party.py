@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+تحميل Google Tag Manager و gtag.js بعد العرض الأول (تعريف واحد لكل الصفحات)
+
+- الإعدادات في config.json (analytics_config):
+    gtm_id / ga_id   : المعرفات (فارغ = غير مستخدم)
+    strategy         : idle (بعد load عند خمول المتصفح) | interaction (أول لمس/نقرة/تمرير/مفتاح) | immediate
+    idle_timeout_ms  : أقصى انتظار لـ requestIdleCallback
+    noscript_iframe  : iframe الخاص بـ GTM لمتصفحات بدون JavaScript
+- dataLayer و gtag() معرفان فوراً => أي حدث قبل التحميل يبقى في الطابور ويُرسل عند تحميل السكربتات
+- أي تفاعل من المستخدم يحمّل السكربتات فوراً في كل الاستراتيجيات
+- قالب صفحات المنتجات يستخدم analytics_head() و analytics_noscript()؛ هذه المرحلة تحدّث الصفحات الثابتة
+
+الاستخدام:
+    python third_party.py
+"""
+
+import re
+import sys
+import json
+from pathlib import Path
+
+from output_writer import write_output
+
+# Force UTF-8 for output to avoid encoding errors on Windows
+if sys.stdout.encoding and sys.stdout.encoding.lower() != 'utf-8':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+STRATEGIES = ('idle', 'interaction', 'immediate')
+DEFAULT_CONFIG = {
+    'gtm_id': '',
+    'ga_id': '',
+    'strategy': 'idle',
+    'idle_timeout_ms': 4000,
+    'noscript_iframe': True,
+}
+INTERACTION_EVENTS = ['pointerdown', 'keydown', 'touchstart', 'scroll']
+STATIC_PAGES = ['index.html', 'about.html', 'contact.html', 'privacy.html', 'terms.html',
+                'shipping.html', 'return-policy.html', 'reviews.html', '404.html']
+
+HEAD_START, HEAD_END = '<!-- analytics -->', '<!-- /analytics -->'
+NOSCRIPT_START, NOSCRIPT_END = '<!-- analytics-noscript -->', '<!-- /analytics-noscript -->'
+
+# الكتل الحالية (بين العلامات) أو النسخ القديمة المكتوبة يدوياً في الصفحات
+HEAD_BLOCK = re.compile(
+    re.escape(HEAD_START) + r'.*?' + re.escape(HEAD_END)
+    + r'|<!-- Google Tag Manager -->.*?<!-- End Google Tag Manager -->',
+    re.DOTALL,
+)
+LEGACY_GTAG = re.compile(
+    r'\s*<!-- Google Analytics \(gtag\.js\) -->\s*'
+    r'<script async src="https://www\.googletagmanager\.com/gtag/js\?id=[^"]*"></script>\s*<script>.*?</script>',
+    re.DOTALL,
+)
+NOSCRIPT_BLOCK = re.compile(
+    re.escape(NOSCRIPT_START) + r'.*?' + re.escape(NOSCRIPT_END)
+    + r'|(?:<!-- Google Tag Manager \(noscript\) -->\s*)?<noscript><iframe src="https://www\.googletagmanager\.com/ns\.html[^"]*"'
+    r'\s*height="0" width="0" style="display:none;visibility:hidden"></iframe></noscript>',
+    re.DOTALL,
+)
+
+_config = None
+
+
+def load_analytics_config():
+    """analytics_config من config.json مع القيم الافتراضية"""
+    global _config
+    if _config is None:
+        try:
+            with open('config.json', 'r', encoding='utf-8') as f:
+                settings = json.load(f).get('analytics_config', {})
+        except Exception:
+            settings = {}
+        _config = {**DEFAULT_CONFIG, **settings}
+        if _config['strategy'] not in STRATEGIES:
+            print(f"⚠️ analytics_config.strategy غير معروفة: {_config['strategy']} - استخدام idle")
+            _config['strategy'] = 'idle'
+    return _config
+
+
+def analytics_head(config=None):
+    """سكربت صغير في <head>: طابور dataLayer + تحميل GTM و gtag.js حسب الاستراتيجية"""
+    config = config or load_analytics_config()
+    sources = []
+    lines = ['window.dataLayer=window.dataLayer||[];function gtag(){dataLayer.push(arguments);}']
+    if config['gtm_id']:
+        lines.append("dataLayer.push({'gtm.start':new Date().getTime(),event:'gtm.js'});")
+        sources.append(f"https://www.googletagmanager.com/gtm.js?id={config['gtm_id']}")
+    if config['ga_id']:
+        lines.append(f"gtag('js',new Date());gtag('config','{config['ga_id']}');")
+        sources.append(f"https://www.googletagmanager.com/gtag/js?id={config['ga_id']}")
+    if not sources:
+        return f'{HEAD_START}{HEAD_END}'
+
+    triggers = {
+        'immediate': 'load();',
+        'interaction': '',
+        'idle': ("w.addEventListener('load',function(){(w.requestIdleCallback||function(c){setTimeout(c,1)})"
+                 f"(load,{{timeout:{int(config['idle_timeout_ms'])}}});}});"),
+    }
+    sources = json.dumps(sources, separators=(',', ':'))
+    events = json.dumps(INTERACTION_EVENTS, separators=(',', ':'))
+    lines.append(
+        '(function(w,d){var done=false;function load(){if(done)return;done=true;'
+        f'{sources}.forEach(function(src){{var s=d.createElement("script");s.async=true;s.src=src;d.head.appendChild(s);}});}}'
+        f'{events}.forEach(function(e){{w.addEventListener(e,load,{{once:true,passive:true}});}});'
+        f"{triggers[config['strategy']]}}})(window,document);"
+    )
+    return f'{HEAD_START}\n    <script>\n    ' + '\n    '.join(lines) + f'\n    </script>\n    {HEAD_END}'
+
+
+def analytics_noscript(config=None):
+    """iframe الخاص بـ GTM (فقط إذا noscript_iframe مفعل)"""
+    config = config or load_analytics_config()
+    if not (config['gtm_id'] and config['noscript_iframe']):
+        return f'{NOSCRIPT_START}{NOSCRIPT_END}'
+    return (f'{NOSCRIPT_START}<noscript><iframe src="https://www.googletagmanager.com/ns.html?id={config["gtm_id"]}" '
+            f'height="0" width="0" style="display:none;visibility:hidden"></iframe></noscript>{NOSCRIPT_END}')
+
+
+def rewrite_page(path):
+    content = path.read_text(encoding='utf-8')
+    head = analytics_head()
+    updated = LEGACY_GTAG.sub('', content)
+    if HEAD_BLOCK.search(updated):
+        updated = HEAD_BLOCK.sub(lambda m: head, updated, count=1)
+    else:
+        updated = updated.replace('</head>', f'    {head}\n</head>', 1)
+    noscript = analytics_noscript()
+    if NOSCRIPT_BLOCK.search(updated):
+        updated = NOSCRIPT_BLOCK.sub(lambda m: noscript, updated, count=1)
+    else:
+        updated = re.sub(r'(<body[^>]*>)', lambda m: f'{m.group(1)}\n    {noscript}', updated, count=1)
+    return write_output(path, updated)
+
+
+def main():
+    config = load_analytics_config()
+    rewritten = [page for page in STATIC_PAGES if Path(page).exists() and rewrite_page(Path(page))]
+    print(f"📊 GTM: {config['gtm_id'] or '-'}، GA: {config['ga_id'] or '-'}، التحميل: {config['strategy']}، "
+          f"noscript: {'نعم' if config['noscript_iframe'] else 'لا'}")
+    if rewritten:
+        print(f"✏️ تحديث: {', '.join(rewritten)}")
+    print("✅ سكربتات الطرف الثالث محدثة")
+
+
+if __name__ == '__main__':
+    main()
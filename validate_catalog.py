@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+فحص وتوحيد بيانات الكتالوج (products.json) قبل توليد أي صفحة
+
+- يحمّل الكتالوج في أعمدة NumPy ويفحص الكل دفعة واحدة: الأنواع، القيم، التكرار، sale_price <= price، العناوين الفارغة
+- يوحد الحقول: id عدد صحيح، الأسعار أرقام بخانتين عشريتين كحد أقصى (أعداد صحيحة إذا لم يوجد كسر)، العناوين بدون مسافات زائدة
+- catalog_store.py يستخدم normalize_products عند الاستيراد => كل المراحل تقرأ كتالوجاً موحداً ومفحوصاً
+- الأخطاء توقف البناء بتقرير واحد في reports/catalog-validation.json بدلاً من اكتشافها داخل العمال منتجاً منتجاً
+
+الاستخدام:
+    python validate_catalog.py
+"""
+
+import sys
+import json
+import numbers
+from pathlib import Path
+
+import numpy as np
+
+from output_writer import write_output
+
+# Force UTF-8 for output to avoid encoding errors on Windows
+if sys.stdout.encoding and sys.stdout.encoding.lower() != 'utf-8':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+PRODUCTS_FILE = Path('products.json')
+REPORT_FILE = Path('reports/catalog-validation.json')
+# عدد الأمثلة (IDs) المحفوظة لكل قاعدة في التقرير
+MAX_EXAMPLES = 10
+
+# القاعدة => الخطورة (error يوقف البناء ويمنع الاستيراد)
+RULES = {
+    'product.type': 'error',
+    'id.type': 'error',
+    'id.duplicate': 'error',
+    'title.empty': 'error',
+    'price.type': 'error',
+    'price.range': 'error',
+    'sale_price.type': 'error',
+    'sale_price.range': 'error',
+    'sale_price.above_price': 'error',
+    'price.precision': 'warning',
+    'image_link.missing': 'warning',
+}
+
+
+class CatalogValidationError(ValueError):
+    """بيانات الكتالوج غير صالحة - report يحتوي كل الأخطاء"""
+
+    def __init__(self, report):
+        self.report = report
+        summary = ', '.join(f"{rule}: {stats['count']}" for rule, stats in report['rules'].items()
+                            if stats['severity'] == 'error')
+        super().__init__(f"الكتالوج غير صالح ({report['errors']} خطأ - {summary})")
+
+
+def _number(value):
+    """قيمة رقمية (أو NaN) - النصوص الرقمية مقبولة، القيم المنطقية لا"""
+    if isinstance(value, bool):
+        return np.nan
+    if isinstance(value, numbers.Number):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value.strip())
+        except ValueError:
+            return np.nan
+    return np.nan
+
+
+def to_columns(products):
+    """أعمدة الكتالوج: ids و price و sale_price (float مع NaN للقيم غير الرقمية) و titles و image_links"""
+    records = [p if isinstance(p, dict) else {} for p in products]
+    n = len(records)
+    return {
+        'is_record': np.fromiter((isinstance(p, dict) for p in products), dtype=bool, count=n),
+        'raw_ids': [p.get('id') for p in records],
+        'ids': np.fromiter((_number(p.get('id')) for p in records), dtype=np.float64, count=n),
+        'price': np.fromiter((_number(p.get('price')) for p in records), dtype=np.float64, count=n),
+        'sale_price': np.fromiter((_number(p.get('sale_price')) for p in records), dtype=np.float64, count=n),
+        'titles': np.array([' '.join(str(p.get('title') or '').split()) for p in records], dtype=str),
+        'image_links': np.array([str(p.get('image_link') or '').strip() for p in records], dtype=str),
+    }
+
+
+def check_columns(columns):
+    """كل القواعد على الأعمدة دفعة واحدة: {القاعدة: (قناع المنتجات المخالفة، تفاصيل لكل منتج أو None)}"""
+    ids, price, sale_price = columns['ids'], columns['price'], columns['sale_price']
+
+    valid_id = np.isfinite(ids) & (ids == np.floor(ids)) & (ids > 0)
+    _, inverse, counts = np.unique(np.where(valid_id, ids, -1), return_inverse=True, return_counts=True)
+    duplicate_id = valid_id & (counts[inverse] > 1)
+
+    with np.errstate(invalid='ignore'):
+        valid_price = np.isfinite(price)
+        valid_sale = np.isfinite(sale_price)
+        rounded_price = np.round(price, 2)
+        rounded_sale = np.round(sale_price, 2)
+        checks = {
+            'product.type': (~columns['is_record'], None),
+            'id.type': (columns['is_record'] & ~valid_id, None),
+            'id.duplicate': (duplicate_id, None),
+            'title.empty': (columns['titles'] == '', None),
+            'price.type': (~valid_price, None),
+            'price.range': (valid_price & (price <= 0), price),
+            'sale_price.type': (~valid_sale, None),
+            'sale_price.range': (valid_sale & (sale_price <= 0), sale_price),
+            'sale_price.above_price': (valid_price & valid_sale & (rounded_sale > rounded_price), sale_price),
+            'price.precision': ((valid_price & (rounded_price != price)) | (valid_sale & (rounded_sale != sale_price)), price),
+            'image_link.missing': (~np.char.startswith(columns['image_links'], 'http'), None),
+        }
+    return checks
+
+
+def build_report(columns, checks):
+    """تجميع نتائج القواعد في تقرير واحد (العدد + أمثلة)"""
+    rules = {}
+    for rule, (mask, details) in checks.items():
+        indexes = np.flatnonzero(mask)
+        if not len(indexes):
+            continue
+        examples = []
+        for index in indexes[:MAX_EXAMPLES]:
+            example = {'position': int(index), 'id': columns['raw_ids'][index]}
+            if details is not None:
+                example['value'] = float(details[index])
+            examples.append(example)
+        rules[rule] = {'severity': RULES[rule], 'count': int(len(indexes)), 'examples': examples}
+
+    return {
+        'products': len(columns['ids']),
+        'errors': sum(r['count'] for r in rules.values() if r['severity'] == 'error'),
+        'warnings': sum(r['count'] for r in rules.values() if r['severity'] == 'warning'),
+        'rules': rules,
+    }
+
+
+def _price_value(value):
+    """سعر بخانتين عشريتين كحد أقصى، وعدد صحيح إذا لم يوجد كسر (285 وليس 285.0)"""
+    value = round(float(value), 2)
+    return int(value) if value.is_integer() else value
+
+
+def validate_products(products):
+    """فحص قائمة المنتجات: (الأعمدة، التقرير)"""
+    columns = to_columns(products)
+    return columns, build_report(columns, check_columns(columns))
+
+
+def normalize_products(products):
+    """فحص وتوحيد المنتجات للاستيراد - يرفع CatalogValidationError إذا وُجدت أخطاء"""
+    columns, report = validate_products(products)
+    if report['errors']:
+        raise CatalogValidationError(report)
+
+    ids = columns['ids'].astype(np.int64).tolist()
+    prices = np.round(columns['price'], 2).tolist()
+    sale_prices = np.round(columns['sale_price'], 2).tolist()
+    titles = columns['titles'].tolist()
+    image_links = columns['image_links'].tolist()
+
+    normalized = []
+    for i, product in enumerate(products):
+        product = dict(product)
+        product['id'] = ids[i]
+        product['title'] = titles[i]
+        product['image_link'] = image_links[i]
+        product['price'] = _price_value(prices[i])
+        product['sale_price'] = _price_value(sale_prices[i])
+        normalized.append(product)
+    return normalized
+
+
+def print_report(report):
+    for rule, stats in sorted(report['rules'].items(), key=lambda item: (item[1]['severity'] != 'error', item[0])):
+        icon = '❌' if stats['severity'] == 'error' else '⚠️'
+        ids = ', '.join(str(example['id']) for example in stats['examples'][:5])
+        print(f"{icon} {rule}: {stats['count']} (IDs: {ids})")
+
+
+def main():
+    import time
+    start_time = time.time()
+
+    if not PRODUCTS_FILE.exists():
+        print("❌ products.json not found")
+        sys.exit(1)
+    try:
+        with open(PRODUCTS_FILE, 'r', encoding='utf-8') as f:
+            products = json.load(f)
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        print(f"❌ Error reading products.json: {e}")
+        sys.exit(1)
+    if not isinstance(products, list):
+        print("❌ products.json يجب أن يكون قائمة منتجات")
+        sys.exit(1)
+
+    _, report = validate_products(products)
+    write_output(REPORT_FILE, json.dumps(report, ensure_ascii=False, indent=2))
+
+    print(f"🔎 تم فحص {report['products']} منتج في {(time.time() - start_time) * 1000:.0f} ms")
+    print_report(report)
+    print(f"📄 التقرير: {REPORT_FILE}")
+    if report['errors']:
+        print(f"❌ {report['errors']} خطأ في products.json - يجب إصلاحها قبل البناء")
+        sys.exit(1)
+
+    # استيراد الكتالوج الموحد لباقي المراحل
+    from catalog_store import open_catalog
+    with open_catalog():
+        pass
+    print(f"✅ الكتالوج صالح ({report['warnings']} تحذير)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+فحص صفحات المنتجات المولدة قبل النشر (بدون إنترنت)
+
+- يستخرج كل كتل application/ld+json ووسوم meta / Open Graph / Twitter من <head> كل صفحة
+- يتحقق من حقول Product و Offer المطلوبة وحدود الطول (وصف meta 160 حرف، عنوان المنتج 150 حرف لـ GMC)
+- يجمع الأخطاء حسب القاعدة ويكتب التقرير في reports/page-validation.json
+- الأخطاء توقف البناء (exit code 1)، والتحذيرات تُطبع فقط
+
+الاستخدام:
+    python validate_pages.py          # صفحات منتجات الكتالوج الحالي (كما يولدها build.py)
+    python validate_pages.py --all    # كل ملفات products/*.html
+"""
+
+import sys
+import json
+import argparse
+import multiprocessing
+from pathlib import Path
+from datetime import date
+from html.parser import HTMLParser
+from concurrent.futures import ProcessPoolExecutor
+
+from build_profile import profiled
+from output_writer import write_output
+
+# Force UTF-8 for output to avoid encoding errors on Windows
+if sys.stdout.encoding and sys.stdout.encoding.lower() != 'utf-8':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+PRODUCTS_DIR = Path('products')
+REPORT_FILE = Path('reports/page-validation.json')
+BASE_URL = "https://sherow1982.github.io/alsooq-alsaudi"
+
+META_DESCRIPTION_MAX = 160
+PRODUCT_TITLE_MAX = 150
+# عدد الأمثلة (أسماء الملفات) المحفوظة لكل قاعدة في التقرير
+MAX_EXAMPLES = 10
+
+PRODUCT_REQUIRED = ['name', 'image', 'description', 'sku', 'brand', 'offers']
+OFFER_REQUIRED = ['url', 'price', 'priceCurrency', 'priceValidUntil', 'availability']
+OG_REQUIRED = ['og:title', 'og:description', 'og:image', 'og:url', 'og:type']
+TWITTER_REQUIRED = ['twitter:card', 'twitter:title', 'twitter:description', 'twitter:image']
+
+# القاعدة => الخطورة (error يوقف البناء)
+RULES = {
+    'html.no_head': 'error',
+    'jsonld.missing': 'error',
+    'jsonld.parse': 'error',
+    'product.missing': 'error',
+    'product.required': 'error',
+    'product.title_length': 'warning',
+    'product.aggregate_rating_static': 'warning',
+    'offer.required': 'error',
+    'offer.price': 'error',
+    'offer.price_valid_until': 'error',
+    'offer.url': 'error',
+    'meta.title': 'error',
+    'meta.title_duplicate': 'error',
+    'meta.description': 'error',
+    'meta.description_length': 'error',
+    'meta.description_duplicate': 'error',
+    'meta.duplicate': 'warning',
+    'meta.canonical': 'error',
+    'og.required': 'error',
+    'og.url': 'warning',
+    'twitter.required': 'warning',
+}
+
+
+class HeadParser(HTMLParser):
+    """يجمع <title> و <meta> و <link rel=canonical> وكتل JSON-LD من <head> فقط"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.titles = []
+        self.meta = {}
+        self.canonical = []
+        self.jsonld = []
+        self._capture = None
+        self._buffer = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == 'meta':
+            key = attrs.get('name') or attrs.get('property')
+            if key:
+                self.meta.setdefault(key, []).append(attrs.get('content') or '')
+        elif tag == 'link' and attrs.get('rel') == 'canonical':
+            self.canonical.append(attrs.get('href') or '')
+        elif tag == 'title':
+            self._capture, self._buffer = 'title', []
+        elif tag == 'script' and attrs.get('type') == 'application/ld+json':
+            self._capture, self._buffer = 'jsonld', []
+
+    def handle_endtag(self, tag):
+        if self._capture == 'title' and tag == 'title':
+            self.titles.append(''.join(self._buffer).strip())
+            self._capture = None
+        elif self._capture == 'jsonld' and tag == 'script':
+            self.jsonld.append(''.join(self._buffer))
+            self._capture = None
+
+    def handle_data(self, data):
+        if self._capture:
+            self._buffer.append(data)
+
+
+def _types(block):
+    """أنواع schema في الكتلة (تدعم @graph والقوائم)"""
+    if isinstance(block, list):
+        for item in block:
+            yield from _types(item)
+    elif isinstance(block, dict):
+        if '@graph' in block:
+            yield from _types(block['@graph'])
+        else:
+            yield block
+
+
+def check_product(product, issues, today):
+    missing = [field for field in PRODUCT_REQUIRED if not product.get(field)]
+    if missing:
+        issues.append(('product.required', ', '.join(missing)))
+    if len(str(product.get('name', ''))) > PRODUCT_TITLE_MAX:
+        issues.append(('product.title_length', f"{len(product['name'])} > {PRODUCT_TITLE_MAX}"))
+    if 'aggregateRating' in product and not product.get('review'):
+        issues.append(('product.aggregate_rating_static', 'aggregateRating بدون مراجعات فعلية'))
+
+    offers = product.get('offers')
+    for offer in offers if isinstance(offers, list) else [offers] if offers else []:
+        missing = [field for field in OFFER_REQUIRED if not offer.get(field)]
+        if missing:
+            issues.append(('offer.required', ', '.join(missing)))
+        try:
+            if float(offer.get('price', '')) <= 0:
+                issues.append(('offer.price', str(offer.get('price'))))
+        except (TypeError, ValueError):
+            issues.append(('offer.price', repr(offer.get('price'))))
+        valid_until = offer.get('priceValidUntil')
+        if valid_until:
+            try:
+                if date.fromisoformat(valid_until) < today:
+                    issues.append(('offer.price_valid_until', f"منتهي: {valid_until}"))
+            except (TypeError, ValueError):
+                issues.append(('offer.price_valid_until', repr(valid_until)))
+        if offer.get('url') and not str(offer['url']).startswith(BASE_URL):
+            issues.append(('offer.url', offer['url']))
+
+
+@profiled
+def validate_page(path, today=None):
+    """فحص صفحة واحدة: [(القاعدة، التفاصيل)]"""
+    today = today or date.today()
+    issues = []
+    with open(path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    end = content.find('</head>')
+    if end == -1:
+        return [('html.no_head', '')]
+
+    parser = HeadParser()
+    parser.feed(content[:end])
+
+    # JSON-LD
+    if not parser.jsonld:
+        issues.append(('jsonld.missing', ''))
+    products = []
+    for raw in parser.jsonld:
+        try:
+            block = json.loads(raw)
+        except json.JSONDecodeError as e:
+            issues.append(('jsonld.parse', f"{e.msg} (سطر {e.lineno})"))
+            continue
+        products.extend(item for item in _types(block) if item.get('@type') == 'Product')
+    if parser.jsonld and not products:
+        issues.append(('product.missing', ''))
+    for product in products:
+        check_product(product, issues, today)
+
+    # Meta
+    if not parser.titles or not parser.titles[-1]:
+        issues.append(('meta.title', ''))
+    if len(parser.titles) > 1:
+        issues.append(('meta.title_duplicate', f"{len(parser.titles)} <title>"))
+    descriptions = parser.meta.get('description', [])
+    if len(descriptions) > 1:
+        issues.append(('meta.description_duplicate', f"{len(descriptions)} description"))
+    if not descriptions or not descriptions[-1].strip():
+        issues.append(('meta.description', ''))
+    for value in descriptions:
+        if len(value) > META_DESCRIPTION_MAX:
+            issues.append(('meta.description_length', f"{len(value)} > {META_DESCRIPTION_MAX}"))
+    duplicated = sorted(key for key, values in parser.meta.items() if len(values) > 1 and key != 'description')
+    if duplicated:
+        issues.append(('meta.duplicate', ', '.join(duplicated)))
+    if len(parser.canonical) != 1:
+        issues.append(('meta.canonical', f"{len(parser.canonical)} canonical"))
+
+    # Open Graph و Twitter
+    missing = [key for key in OG_REQUIRED if not parser.meta.get(key)]
+    if missing:
+        issues.append(('og.required', ', '.join(missing)))
+    if parser.canonical and parser.meta.get('og:url') and parser.meta['og:url'][-1] != parser.canonical[0]:
+        issues.append(('og.url', 'og:url لا يطابق canonical'))
+    missing = [key for key in TWITTER_REQUIRED if not parser.meta.get(key)]
+    if missing:
+        issues.append(('twitter.required', ', '.join(missing)))
+
+    return issues
+
+
+def catalog_pages():
+    """صفحات منتجات الكتالوج الحالي (بنفس slug ومنتجات مستبعدة كما في generate_all_pages)"""
+    from catalog_store import open_catalog
+    from generate_all_pages import create_slug, load_excluded_duplicates
+
+    excluded_ids = load_excluded_duplicates()
+    with open_catalog() as store:
+        return [
+            PRODUCTS_DIR / f"{create_slug(product)}.html"
+            for product in store.iter_products()
+            if product.get('id') not in excluded_ids
+        ]
+
+
+def validate_pages(paths):
+    """فحص الصفحات بالتوازي وتجميع النتائج حسب القاعدة"""
+    results = {}
+    missing_files = [str(path) for path in paths if not path.exists()]
+    paths = [path for path in paths if path.exists()]
+
+    max_workers = min(multiprocessing.cpu_count(), 4)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        page_issues = executor.map(validate_page, paths, chunksize=64)
+        for path, issues in zip(paths, page_issues):
+            for rule, detail in issues:
+                stats = results.setdefault(rule, {'severity': RULES[rule], 'count': 0, 'examples': []})
+                stats['count'] += 1
+                if len(stats['examples']) < MAX_EXAMPLES:
+                    stats['examples'].append({'file': path.name, 'detail': detail})
+
+    if missing_files:
+        results['page.missing'] = {
+            'severity': 'error',
+            'count': len(missing_files),
+            'examples': [{'file': name, 'detail': ''} for name in missing_files[:MAX_EXAMPLES]],
+        }
+    return len(paths), results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='فحص JSON-LD ووسوم meta في صفحات المنتجات')
+    parser.add_argument('--all', action='store_true', help='فحص كل ملفات products/*.html بدلاً من صفحات الكتالوج فقط')
+    args = parser.parse_args()
+
+    import time
+    start_time = time.time()
+    paths = sorted(PRODUCTS_DIR.glob('*.html')) if args.all else catalog_pages()
+    checked, results = validate_pages(paths)
+
+    errors = sum(r['count'] for r in results.values() if r['severity'] == 'error')
+    warnings = sum(r['count'] for r in results.values() if r['severity'] == 'warning')
+    report = {
+        'pages': checked,
+        'errors': errors,
+        'warnings': warnings,
+        'rules': dict(sorted(results.items())),
+    }
+    write_output(REPORT_FILE, json.dumps(report, ensure_ascii=False, indent=2))
+
+    print(f"🔎 تم فحص {checked} صفحة في {time.time() - start_time:.2f} ثانية")
+    for rule, stats in sorted(results.items(), key=lambda item: (item[1]['severity'] != 'error', item[0])):
+        icon = '❌' if stats['severity'] == 'error' else '⚠️'
+        example = stats['examples'][0]
+        print(f"{icon} {rule}: {stats['count']} (مثال: {example['file']} {example['detail']})")
+    print(f"📄 التقرير: {REPORT_FILE}")
+
+    if errors:
+        print(f"❌ {errors} خطأ - يجب إصلاحها قبل النشر")
+        sys.exit(1)
+    print(f"✅ لا توجد أخطاء ({warnings} تحذير)")
+
+
+if __name__ == '__main__':
+    main()